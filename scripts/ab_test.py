@@ -1,14 +1,13 @@
 # scripts/ab_test.py
-import json
 import sys
 sys.path.insert(0, 'src')
 
 from evaluation.ab_testing import ABTester
 from documind.rag.production_qa import ProductionQA
+from documind.utils.json_io import load_json, dump_json
 
 # Load dataset
-with open('data/evaluation_dataset.json', 'r') as f:
-    test_dataset = json.load(f)[:5]  # Use 5 queries for speed
+test_dataset = load_json('data/evaluation_dataset.json')[:5]  # Use 5 queries for speed
 
 # Setup comparison
 tester = ABTester()
@@ -27,7 +26,6 @@ results = tester.run_comparison(test_dataset)
 tester.print_comparison(results)
 
 # Save results
-with open('results/ab_test_results.json', 'w') as f:
-    json.dump(results, f, indent=2)
+dump_json(results, 'results/ab_test_results.json')
 
 print(f"\n📁 Results saved to results/ab_test_results.json")
@@ -1,9 +1,11 @@
 # scripts/monitor_queries.py
-from documind.rag.production_qa import ProductionQA
-from evaluation.trulens_monitor import DocuMindTruLens
+import asyncio
 import sys
 sys.path.insert(0, 'src')
 
+from documind.rag.production_qa import ProductionQA
+from evaluation.trulens_monitor import DocuMindTruLens
+
 
 # Initialize RAG pipeline and TruLens monitor
 rag = ProductionQA()
@@ -18,13 +20,20 @@ queries = [
     "How many sick leave days do employees get?"
 ]
 
+
+async def run_queries():
+    # Fan out all queries at once; wall-clock is the slowest query, not the sum
+    return await asyncio.gather(*(monitor.aquery(q) for q in queries))
+
+
 print("\n" + "="*60)
 print("RUNNING MONITORED QUERIES")
 print("="*60)
 
-for i, query in enumerate(queries, 1):
+results = asyncio.run(run_queries())
+
+for i, (query, result) in enumerate(zip(queries, results), 1):
     print(f"\n[{i}/{len(queries)}] {query}")
-    result = monitor.query(query)
     print(f"✓ Answer length: {len(result['answer'])} chars")
     print(f"✓ Sources: {len(result.get('sources', []))} chunks")
 
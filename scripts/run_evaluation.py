@@ -1,36 +1,34 @@
-import json
+import asyncio
 import sys
 sys.path.append('src')
 
 from evaluation.ragas_evaluator import RAGASEvaluator
 from documind.rag.production_qa import ProductionQA
+from documind.utils.json_io import load_json, dump_json
 
 # Load test dataset
-with open('data/evaluation_dataset.json', 'r') as f:
-    test_dataset = json.load(f)
+test_dataset = load_json('data/evaluation_dataset.json')
 
 # Initialize ProductionQA (the actual DocuMind RAG pipeline)
 rag = ProductionQA(enable_logging=False)
 evaluator = RAGASEvaluator(rag)
 
-# Run evaluation
-results = evaluator.evaluate(test_dataset)
+# Run evaluation (test questions are answered concurrently)
+results = asyncio.run(evaluator.aevaluate(test_dataset))
 
 # Display results
 print("\n" + "="*60)
 print("EVALUATION RESULTS")
 print("="*60)
 
-for metric in ['faithfulness', 'answer_relevancy', 'answer_correctness']:
-    score = results.get(metric, 0.0)
-    status = "✅" if score >= {'faithfulness': 0.70, 'answer_relevancy': 0.80,
-                               'answer_correctness': 0.70}[metric] else "❌"
-    print(f"{metric:.<25} {score:.3f} {status}")
+for metric in RAGASEvaluator.METRIC_NAMES:
+    status = "✅" if results['metric_passed'][metric] else "❌"
+    print(f"{metric:.<25} {results[metric]:.3f} {status}")
 
 print(f"\nAverage Score: {results['average_score']:.3f}")
+print(f"Questions passing all thresholds: {results['question_pass_rate']:.0%}")
 print(f"Overall Status: {'✅ PASSED' if results['passed'] else '❌ FAILED'}")
 
 # Save results
-with open('results/evaluation_results.json', 'w') as f:
-    json.dump(results, f, indent=2)
+dump_json(results, 'results/evaluation_results.json')
 print("\n📁 Results saved to results/evaluation_results.json")
@@ -1,12 +1,13 @@
 import streamlit as st
-import os
 import time
-from typing import List
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
 
 # Import components from previous sessions
 try:
     from documind.rag.production_qa import ProductionQA
-    from documind.rag.search import search_documents
+    from documind.rag.search import rrf_hybrid_search, list_file_types
     from documind.processor import DocumentProcessor
 except ImportError as e:
     st.error(
@@ -22,12 +23,31 @@ st.title("🧠 DocuMind: Enterprise Knowledge Base")
 mode = st.sidebar.radio(
     "Select Mode", ["Chat Assistant", "Document Ingestion", "Knowledge Explorer"])
 
+
+@st.cache_resource
+def get_qa_system() -> ProductionQA:
+    """One ProductionQA shared by every session and rerun in this process."""
+    return ProductionQA(enable_logging=False)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_search(query: str, top_k: int = 10, file_types: tuple = (),
+                  after: Optional[date] = None) -> List[dict]:
+    """Memoize Knowledge Explorer searches for five minutes."""
+    return rrf_hybrid_search(query, top_k=top_k,
+                             file_types=list(file_types) or None, after=after)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def cached_file_types() -> List[str]:
+    """Document file types available as search filters."""
+    return list_file_types()
+
+
 # Initialize Session State for Chat
 if "messages" not in st.session_state:
     st.session_state.messages = []
-if "qa_system" not in st.session_state:
-    # Initialize the ProductionQA system
-    st.session_state.qa_system = ProductionQA(enable_logging=False)
+qa_system = get_qa_system()
 
 # --- MODE 1: CHAT ASSISTANT ---
 if mode == "Chat Assistant":
@@ -48,14 +68,14 @@ if mode == "Chat Assistant":
         # 2. Assistant Response
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
-                # Call ProductionQA
-                response = st.session_state.qa_system.query(prompt)
-
-                answer_text = response['answer']
-                sources = response.get('sources', [])
+                # Stream the answer from ProductionQA as it is generated.
+                # qa_system is shared across sessions, so collect the full
+                # result through a callback rather than qa_system.last_result.
+                completed = {}
+                answer_text = st.write_stream(
+                    qa_system.stream_query(prompt, on_complete=completed.update))
 
-                # Display Answer
-                st.markdown(answer_text)
+                sources = completed.get('sources', [])
 
                 # Display Sources
                 if sources:
@@ -95,14 +115,13 @@ elif mode == "Document Ingestion":
         for i, uploaded_file in enumerate(uploaded_files):
             status_text.text(f"Processing {uploaded_file.name}...")
 
-            # Save temp file
-            temp_path = f"temp_{uploaded_file.name}"
-            with open(temp_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-
             try:
-                # Extract & Chunk
-                result = processor.process_document(temp_path)
+                # Extract & Chunk straight from the upload buffer
+                result = processor.process_document_bytes(
+                    uploaded_file.getbuffer(),
+                    Path(uploaded_file.name).suffix,
+                    uploaded_file.name
+                )
 
                 # Upload to DB
                 upload_status = processor.upload_to_documind(result)
@@ -111,9 +130,6 @@ elif mode == "Document Ingestion":
                     f"✅ {uploaded_file.name}: {result['metadata']['basic']['page_count']} pages processed.")
             except Exception as e:
                 st.error(f"❌ Failed {uploaded_file.name}: {str(e)}")
-            finally:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
 
             progress_bar.progress((i + 1) / len(uploaded_files))
 
@@ -126,16 +142,30 @@ elif mode == "Knowledge Explorer":
     search_term = st.text_input(
         "Search documents by keyword or semantic meaning")
 
+    # Filters are applied in the database before vector ranking
+    st.sidebar.subheader("Search Filters")
+    try:
+        available_types = cached_file_types()
+    except Exception:
+        available_types = []
+    selected_types = st.sidebar.multiselect("File types", available_types)
+    use_date_filter = st.sidebar.checkbox("Only documents added after...")
+    after = st.sidebar.date_input("Added after") if use_date_filter else None
+
     if search_term:
-        # Use semantic search
-        results = search_documents(search_term, top_k=10)
+        # Hybrid search: vector + full-text ranks fused with RRF
+        results = cached_search(search_term, top_k=10,
+                                file_types=tuple(selected_types), after=after)
 
         st.subheader(f"Found {len(results)} chunks")
         for r in results:
             with st.container(border=True):
                 st.markdown(
                     f"**Document:** {r.get('document_name', 'Unknown')}")
-                st.caption(f"Score: {r.get('similarity', 0.0):.4f}")
+                similarity = r.get('similarity')
+                st.caption(
+                    f"Score: {r.get('rrf_score', 0.0):.4f} ({r.get('search_type', 'semantic')})"
+                    + (f" | Similarity: {similarity:.4f}" if similarity is not None else ""))
                 st.text(r.get('content', '')[:300] + "...")
 
 # Footer
@@ -5,9 +5,11 @@ Provides document management tools for Claude Code
 Compatible with MCP SDK v2.x (uses @server.list_tools / @server.call_tool)
 """
 import os
+import sys
 import json
 import asyncio
 from datetime import datetime
+from pathlib import Path
 from dotenv import load_dotenv
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -216,6 +218,20 @@ def upload_document(
         }
 
 
+def _document_content(doc: dict) -> str:
+    """Document text, decompressing rows stored in content_zstd (migration 006)."""
+    if doc.get("content") is not None or not doc.get("content_zstd"):
+        return doc.get("content") or ""
+
+    # Only compressed rows need the documind package (and zstandard)
+    try:
+        from documind.utils.compression import decompress_content
+    except ImportError:
+        sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+        from documind.utils.compression import decompress_content
+    return decompress_content(doc)
+
+
 def search_documents(query: str, limit: int = 5, file_type: str = None) -> dict:
     """Search documents by title or content."""
     try:
@@ -231,6 +247,7 @@ def search_documents(query: str, limit: int = 5, file_type: str = None) -> dict:
         response.raise_for_status()
 
         documents = response.json()
+        contents = [_document_content(doc) for doc in documents]
 
         return {
             "success": True,
@@ -241,13 +258,13 @@ def search_documents(query: str, limit: int = 5, file_type: str = None) -> dict:
                     "title": doc["title"],
                     "file_type": doc["file_type"],
                     "preview": (
-                        doc["content"][:200] + "..."
-                        if len(doc["content"]) > 200
-                        else doc["content"]
+                        content[:200] + "..."
+                        if len(content) > 200
+                        else content
                     ),
                     "created_at": doc["created_at"],
                 }
-                for doc in documents
+                for doc, content in zip(documents, contents)
             ],
         }
     except Exception as e:
@@ -274,7 +291,7 @@ def get_document(document_id: str) -> dict:
             "document": {
                 "id": document["id"],
                 "title": document["title"],
-                "content": document["content"],
+                "content": _document_content(document),
                 "file_type": document["file_type"],
                 "metadata": document["metadata"],
                 "created_at": document["created_at"],
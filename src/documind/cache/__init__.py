@@ -0,0 +1,10 @@
+"""Caches for answers and other expensive results."""
+from .semantic import SemanticCache, DEFAULT_SEMANTIC_CACHE_PATH
+from .embeddings import EmbeddingCache, DEFAULT_EMBEDDING_CACHE_PATH
+
+__all__ = [
+    'SemanticCache',
+    'DEFAULT_SEMANTIC_CACHE_PATH',
+    'EmbeddingCache',
+    'DEFAULT_EMBEDDING_CACHE_PATH',
+]
@@ -0,0 +1,54 @@
+"""
+Numba kernels for the semantic cache linear scan.
+
+Compiled when numba is installed; otherwise ``NUMBA_AVAILABLE`` is False
+and callers should use plain NumPy instead (the pure-Python kernel below
+is correct but slow).
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Optional: pip install numba
+    njit = None
+    prange = range
+
+NUMBA_AVAILABLE = njit is not None
+
+
+def _top1_cosine(codes, scales, q_codes, q_scale, n, d):
+    """
+    Best match of a quantized query against the first n quantized rows.
+
+    Vectors are int8 codes of L2-normalized embeddings with one float32
+    scale each (vector ~= codes * scale), so the int32 dot product of the
+    codes times both scales is the cosine similarity. Scores are computed
+    in parallel; the argmax is a serial pass (a parallel max over two
+    variables would race).
+
+    Returns:
+        (row index, similarity)
+    """
+    scores = np.empty(n, dtype=np.float32)
+    for i in prange(n):
+        acc = np.int32(0)
+        for j in range(d):
+            acc += np.int32(codes[i, j]) * np.int32(q_codes[j])
+        scores[i] = acc * scales[i] * q_scale
+
+    best = 0
+    for i in range(1, n):
+        if scores[i] > scores[best]:
+            best = i
+    return best, scores[best]
+
+
+if NUMBA_AVAILABLE:
+    top1_cosine = njit(parallel=True, fastmath=True, cache=True)(_top1_cosine)
+    # Compile now (or load from the on-disk cache) rather than on first lookup
+    top1_cosine(
+        np.ones((1, 1), dtype=np.int8), np.ones(1, dtype=np.float32),
+        np.ones(1, dtype=np.int8), np.float32(1.0), 1, 1
+    )
+else:
+    top1_cosine = _top1_cosine
@@ -0,0 +1,95 @@
+"""
+Embedding Cache - Persist query embeddings across runs.
+
+Keeps a small SQLite database (default ``~/.documind/embedding_cache.sqlite``)
+mapping (model, text) to the embedding the API returned, so questions asked
+again in a later CLI run, test session or Streamlit restart skip the
+embedding request. Keys are BLAKE2b digests of model + text; vectors are
+stored as float32 bytes.
+
+It sits behind the in-process LRU in documind.rag.search: memory first, then
+this file, then the OpenAI API.
+
+The database runs in WAL mode, so concurrent processes sharing the cache
+can read while another is writing.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+DEFAULT_EMBEDDING_CACHE_PATH = Path.home() / ".documind" / "embedding_cache.sqlite"
+
+
+def _key(model: str, text: str) -> str:
+    return hashlib.blake2b(f"{model}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent (model, text) -> embedding store.
+
+    One connection per instance, shared across threads and serialized by a
+    lock.
+
+    Example:
+        cache = EmbeddingCache()
+        vector = cache.get("text-embedding-3-small", "vacation policy")
+        if vector is None:
+            vector = embed("vacation policy")
+            cache.put("text-embedding-3-small", "vacation policy", vector)
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_EMBEDDING_CACHE_PATH):
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            path: SQLite database file location
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL
+            );
+        """)
+
+    def get(self, model: str, text: str) -> Optional[Tuple[float, ...]]:
+        """Return the stored embedding for text, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (_key(model, text),)
+            ).fetchone()
+        if row is None:
+            return None
+        return tuple(np.frombuffer(row[0], dtype=np.float32).tolist())
+
+    def put(self, model: str, text: str, vector: Iterable[float]) -> None:
+        """Store the embedding for text."""
+        self.put_many(model, {text: vector})
+
+    def put_many(self, model: str, vectors: Dict[str, Iterable[float]]) -> None:
+        """Store several embeddings in one transaction."""
+        rows = [
+            (_key(model, text), np.asarray(vector, dtype=np.float32).tobytes())
+            for text, vector in vectors.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
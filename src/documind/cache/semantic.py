@@ -0,0 +1,374 @@
+"""
+Semantic Answer Cache - Reuse answers for near-duplicate questions.
+
+Questions are keyed by their embedding. A lookup compares the query
+embedding against every cached one (cosine similarity, as a single
+matrix-vector product over L2-normalized rows) and returns the stored
+response when the best match clears the threshold, so a rephrased
+question skips retrieval and the LLM call entirely.
+
+Embeddings are stored int8-quantized (one float32 scale per vector, a
+quarter of the float32 size) in one contiguous matrix that grows by
+doubling; responses are kept in a parallel list. When hnswlib is installed
+and the cache holds at least ANN_MIN_ENTRIES questions, lookups go through
+an HNSW index over the same vectors (O(log N) instead of a scan of every
+row). Smaller caches are scanned, with a Numba kernel when numba is
+installed. The cache can be persisted to a small SQLite file (default
+``~/.documind/semantic_cache.sqlite``); the HNSW index is rebuilt from it
+on load.
+
+Size is bounded: entries expire after ``ttl`` seconds (24 h by default) and
+the least recently used entry is evicted once ``max_entries`` is reached.
+Evicted rows are reused by later inserts; in the HNSW index they are only
+marked deleted, and the index is rebuilt once more than
+HNSW_REBUILD_DELETED_FRACTION of its nodes are dead.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from ._kernels import NUMBA_AVAILABLE, top1_cosine
+from ..utils.json_io import dumps_json, loads_json
+
+try:
+    import hnswlib
+except ImportError:  # Optional: pip install hnswlib (falls back to a linear scan)
+    hnswlib = None
+
+DEFAULT_SEMANTIC_CACHE_PATH = Path.home() / ".documind" / "semantic_cache.sqlite"
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+
+# HNSW build parameters
+HNSW_MAX_ELEMENTS = 100_000
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Rebuild the index once this share of its nodes are marked deleted
+HNSW_REBUILD_DELETED_FRACTION = 0.2
+
+# Below this many entries a linear scan beats an HNSW traversal
+ANN_MIN_ENTRIES = 1_000
+
+# Rows dequantized per matrix-vector product in the NumPy scan
+SCAN_BLOCK_ROWS = 4_096
+
+
+def _normalize(embedding: Sequence[float]) -> np.ndarray:
+    """Return embedding as a unit-length float32 vector."""
+    vector = np.asarray(embedding, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _quantize(vector: np.ndarray) -> Tuple[np.ndarray, np.float32]:
+    """Symmetric int8 quantization: vector ~= codes * scale."""
+    peak = float(np.max(np.abs(vector))) if vector.size else 0.0
+    scale = np.float32(peak / 127 if peak else 1.0)
+    codes = np.round(vector / scale).astype(np.int8)
+    return codes, scale
+
+
+@dataclass
+class CacheEntry:
+    """A cached response and when it was stored (epoch seconds)."""
+    response: Dict[str, Any]
+    created_at: float
+
+
+class SemanticCache:
+    """
+    In-memory semantic cache of question embeddings -> responses.
+
+    Thread-safe: lookups and inserts take a lock, so one instance can be
+    shared module-wide. Entries are kept in LRU order (a hit refreshes
+    recency); expired entries are dropped when a lookup lands on them.
+
+    Example:
+        cache = SemanticCache()
+        hit = cache.lookup(embedding)
+        if hit is None:
+            response = answer(question)
+            cache.insert(embedding, response)
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        initial_capacity: int = 256,
+        use_hnsw: Optional[bool] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: Optional[float] = DEFAULT_TTL
+    ):
+        """
+        Create the cache, loading saved entries when ``path`` exists.
+
+        Args:
+            path: SQLite file used by load()/save() (None = memory only)
+            threshold: Minimum cosine similarity for a hit (default 0.85)
+            initial_capacity: Rows allocated before the first resize
+            use_hnsw: Index lookups with HNSW (default: when hnswlib is installed)
+            max_entries: Entries kept before the least recently used is evicted
+            ttl: Seconds an entry stays valid (None = never expires)
+        """
+        self.path = Path(path) if path else None
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._initial_capacity = initial_capacity
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._live: Optional[np.ndarray] = None
+        # Row index -> entry, least recently used first
+        self._entries: "OrderedDict[int, CacheEntry]" = OrderedDict()
+        self._rows_used = 0
+        self._free_rows: List[int] = []
+        self._lock = threading.Lock()
+        self.use_hnsw = hnswlib is not None if use_hnsw is None else use_hnsw
+        self._index = None
+        # Rows whose HNSW node is marked deleted
+        self._index_deleted: Set[int] = set()
+
+        if self.path and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(
+        self,
+        embedding: Sequence[float],
+        tau: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find the cached response for the most similar question.
+
+        Args:
+            embedding: Query embedding
+            tau: Similarity threshold (defaults to self.threshold)
+
+        Returns:
+            Copy of the cached response with ``cache_similarity`` added,
+            or None if nothing is similar enough
+        """
+        threshold = self.threshold if tau is None else tau
+        query = _normalize(embedding)
+
+        with self._lock:
+            count = len(self._entries)
+            if count == 0:
+                return None
+            if self._index is not None and count >= ANN_MIN_ENTRIES:
+                labels, distances = self._index.knn_query(query, k=1)
+                best = int(labels[0][0])
+                score = 1.0 - float(distances[0][0])
+            else:
+                best, score = self._scan(query)
+            if score < threshold:
+                return None
+
+            entry = self._entries[best]
+            if self._expired(entry, time.time()):
+                self._remove(best)
+                return None
+            self._entries.move_to_end(best)
+            return {**entry.response, "cache_similarity": score}
+
+    def _expired(self, entry: CacheEntry, now: float) -> bool:
+        return self.ttl is not None and now - entry.created_at >= self.ttl
+
+    def _scan(self, query: np.ndarray) -> Tuple[int, float]:
+        """Linear top-1 search over the live quantized rows."""
+        rows = self._rows_used
+        q_codes, q_scale = _quantize(query)
+        if NUMBA_AVAILABLE:
+            best, score = top1_cosine(
+                self._codes, self._scales, q_codes, q_scale, rows, query.shape[0]
+            )
+            # Freed rows are zeroed (score 0); only rescan if one still won
+            if self._live[best]:
+                return int(best), float(score)
+
+        # Dequantize in blocks so the float32 temporary stays small
+        q_values = q_codes.astype(np.float32) * q_scale
+        scores = np.empty(rows, dtype=np.float32)
+        for start in range(0, rows, SCAN_BLOCK_ROWS):
+            end = min(start + SCAN_BLOCK_ROWS, rows)
+            block = self._codes[start:end].astype(np.float32)
+            scores[start:end] = (block @ q_values) * self._scales[start:end]
+        scores[~self._live[:rows]] = -np.inf
+        best = int(np.argmax(scores))
+        return best, float(scores[best])
+
+    def insert(self, embedding: Sequence[float], response: Dict[str, Any]) -> None:
+        """
+        Add a question embedding and its response.
+
+        Args:
+            embedding: Question embedding
+            response: JSON-serializable response to return on later hits
+        """
+        with self._lock:
+            self._insert(_normalize(embedding), response, time.time())
+
+    def _insert(self, vector: np.ndarray, response: Dict[str, Any], created_at: float) -> None:
+        """Store one entry in a free row, evicting the LRU entry when full."""
+        while len(self._entries) >= self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+        row = self._free_rows.pop() if self._free_rows else self._new_row(vector.shape[0])
+        codes, scale = _quantize(vector)
+        self._codes[row] = codes
+        self._scales[row] = scale
+        self._live[row] = True
+        self._entries[row] = CacheEntry(response, created_at)
+        if self.use_hnsw:
+            self._index_add(vector, row)
+
+    def _new_row(self, dim: int) -> int:
+        """Claim the next unused row, allocating or doubling the matrix."""
+        rows = self._rows_used
+        if self._codes is None:
+            self._codes = np.zeros((self._initial_capacity, dim), dtype=np.int8)
+            self._scales = np.zeros(self._initial_capacity, dtype=np.float32)
+            self._live = np.zeros(self._initial_capacity, dtype=bool)
+        elif rows == self._codes.shape[0]:
+            grown = np.zeros((rows * 2, dim), dtype=np.int8)
+            grown[:rows] = self._codes
+            self._codes = grown
+            self._scales = np.resize(self._scales, rows * 2)
+            self._live = np.resize(self._live, rows * 2)
+            self._live[rows:] = False
+        self._rows_used += 1
+        return rows
+
+    def _remove(self, row: int) -> None:
+        """Drop the entry in row and free the row for reuse."""
+        del self._entries[row]
+        self._codes[row] = 0
+        self._scales[row] = 0
+        self._live[row] = False
+        self._free_rows.append(row)
+        if self._index is not None:
+            self._index.mark_deleted(row)
+            self._index_deleted.add(row)
+            dead = len(self._index_deleted) / self._index.get_current_count()
+            if dead > HNSW_REBUILD_DELETED_FRACTION:
+                self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        """Rebuild the HNSW index from live rows (dropping deleted nodes)."""
+        self._index = None
+        self._index_deleted = set()
+        for row in self._entries:
+            self._index_add(self._codes[row].astype(np.float32) * self._scales[row], row)
+
+    def _index_add(self, vector: np.ndarray, label: int) -> None:
+        """Add one vector to the HNSW index, creating or resizing it as needed."""
+        if self._index is None:
+            self._index = hnswlib.Index(space='cosine', dim=vector.shape[0])
+            self._index.init_index(
+                max_elements=HNSW_MAX_ELEMENTS,
+                M=HNSW_M,
+                ef_construction=HNSW_EF_CONSTRUCTION
+            )
+            self._index.set_ef(HNSW_EF_SEARCH)
+        elif label >= self._index.get_max_elements():
+            self._index.resize_index(self._index.get_max_elements() * 2)
+        # Re-adding a deleted label updates its node and unmarks it
+        self._index_deleted.discard(label)
+        self._index.add_items(vector[np.newaxis], [label])
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._codes = None
+            self._scales = None
+            self._live = None
+            self._entries = OrderedDict()
+            self._rows_used = 0
+            self._free_rows = []
+            self._index = None
+            self._index_deleted = set()
+
+    def save(self, path: Optional[Union[str, Path]] = None) -> None:
+        """
+        Write all entries to SQLite (in LRU order), replacing the file's contents.
+
+        Args:
+            path: Target file (defaults to self.path)
+        """
+        target = Path(path) if path else self.path
+        if target is None:
+            return
+
+        with self._lock:
+            # Saved dequantized; re-quantizing on load gives the same codes
+            rows = [
+                (
+                    (self._codes[row].astype(np.float32) * self._scales[row]).tobytes(),
+                    dumps_json(entry.response, indent=False),
+                    entry.created_at
+                )
+                for row, entry in self._entries.items()
+            ]
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(target))
+        try:
+            with conn:
+                conn.execute("DROP TABLE IF EXISTS entries")
+                conn.execute(
+                    "CREATE TABLE entries ("
+                    "id INTEGER PRIMARY KEY, embedding BLOB NOT NULL, response TEXT NOT NULL, "
+                    "created_at REAL NOT NULL)"
+                )
+                conn.executemany(
+                    "INSERT INTO entries (embedding, response, created_at) VALUES (?, ?, ?)",
+                    rows
+                )
+        finally:
+            conn.close()
+
+    def load(self, path: Optional[Union[str, Path]] = None) -> None:
+        """
+        Replace the in-memory entries with those saved in SQLite.
+
+        Expired entries are skipped; files written before entries carried
+        a timestamp load as empty.
+
+        Args:
+            path: Source file (defaults to self.path)
+        """
+        source = Path(path) if path else self.path
+        conn = sqlite3.connect(str(source))
+        try:
+            rows = conn.execute(
+                "SELECT embedding, response, created_at FROM entries ORDER BY id"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        finally:
+            conn.close()
+
+        self.clear()
+        now = time.time()
+        with self._lock:
+            for blob, response, created_at in rows:
+                entry = CacheEntry(loads_json(response), created_at)
+                if not self._expired(entry, now):
+                    self._insert(
+                        _normalize(np.frombuffer(blob, dtype=np.float32)),
+                        entry.response,
+                        created_at
+                    )
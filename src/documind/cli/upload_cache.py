@@ -0,0 +1,143 @@
+"""
+Upload Cache - Skip re-processing files that were already uploaded.
+
+Keeps a small SQLite database (default ``~/.documind/upload_cache.sqlite``)
+mapping file content hashes to the DocuMind document they produced, so
+re-running the upload CLI over the same files skips parsing, embedding and
+upload entirely.
+
+Two tables are kept:
+- ``file_stats``: path -> (size, mtime_ns, file_hash). Lets unchanged files
+  skip hashing; any size or mtime change invalidates the entry.
+- ``uploads``: file_hash -> document_id and summary stats of the upload.
+
+The database runs in WAL mode, so concurrent CLI runs sharing the cache
+can read while another is writing.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+DEFAULT_CACHE_PATH = Path.home() / ".documind" / "upload_cache.sqlite"
+
+
+class UploadCache:
+    """
+    Content-addressed cache of completed uploads.
+
+    One connection per instance, shared across threads and serialized by a
+    lock; do expensive hashing outside the cache.
+
+    Example:
+        cache = UploadCache()
+        file_hash = cache.cached_hash(path) or file_hash(path)
+        cache.remember_hash(path, file_hash)
+        hit = cache.get(file_hash, with_embeddings=True)
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_CACHE_PATH):
+        """
+        Open (and create if needed) the cache database.
+
+        Args:
+            path: SQLite database file location
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA mmap_size = 268435456;
+            PRAGMA temp_store = MEMORY;
+        """)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS file_stats (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                file_hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS uploads (
+                file_hash TEXT PRIMARY KEY,
+                document_id TEXT NOT NULL,
+                has_embeddings INTEGER NOT NULL,
+                chunks_written INTEGER NOT NULL DEFAULT 0,
+                format TEXT,
+                words INTEGER,
+                chunks INTEGER,
+                uploaded_at TEXT NOT NULL
+            );
+        """)
+
+    def cached_hash(self, file_path: Union[str, Path]) -> Optional[str]:
+        """Return the stored hash for a file if its size and mtime are unchanged."""
+        path = Path(file_path).resolve()
+        stat = path.stat()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, file_hash FROM file_stats WHERE path = ?",
+                (str(path),)
+            ).fetchone()
+        if row and row["size"] == stat.st_size and row["mtime_ns"] == stat.st_mtime_ns:
+            return row["file_hash"]
+        return None
+
+    def remember_hash(self, file_path: Union[str, Path], file_hash: str) -> None:
+        """Store a file's hash alongside its current size and mtime."""
+        path = Path(file_path).resolve()
+        stat = path.stat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_stats (path, size, mtime_ns, file_hash) VALUES (?, ?, ?, ?)",
+                (str(path), stat.st_size, stat.st_mtime_ns, file_hash)
+            )
+
+    def get(self, file_hash: str, with_embeddings: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Look up a previous upload of identical content.
+
+        Args:
+            file_hash: Content hash of the file
+            with_embeddings: Only match uploads that stored embeddings
+
+        Returns:
+            Dict with the cached upload details, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM uploads WHERE file_hash = ?", (file_hash,)
+            ).fetchone()
+        if row is None or (with_embeddings and not row["has_embeddings"]):
+            return None
+        return dict(row)
+
+    def put(
+        self,
+        file_hash: str,
+        document_id: str,
+        has_embeddings: bool,
+        chunks_written: int = 0,
+        format: Optional[str] = None,
+        words: Optional[int] = None,
+        chunks: Optional[int] = None
+    ) -> None:
+        """Record a successful upload."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO uploads
+                   (file_hash, document_id, has_embeddings, chunks_written, format, words, chunks, uploaded_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (file_hash, str(document_id), int(has_embeddings), chunks_written,
+                 format, words, chunks, datetime.now(timezone.utc).isoformat())
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
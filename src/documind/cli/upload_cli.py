@@ -16,13 +16,19 @@ Usage:
 """
 
 import argparse
+import asyncio
+import contextlib
 import sys
+import threading
 import time
-import json
 import os
+from collections import deque
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterator, List, Dict, Any, Optional, TextIO, Tuple
+
+import httpx
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
@@ -31,6 +37,11 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from src.documind.processor import DocumentProcessor
+from src.documind.cli.upload_cache import UploadCache
+from src.documind.utils.hashing import file_hash
+from src.documind.utils.json_io import dumps_json
+from src.documind.net import shared_http_client
+from src.documind.utils.compression import compress_content, compression_enabled
 
 
 # ANSI colors for terminal output
@@ -44,34 +55,175 @@ class Colors:
     END = '\033[0m'
 
 
-# Lazy-loaded clients
-_openai_client = None
-_supabase_client = None
-
-
+class ProgressReporter:
+    """Buffers progress lines and writes them to the terminal in batches.
+
+    ``push`` only appends to a deque, so the event loop never blocks on a
+    slow or contended stdout. A daemon thread running ``drain`` writes
+    whatever has accumulated every ``interval`` seconds with a single
+    ``write`` + ``flush``. Call ``close`` before printing anything else so
+    remaining lines come out first and in order.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, interval: float = 0.1):
+        self.stream = stream or sys.stdout
+        self.interval = interval
+        self._lines: deque = deque()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ProgressReporter":
+        self._thread = threading.Thread(target=self.drain, daemon=True)
+        self._thread.start()
+        return self
+
+    def push(self, line: str) -> None:
+        self._lines.append(line + "\n")
+
+    def flush(self) -> None:
+        lines = []
+        while self._lines:
+            lines.append(self._lines.popleft())
+        if lines:
+            self.stream.write("".join(lines))
+            self.stream.flush()
+
+    def drain(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+
+
+# Lazy-loaded clients, created once per process. generate_embeddings runs
+# in worker threads, so an lru_cache'd factory (rather than a check-then-set
+# global) keeps every thread on one OpenAI client and connection pool.
+@lru_cache(maxsize=1)
 def get_openai_client():
     """Get or create OpenAI client."""
-    global _openai_client
-    if _openai_client is None:
-        from openai import OpenAI
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not set")
-        _openai_client = OpenAI(api_key=api_key)
-    return _openai_client
-
-
-def get_supabase_client():
-    """Get or create Supabase client."""
-    global _supabase_client
-    if _supabase_client is None:
-        from supabase import create_client
-        url = os.getenv("SUPABASE_URL")
-        key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
-        if not url or not key:
-            raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY not set")
-        _supabase_client = create_client(url, key)
-    return _supabase_client
+    from openai import OpenAI
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not set")
+    return OpenAI(api_key=api_key, http_client=shared_http_client())
+
+
+@lru_cache(maxsize=1)
+def get_supabase_rest_config() -> Tuple[str, Dict[str, str]]:
+    """Get Supabase REST base URL and auth headers (read from the env once)."""
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+    if not url or not key:
+        raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY not set")
+    headers = {
+        "apikey": key,
+        "Authorization": f"Bearer {key}",
+        "Content-Type": "application/json",
+        "Prefer": "return=representation",
+    }
+    return f"{url.rstrip('/')}/rest/v1", headers
+
+
+def create_http_client(max_connections: int) -> httpx.AsyncClient:
+    """Create a pooled async HTTP client for the Supabase REST API.
+
+    One client is shared by every upload in a run so connections (and their
+    TLS sessions) are reused instead of re-established per document.
+    """
+    base_url, headers = get_supabase_rest_config()
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        http2=True,
+        limits=httpx.Limits(max_connections=max_connections),
+        timeout=60.0,
+    )
+
+
+class DocumentInsertBatcher:
+    """Coalesce concurrent document inserts into bulk REST calls.
+
+    Callers await insert(row) as usual; rows are buffered and flushed as a
+    single list insert once max_batch rows are queued or max_wait seconds
+    have passed since the first one, whichever comes first.
+
+    Example:
+        async with DocumentInsertBatcher(client) as batcher:
+            row = await batcher.insert({"title": "doc.pdf", ...})
+    """
+
+    def __init__(self, client: httpx.AsyncClient, max_batch: int = 100, max_wait: float = 0.05):
+        self.client = client
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "DocumentInsertBatcher":
+        self._worker = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._worker:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+
+    async def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a document row and wait for its inserted representation."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            response = await self.client.post("/documents", json=[row for row, _ in batch])
+            response.raise_for_status()
+            rows = response.json() or []
+            if len(rows) != len(batch):
+                raise ValueError(f"Bulk insert returned {len(rows)} rows for {len(batch)} documents")
+        except httpx.HTTPStatusError as e:
+            # A constraint violation fails the whole statement; retry rows
+            # individually so only the offending document is reported
+            if e.response.status_code == 409 and len(batch) > 1:
+                for item in batch:
+                    await self._flush([item])
+                return
+            self._fail(batch, e)
+            return
+        except Exception as e:
+            self._fail(batch, e)
+            return
+
+        # PostgREST returns inserted rows in request order
+        for (_, future), row in zip(batch, rows):
+            if not future.done():
+                future.set_result(row)
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Dict[str, Any], asyncio.Future]], error: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
 
 
 def generate_embeddings(texts: List[str], batch_size: int = 50) -> List[List[float]]:
@@ -90,11 +242,19 @@ def generate_embeddings(texts: List[str], batch_size: int = 50) -> List[List[flo
     return all_embeddings
 
 
-def upload_to_documind(processed_doc, generate_emb: bool = True) -> dict:
-    """Upload document with embeddings to DocuMind."""
-    try:
-        client = get_supabase_client()
+async def upload_to_documind(
+    processed_doc,
+    client: httpx.AsyncClient,
+    generate_emb: bool = True,
+    batcher: Optional[DocumentInsertBatcher] = None
+) -> dict:
+    """Upload document with embeddings to DocuMind.
 
+    When a batcher is given, the document row is inserted through it so
+    concurrent uploads share bulk inserts; chunks are still written per
+    document since they need the new document id.
+    """
+    try:
         # Prepare document metadata
         metadata = {
             "fingerprint": processed_doc.metadata.fingerprint,
@@ -106,17 +266,28 @@ def upload_to_documind(processed_doc, generate_emb: bool = True) -> dict:
         }
 
         # Insert document into documents table
-        doc_result = client.table("documents").insert({
+        doc_row = {
             "title": processed_doc.file_name,
             "content": processed_doc.content,
             "file_type": processed_doc.extractor_used,
             "metadata": metadata
-        }).execute()
+        }
+        if compression_enabled():
+            # Full text goes over the wire zstd-compressed; chunks stay
+            # plaintext for embeddings and full-text search
+            doc_row["content"] = None
+            doc_row["content_zstd"] = compress_content(processed_doc.content)
+        if batcher:
+            inserted = await batcher.insert(doc_row)
+        else:
+            doc_response = await client.post("/documents", json=doc_row)
+            doc_response.raise_for_status()
+            inserted = (doc_response.json() or [None])[0]
 
-        if not doc_result.data:
+        if not inserted:
             return {"success": False, "error": "Document insert failed", "title": processed_doc.file_name}
 
-        doc_id = doc_result.data[0].get("id")
+        doc_id = inserted.get("id")
         chunks_written = 0
 
         # Generate embeddings and store chunks
@@ -124,8 +295,8 @@ def upload_to_documind(processed_doc, generate_emb: bool = True) -> dict:
             # Extract chunk texts
             chunk_texts = [chunk.content for chunk in processed_doc.chunks]
 
-            # Generate embeddings
-            embeddings = generate_embeddings(chunk_texts)
+            # Generate embeddings (sync OpenAI client, kept off the event loop)
+            embeddings = await asyncio.to_thread(generate_embeddings, chunk_texts)
 
             # Prepare chunk records
             chunk_records = []
@@ -144,9 +315,9 @@ def upload_to_documind(processed_doc, generate_emb: bool = True) -> dict:
 
             # Batch insert chunks
             if chunk_records:
-                chunk_result = client.table("document_chunks").insert(chunk_records).execute()
-                if chunk_result.data:
-                    chunks_written = len(chunk_result.data)
+                chunk_response = await client.post("/document_chunks", json=chunk_records)
+                chunk_response.raise_for_status()
+                chunks_written = len(chunk_response.json() or [])
 
         return {
             "success": True,
@@ -159,20 +330,87 @@ def upload_to_documind(processed_doc, generate_emb: bool = True) -> dict:
         return {"success": False, "error": str(e), "title": getattr(processed_doc, 'file_name', 'unknown')}
 
 
-def process_and_upload(file_path: str, processor: DocumentProcessor, generate_emb: bool = True) -> Dict[str, Any]:
-    """Process a single document and upload to DocuMind with embeddings."""
+# Per-worker-process DocumentProcessor, set by the pool initializer. The
+# processor is pickled once per worker at pool start instead of once per
+# submitted file.
+_worker_processor: Optional[DocumentProcessor] = None
+
+
+def _init_parse_worker(processor: DocumentProcessor) -> None:
+    """ProcessPoolExecutor initializer: keep this worker's processor."""
+    global _worker_processor
+    _worker_processor = processor
+
+
+def _parse_document(file_path: str):
+    """Parse one file with the worker's processor (runs in the pool)."""
+    return _worker_processor.process_document(file_path)
+
+
+async def process_and_upload(
+    file_path: str,
+    client: httpx.AsyncClient,
+    executor: Executor,
+    generate_emb: bool = True,
+    batcher: Optional[DocumentInsertBatcher] = None,
+    cache: Optional[UploadCache] = None,
+    upload_slots: Optional[asyncio.Semaphore] = None
+) -> Dict[str, Any]:
+    """Process a single document and upload to DocuMind with embeddings.
+
+    With a cache, files whose content was already uploaded are skipped
+    before parsing and reported with ``"cached": True``. With
+    ``upload_slots``, the upload step waits for a free slot, so at most
+    that many documents upload at once (parsing is not limited).
+    """
     start = time.time()
     path = Path(file_path)
+    loop = asyncio.get_running_loop()
 
     try:
-        # Process document
-        result = processor.process_document(str(path))
+        # Skip unchanged files that were already uploaded
+        content_hash = None
+        if cache:
+            content_hash = cache.cached_hash(path)
+            if content_hash is None:
+                content_hash = await asyncio.to_thread(file_hash, path)
+                cache.remember_hash(path, content_hash)
+
+            hit = cache.get(content_hash, with_embeddings=generate_emb)
+            if hit:
+                return {
+                    "file": path.name,
+                    "success": True,
+                    "cached": True,
+                    "document_id": hit["document_id"],
+                    "chunks_written": 0,
+                    "format": hit["format"],
+                    "words": hit["words"],
+                    "chunks": hit["chunks"],
+                    "time": time.time() - start,
+                    "error": None
+                }
+
+        # Process document (CPU-bound, runs in the executor)
+        result = await loop.run_in_executor(executor, _parse_document, str(path))
 
         # Upload to DocuMind with embeddings
-        upload_result = upload_to_documind(result, generate_emb=generate_emb)
+        async with upload_slots or contextlib.nullcontext():
+            upload_result = await upload_to_documind(result, client, generate_emb=generate_emb, batcher=batcher)
 
         elapsed = time.time() - start
 
+        if cache and upload_result.get("success"):
+            cache.put(
+                content_hash,
+                upload_result["document_id"],
+                has_embeddings=generate_emb,
+                chunks_written=upload_result.get("chunks_written", 0),
+                format=result.extractor_used,
+                words=result.metadata.basic.word_count,
+                chunks=len(result.chunks)
+            )
+
         return {
             "file": path.name,
             "success": upload_result.get("success", False),
@@ -194,31 +432,111 @@ def process_and_upload(file_path: str, processor: DocumentProcessor, generate_em
         }
 
 
+async def process_only(file_path: str, executor: Executor) -> Dict[str, Any]:
+    """Process a single document without uploading (dry run)."""
+    loop = asyncio.get_running_loop()
+    try:
+        doc = await loop.run_in_executor(executor, _parse_document, file_path)
+        return {
+            "file": Path(file_path).name,
+            "success": True,
+            "format": doc.extractor_used,
+            "words": doc.metadata.basic.word_count,
+            "chunks": len(doc.chunks),
+            "fingerprint": doc.metadata.fingerprint[:16]
+        }
+    except Exception as e:
+        return {"file": Path(file_path).name, "success": False, "error": str(e)}
+
+
+async def run_batch(
+    files: List[str],
+    processor: DocumentProcessor,
+    workers: int,
+    dry_run: bool = False,
+    generate_emb: bool = True,
+    on_result=None,
+    parse_workers: Optional[int] = None,
+    cache: Optional[UploadCache] = None
+) -> List[Dict[str, Any]]:
+    """Process (and optionally upload) files concurrently.
+
+    Parsing is CPU-bound and runs on a process pool (one process per core by
+    default) so it is not serialized by the GIL; each worker receives a copy
+    of ``processor`` once, at pool start. Uploads overlap on a single
+    shared async HTTP client, and each file starts uploading as soon as its
+    own parse finishes (at most ``workers`` at a time), with document rows
+    coalesced into bulk inserts. ``on_result(index, result)`` is called as each file completes. Files
+    found in ``cache`` are skipped (uploads only, not dry runs).
+    """
+    results = []
+
+    async with contextlib.AsyncExitStack() as stack:
+        executor = stack.enter_context(
+            ProcessPoolExecutor(
+                max_workers=parse_workers or os.cpu_count(),
+                initializer=_init_parse_worker,
+                initargs=(processor,)
+            )
+        )
+        if dry_run:
+            tasks = [process_only(f, executor) for f in files]
+        else:
+            client = await stack.enter_async_context(create_http_client(workers * 4))
+            batcher = await stack.enter_async_context(DocumentInsertBatcher(client))
+            upload_slots = asyncio.Semaphore(workers)
+            tasks = [
+                process_and_upload(f, client, executor, generate_emb, batcher, cache, upload_slots)
+                for f in files
+            ]
+
+        for i, task in enumerate(asyncio.as_completed(tasks), 1):
+            result = await task
+            results.append(result)
+            if on_result:
+                on_result(i, result)
+
+    return results
+
+
+# Extensions the processor can handle (checked once per directory entry)
+SUPPORTED_EXTENSIONS = frozenset({'.pdf', '.docx', '.csv', '.xlsx', '.txt', '.md', '.markdown'})
+
+
+def _walk_supported(root: str, recursive: bool) -> Iterator[str]:
+    """Yield supported files under root in a single scandir traversal."""
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS:
+                        yield entry.path
+        except OSError:
+            # Unreadable directory: skip it like glob would
+            continue
+
+
 def collect_files(paths: List[str], directory: str = None, recursive: bool = False) -> List[str]:
     """Collect all files to process."""
     files = []
 
-    # Supported extensions
-    supported = {'.pdf', '.docx', '.csv', '.xlsx', '.txt', '.md', '.markdown'}
-
     # Add files from directory
-    if directory:
-        dir_path = Path(directory)
-        if dir_path.is_dir():
-            pattern = '**/*' if recursive else '*'
-            for ext in supported:
-                files.extend([str(f) for f in dir_path.glob(f'{pattern}{ext}')])
+    if directory and os.path.isdir(directory):
+        files.extend(_walk_supported(directory, recursive))
 
     # Add individual files
     for path in paths:
-        p = Path(path)
-        if p.is_file() and p.suffix.lower() in supported:
-            files.append(str(p))
-        elif p.is_dir():
-            for ext in supported:
-                files.extend([str(f) for f in p.glob(f'*{ext}')])
+        if os.path.isfile(path) and os.path.splitext(path)[1].lower() in SUPPORTED_EXTENSIONS:
+            files.append(path)
+        elif os.path.isdir(path):
+            files.extend(_walk_supported(path, recursive=False))
 
-    return list(set(files))  # Remove duplicates
+    # Remove duplicates, keeping first-seen order
+    return list(dict.fromkeys(os.path.normpath(f) for f in files))
 
 
 def main():
@@ -237,9 +555,12 @@ Examples:
     parser.add_argument('files', nargs='*', help='Files to upload')
     parser.add_argument('--dir', '-d', help='Directory to scan for documents')
     parser.add_argument('--recursive', '-r', action='store_true', help='Scan directory recursively')
-    parser.add_argument('--workers', '-w', type=int, default=4, help='Parallel workers (default: 4)')
+    parser.add_argument('--workers', '-w', type=int, default=4, help='Parallel upload workers (default: 4)')
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help='Processes used for parsing (default: CPU count)')
     parser.add_argument('--dry-run', action='store_true', help='Process without uploading')
     parser.add_argument('--no-embeddings', action='store_true', help='Skip embedding generation (faster, but no RAG search)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-upload files even if unchanged since last upload')
     parser.add_argument('--json', action='store_true', help='Output results as JSON')
     parser.add_argument('--quiet', '-q', action='store_true', help='Minimal output')
 
@@ -255,6 +576,13 @@ Examples:
 
     generate_emb = not args.no_embeddings
 
+    if not args.dry_run:
+        try:
+            get_supabase_rest_config()
+        except ValueError as e:
+            print(f"{Colors.RED}Error: {e}{Colors.END}")
+            sys.exit(1)
+
     if not args.quiet:
         print(f"\n{Colors.BOLD}📤 DocuMind Upload CLI{Colors.END}")
         print(f"{'=' * 50}")
@@ -268,56 +596,48 @@ Examples:
     # Initialize processor
     processor = DocumentProcessor(auto_upload=False)
 
-    # Process files in parallel
-    results = []
-    start_time = time.time()
-
-    with ThreadPoolExecutor(max_workers=args.workers) as executor:
-        if args.dry_run:
-            # Just process without upload
-            futures = {
-                executor.submit(processor.process_document, f): f
-                for f in files
-            }
+    # Progress lines are batched off the event loop; --json/--quiet skip them
+    reporter = None if (args.quiet or args.json) else ProgressReporter().start()
+
+    def report(i: int, result: Dict[str, Any]) -> None:
+        if reporter is None:
+            return
+        status = f"{Colors.GREEN}✓{Colors.END}" if result.get("success") else f"{Colors.RED}✗{Colors.END}"
+        name = result["file"][:40]
+        if result.get("success"):
+            words = result.get("words", 0)
+            fmt = result.get("format", "?")
+            emb_count = result.get("chunks_written", 0)
+            emb_info = f" [{emb_count} emb]" if emb_count > 0 else ""
+            if result.get("cached"):
+                emb_info = f" {Colors.CYAN}[cached]{Colors.END}"
+            reporter.push(f"  {status} [{i}/{len(files)}] {name:<40} {fmt:<5} {words:>5} words{emb_info}")
         else:
-            futures = {
-                executor.submit(process_and_upload, f, processor, generate_emb): f
-                for f in files
-            }
-
-        for i, future in enumerate(as_completed(futures), 1):
-            file_path = futures[future]
-
-            try:
-                if args.dry_run:
-                    doc = future.result()
-                    result = {
-                        "file": Path(file_path).name,
-                        "success": True,
-                        "format": doc.extractor_used,
-                        "words": doc.metadata.basic.word_count,
-                        "chunks": len(doc.chunks),
-                        "fingerprint": doc.metadata.fingerprint[:16]
-                    }
-                else:
-                    result = future.result()
-            except Exception as e:
-                result = {"file": Path(file_path).name, "success": False, "error": str(e)}
+            error = (result.get("error") or "Unknown error")[:50]
+            reporter.push(f"  {status} [{i}/{len(files)}] {name:<40} {Colors.RED}{error}{Colors.END}")
 
-            results.append(result)
+    # Cache of previous uploads (skips unchanged files)
+    cache = None if (args.dry_run or args.no_cache) else UploadCache()
+
+    # Process files in parallel
+    start_time = time.time()
 
-            if not args.quiet and not args.json:
-                status = f"{Colors.GREEN}✓{Colors.END}" if result.get("success") else f"{Colors.RED}✗{Colors.END}"
-                name = result["file"][:40]
-                if result.get("success"):
-                    words = result.get("words", 0)
-                    fmt = result.get("format", "?")
-                    emb_count = result.get("chunks_written", 0)
-                    emb_info = f" [{emb_count} emb]" if emb_count > 0 else ""
-                    print(f"  {status} [{i}/{len(files)}] {name:<40} {fmt:<5} {words:>5} words{emb_info}")
-                else:
-                    error = result.get("error", "Unknown error")[:50]
-                    print(f"  {status} [{i}/{len(files)}] {name:<40} {Colors.RED}{error}{Colors.END}")
+    try:
+        results = asyncio.run(run_batch(
+            files,
+            processor,
+            workers=args.workers,
+            dry_run=args.dry_run,
+            generate_emb=generate_emb,
+            on_result=report,
+            parse_workers=args.parse_workers,
+            cache=cache
+        ))
+    finally:
+        if reporter:
+            reporter.close()
+        if cache:
+            cache.close()
 
     total_time = time.time() - start_time
 
@@ -333,7 +653,7 @@ Examples:
             "time_seconds": round(total_time, 2),
             "results": results
         }
-        print(json.dumps(output, indent=2))
+        print(dumps_json(output))
     elif not args.quiet:
         print()
         print(f"{'=' * 50}")
@@ -2,9 +2,13 @@
 DocuMind Configuration
 
 Environment variables and application settings.
+
+The environment is read once at import time into a frozen Settings
+snapshot; the module-level names below are views of that snapshot.
 """
 
 import os
+from dataclasses import dataclass, fields
 from typing import Optional
 
 
@@ -13,25 +17,57 @@ def get_env(key: str, default: Optional[str] = None) -> Optional[str]:
     return os.getenv(key, default)
 
 
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Configuration values; field names are the env var names in lowercase."""
+
+    # API Keys
+    anthropic_api_key: Optional[str] = None
+    openai_api_key: Optional[str] = None
+    openrouter_api_key: Optional[str] = None
+
+    # Database (Session 4+)
+    supabase_url: Optional[str] = None
+    supabase_anon_key: Optional[str] = None
+    supabase_service_key: Optional[str] = None
+
+    # Application Settings
+    debug: bool = False
+    log_level: str = "INFO"
+
+    @classmethod
+    def from_environ(cls, environ=os.environ) -> "Settings":
+        """Build settings from a single pass over the environment."""
+        values = {}
+        for f in fields(cls):
+            raw = environ.get(f.name.upper())
+            if raw is None:
+                continue
+            values[f.name] = raw.lower() == "true" if f.type is bool else raw
+        return cls(**values)
+
+
+settings = Settings.from_environ()
+
 # API Keys
-ANTHROPIC_API_KEY = get_env("ANTHROPIC_API_KEY")
-OPENAI_API_KEY = get_env("OPENAI_API_KEY")
-OPENROUTER_API_KEY = get_env("OPENROUTER_API_KEY")
+ANTHROPIC_API_KEY = settings.anthropic_api_key
+OPENAI_API_KEY = settings.openai_api_key
+OPENROUTER_API_KEY = settings.openrouter_api_key
 
 # Database (Session 4+)
-SUPABASE_URL = get_env("SUPABASE_URL")
-SUPABASE_ANON_KEY = get_env("SUPABASE_ANON_KEY")
-SUPABASE_SERVICE_KEY = get_env("SUPABASE_SERVICE_KEY")
+SUPABASE_URL = settings.supabase_url
+SUPABASE_ANON_KEY = settings.supabase_anon_key
+SUPABASE_SERVICE_KEY = settings.supabase_service_key
 
 # Application Settings
-DEBUG = get_env("DEBUG", "false").lower() == "true"
-LOG_LEVEL = get_env("LOG_LEVEL", "INFO")
+DEBUG = settings.debug
+LOG_LEVEL = settings.log_level
 
 
 def validate_config() -> bool:
     """Validate that required configuration is present."""
     required = ["ANTHROPIC_API_KEY"]
-    missing = [key for key in required if not get_env(key)]
+    missing = [key for key in required if not getattr(settings, key.lower())]
 
     if missing:
         print(f"Missing required environment variables: {missing}")
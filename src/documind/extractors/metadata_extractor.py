@@ -12,19 +12,29 @@ import hashlib
 class MetadataExtractor:
     """Extract and enrich document metadata"""
 
-    def extract_basic_metadata(self, file_path: str, content: str) -> Dict:
+    def extract_basic_metadata(self, file_path: str, content: str,
+                               file_size: Optional[int] = None) -> Dict:
         """
         Extract basic filesystem and content metadata.
 
         Args:
             file_path: Path to file
             content: Extracted text content
+            file_size: Size of an in-memory file; when given, file_path is
+                only a name and the filesystem is not consulted
 
         Returns:
             Dictionary with metadata
         """
         path = Path(file_path)
-        stats = path.stat()
+        if file_size is None:
+            stats = path.stat()
+            file_size = stats.st_size
+            created_at = datetime.fromtimestamp(stats.st_ctime).isoformat()
+            modified_at = datetime.fromtimestamp(stats.st_mtime).isoformat()
+            file_path = str(path.absolute())
+        else:
+            created_at = modified_at = datetime.now().isoformat()
 
         # Count content statistics
         words = content.split()
@@ -32,11 +42,11 @@ class MetadataExtractor:
 
         return {
             "file_name": path.name,
-            "file_path": str(path.absolute()),
-            "file_size_bytes": stats.st_size,
+            "file_path": str(file_path),
+            "file_size_bytes": file_size,
             "file_type": path.suffix.lower(),
-            "created_at": datetime.fromtimestamp(stats.st_ctime).isoformat(),
-            "modified_at": datetime.fromtimestamp(stats.st_mtime).isoformat(),
+            "created_at": created_at,
+            "modified_at": modified_at,
             "word_count": len(words),
             "character_count": len(content),
             "line_count": len(lines),
@@ -183,7 +193,8 @@ class MetadataExtractor:
         return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
     def extract_all(self, file_path: str, content: str,
-                   format_metadata: Optional[Dict] = None) -> Dict:
+                   format_metadata: Optional[Dict] = None,
+                   file_size: Optional[int] = None) -> Dict:
         """
         Extract all metadata from a document.
 
@@ -191,12 +202,13 @@ class MetadataExtractor:
             file_path: Path to document file
             content: Extracted text content
             format_metadata: Optional format-specific metadata
+            file_size: Size of an in-memory file (see extract_basic_metadata)
 
         Returns:
             Comprehensive metadata dictionary with fingerprint
         """
         return {
-            "basic": self.extract_basic_metadata(file_path, content),
+            "basic": self.extract_basic_metadata(file_path, content, file_size),
             "structure": self.extract_structure(content),
             "entities": self.extract_entities(content),
             "topics": self.extract_topics(content),
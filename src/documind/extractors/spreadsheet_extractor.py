@@ -2,17 +2,32 @@
 Spreadsheet (.xlsx, .csv) Extraction
 """
 import pandas as pd
-from typing import Dict, List
+from typing import BinaryIO, Dict, List, Union
 from pathlib import Path
 
+# A filesystem path, or an in-memory file object with a ``name`` attribute
+SpreadsheetSource = Union[str, BinaryIO]
+
+
+def _source_name(source: SpreadsheetSource) -> str:
+    """Return the file name used for extension checks and headings."""
+    return getattr(source, "name", source)
+
+
+def _rewind(source: SpreadsheetSource) -> SpreadsheetSource:
+    """Seek in-memory sources back to the start so they can be re-read."""
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
 class SpreadsheetExtractor:
     """Extract data from Excel and CSV files"""
 
-    def extract_excel(self, file_path: str) -> Dict:
+    def extract_excel(self, file_path: SpreadsheetSource) -> Dict:
         """Extract all sheets from Excel file"""
         try:
             # Read all sheets
-            sheets = pd.read_excel(file_path, sheet_name=None)
+            sheets = pd.read_excel(_rewind(file_path), sheet_name=None)
 
             result = {
                 "success": True,
@@ -37,10 +52,10 @@ class SpreadsheetExtractor:
                 "error": str(e)
             }
 
-    def extract_csv(self, file_path: str) -> Dict:
+    def extract_csv(self, file_path: SpreadsheetSource) -> Dict:
         """Extract data from CSV file"""
         try:
-            df = pd.read_csv(file_path)
+            df = pd.read_csv(_rewind(file_path))
 
             return {
                 "success": True,
@@ -57,16 +72,17 @@ class SpreadsheetExtractor:
                 "error": str(e)
             }
 
-    def format_for_llm(self, file_path: str) -> str:
+    def format_for_llm(self, file_path: SpreadsheetSource) -> str:
         """Format spreadsheet for LLM consumption"""
-        ext = Path(file_path).suffix.lower()
+        name = Path(_source_name(file_path)).name
+        ext = Path(name).suffix.lower()
 
         if ext == ".csv":
             result = self.extract_csv(file_path)
             if not result["success"]:
                 return ""
 
-            output = [f"# CSV Data: {Path(file_path).name}\n"]
+            output = [f"# CSV Data: {name}\n"]
             output.append(f"**Rows:** {result['rows']}")
             output.append(f"**Columns:** {', '.join(result['column_names'])}\n")
             output.append("## Data Preview\n")
@@ -79,7 +95,7 @@ class SpreadsheetExtractor:
             if not result["success"]:
                 return ""
 
-            output = [f"# Excel File: {Path(file_path).name}\n"]
+            output = [f"# Excel File: {name}\n"]
             output.append(f"**Sheets:** {result['sheet_count']}\n")
 
             for sheet_name, sheet_data in result["sheets"].items():
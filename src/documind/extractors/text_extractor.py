@@ -7,6 +7,8 @@ from typing import Dict, List, Optional, Tuple
 import re
 import logging
 
+from ..utils.file_io import read_file
+
 logger = logging.getLogger(__name__)
 
 
@@ -102,6 +104,47 @@ class TextExtractor:
                 'error': f'Extraction failed: {str(e)}'
             }
 
+    def extract_bytes(self, data: bytes, file_name: str) -> Dict:
+        """
+        Extract text from in-memory file contents (e.g. a browser upload).
+
+        Args:
+            data: Raw file bytes
+            file_name: Original file name, used for the extension check and metadata
+
+        Returns:
+            Same dictionary shape as extract()
+        """
+        path = Path(file_name)
+
+        if path.suffix.lower() not in ['.txt', '.md', '.markdown']:
+            return {
+                'success': False,
+                'text': '',
+                'metadata': {},
+                'error': f'Unsupported file type: {path.suffix}'
+            }
+
+        text, encoding, line_ending = self._decode_with_encoding_detection(bytes(data), file_name)
+        normalized_text = self._normalize_line_endings(text)
+
+        return {
+            'success': True,
+            'text': normalized_text,
+            'metadata': {
+                'file_name': path.name,
+                'file_path': file_name,
+                'file_size': len(data),
+                'encoding': encoding,
+                'line_ending': line_ending,
+                'line_count': len(normalized_text.split('\n')),
+                'char_count': len(normalized_text),
+                'word_count': len(normalized_text.split()),
+                'file_type': 'markdown' if path.suffix.lower() == '.md' else 'text'
+            },
+            'error': None
+        }
+
     def extract_with_structure(self, file_path: str) -> Dict:
         """
         Extract text preserving structure information.
@@ -136,42 +179,45 @@ class TextExtractor:
 
     def _read_with_encoding_detection(self, file_path: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         """
-        Try to read file with multiple encodings.
+        Read the file once and try decoding it with multiple encodings.
 
         Returns:
             Tuple of (text, encoding_used, line_ending_type)
         """
-        path = Path(file_path)
+        try:
+            raw = read_file(file_path)
+        except OSError as e:
+            logger.error(f"Failed to read {file_path}: {str(e)}")
+            return None, None, None
+
+        return self._decode_with_encoding_detection(raw, file_path)
 
-        # Try each encoding in priority order
+    def _decode_with_encoding_detection(self, raw: bytes, source_name: str) -> Tuple[str, str, str]:
+        """
+        Decode raw bytes, trying each supported encoding in priority order.
+
+        Returns:
+            Tuple of (text, encoding_used, line_ending_type)
+        """
         for encoding in self.ENCODINGS:
             try:
-                with open(path, 'r', encoding=encoding) as f:
-                    text = f.read()
+                text = raw.decode(encoding)
 
                 # Detect line ending type
                 line_ending = self._detect_line_ending(text)
 
-                logger.debug(f"Successfully read {file_path} with {encoding} encoding")
+                logger.debug(f"Successfully read {source_name} with {encoding} encoding")
                 return text, encoding, line_ending
 
             except (UnicodeDecodeError, UnicodeError):
-                logger.debug(f"Failed to read {file_path} with {encoding} encoding")
-                continue
-            except Exception as e:
-                logger.error(f"Unexpected error reading {file_path} with {encoding}: {str(e)}")
+                logger.debug(f"Failed to read {source_name} with {encoding} encoding")
                 continue
 
         # If all encodings fail, try with 'errors=ignore'
-        logger.warning(f"All encodings failed for {file_path}, trying with error handling")
-        try:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                text = f.read()
-            line_ending = self._detect_line_ending(text)
-            return text, 'utf-8 (with errors ignored)', line_ending
-        except Exception as e:
-            logger.error(f"Failed to read {file_path} even with error handling: {str(e)}")
-            return None, None, None
+        logger.warning(f"All encodings failed for {source_name}, trying with error handling")
+        text = raw.decode('utf-8', errors='ignore')
+        line_ending = self._detect_line_ending(text)
+        return text, 'utf-8 (with errors ignored)', line_ending
 
     def _detect_line_ending(self, text: str) -> str:
         """
@@ -197,6 +197,36 @@ class FormatDetector:
 
         return format_type, mime_type
 
+    def validate_and_detect_bytes(self, file_name: str, size: int) -> Tuple[str, str]:
+        """
+        Validation and format detection for in-memory file contents.
+
+        Applies the same size limits as validate_path; there is no path
+        to check for traversal or symlinks.
+
+        Args:
+            file_name: Original file name (used for its extension)
+            size: Content size in bytes
+
+        Returns:
+            Tuple of (format_type, mime_type)
+
+        Raises:
+            ValidationError: If validation fails
+            UnsupportedFormatError: If format not supported
+        """
+        if size > self.MAX_FILE_SIZE:
+            max_mb = self.MAX_FILE_SIZE / (1024 * 1024)
+            actual_mb = size / (1024 * 1024)
+            raise ValidationError(
+                f"File size ({actual_mb:.2f}MB) exceeds maximum "
+                f"allowed size ({max_mb}MB)"
+            )
+        if size == 0:
+            raise ValidationError("File is empty (0 bytes)")
+
+        return self.detect_format(file_name), self.get_mime_type(file_name)
+
     def is_supported(self, file_path: str) -> bool:
         """
         Check if file format is supported without raising exceptions.
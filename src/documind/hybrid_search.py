@@ -1,9 +1,12 @@
 """
 Hybrid Search: Combine semantic (vector) and keyword (BM25) search
 """
+import heapq
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -42,6 +45,18 @@ def _get_openai_client():
     return _openai_client
 
 
+@lru_cache(maxsize=1024)
+def _embed_cached(model: str, text: str) -> Tuple[float, ...]:
+    """Embed text, memoized per (model, text) for the lifetime of the process."""
+    client = _get_openai_client()
+    response = client.embeddings.create(
+        model=model,
+        input=text
+    )
+    # Tuples are immutable, so cached vectors can't be mutated by callers
+    return tuple(response.data[0].embedding)
+
+
 class EmbeddingsClient:
     """Simple embeddings client using OpenAI."""
 
@@ -49,13 +64,8 @@ class EmbeddingsClient:
         self.model = model
 
     def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for text using OpenAI."""
-        client = _get_openai_client()
-        response = client.embeddings.create(
-            model=self.model,
-            input=text
-        )
-        return response.data[0].embedding
+        """Generate embedding for text using OpenAI (cached in-process, LRU)."""
+        return list(_embed_cached(self.model, text))
 
 class HybridSearcher:
     """Combines vector and keyword search with reranking"""
@@ -176,31 +186,32 @@ class HybridSearcher:
         print(f"   Weights: {self.semantic_weight:.1f} semantic + {self.keyword_weight:.1f} keyword")
         print(f"   Reranking: {rerank_method}")
 
-        # Fetch results from both search methods
+        # Fetch results from both search methods concurrently
         # Use lower threshold (0.3) to capture more semantic matches
-        semantic_results = self.search_semantic(query, top_k=20, threshold=0.3)
-        keyword_results = self.search_keyword(query, top_k=20)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            semantic_future = executor.submit(self.search_semantic, query, top_k=20, threshold=0.3)
+            keyword_future = executor.submit(self.search_keyword, query, top_k=20)
+            semantic_results = semantic_future.result()
+            keyword_results = keyword_future.result()
 
         print(f"   Semantic results: {len(semantic_results)}")
         print(f"   Keyword results:  {len(keyword_results)}")
 
-        # Merge and rerank
+        # Merge and rerank, keeping only the top K
         if rerank_method == "linear":
-            results = self._rerank_linear(semantic_results, keyword_results)
+            return self._rerank_linear(semantic_results, keyword_results, top_k=top_k)
         elif rerank_method == "rrf":
-            results = self._rerank_rrf(semantic_results, keyword_results)
+            return self._rerank_rrf(semantic_results, keyword_results, top_k=top_k)
         else:
             raise ValueError(f"Unknown rerank method: {rerank_method}")
 
-        # Return top K
-        return results[:top_k]
-
     def _rerank_linear(
         self,
         semantic_results: List[Dict],
-        keyword_results: List[Dict]
+        keyword_results: List[Dict],
+        top_k: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Linear combination of scores"""
+        """Linear combination of scores (best top_k only, if given)"""
         # Normalize scores to 0-1 range
         semantic_scores = self._normalize_scores(
             [r["semantic_score"] for r in semantic_results]
@@ -240,7 +251,9 @@ class HybridSearcher:
             data["id"] = chunk_id
             final_results.append(data)
 
-        # Sort by combined score
+        # Sort by combined score (partial selection when only top_k are needed)
+        if top_k is not None:
+            return heapq.nlargest(top_k, final_results, key=lambda x: x["combined_score"])
         final_results.sort(key=lambda x: x["combined_score"], reverse=True)
         return final_results
 
@@ -248,11 +261,14 @@ class HybridSearcher:
         self,
         semantic_results: List[Dict],
         keyword_results: List[Dict],
-        k: int = 60
+        k: int = 60,
+        top_k: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Reciprocal Rank Fusion (RRF) reranking.
 
+        Returns only the best top_k results when top_k is given.
+
         RRF_score(d) = Σ 1 / (k + rank_i(d))
 
         Where rank_i(d) is the rank of document d in ranking i.
@@ -285,8 +301,10 @@ class HybridSearcher:
                 results_dict[chunk_id] = result
                 results_dict[chunk_id]["rrf_score"] = rrf_scores[chunk_id]
 
-        # Sort by RRF score
+        # Sort by RRF score (partial selection when only top_k are needed)
         final_results = list(results_dict.values())
+        if top_k is not None:
+            return heapq.nlargest(top_k, final_results, key=lambda x: x.get("rrf_score", 0))
         final_results.sort(key=lambda x: x.get("rrf_score", 0), reverse=True)
 
         return final_results
@@ -2,16 +2,24 @@
 Intelligent DocuMind Q&A System
 With memory, learning, and personalization
 """
+import asyncio
+import atexit
+import hashlib
 import os
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 from dotenv import load_dotenv
-from openai import OpenAI
+
+try:
+    import tiktoken
+except ImportError:  # Optional: exact token counts for history budgeting
+    tiktoken = None
 
 from documind.memory.conversation import ConversationMemory, list_user_conversations
 from documind.memory.feedback import FeedbackCollector
 from documind.memory.learning import LearningSystem
-from documind.rag.search import search_documents
 
 # Load environment variables from .env
 load_dotenv()
@@ -19,10 +27,128 @@ load_dotenv()
 # Configuration
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=OPENROUTER_API_KEY
-)
+
+
+# openai, numpy and the semantic cache (and supabase, via documind.rag) are
+# imported on first use, so the CLI banner, /help and /list don't wait on them
+@lru_cache(maxsize=None)
+def _get_client():
+    """Get or create the OpenRouter client."""
+    from openai import AsyncOpenAI
+    from documind.net import shared_async_http_client
+    return AsyncOpenAI(
+        base_url="https://openrouter.ai/api/v1",
+        api_key=OPENROUTER_API_KEY,
+        http_client=shared_async_http_client()
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the event loop that runs IntelligentQA.ask() for sync callers.
+
+    The OpenRouter client's pooled connections belong to the loop that
+    opened them, so every sync call reuses this one instead of asyncio.run().
+    """
+    return asyncio.new_event_loop()
+
+
+@lru_cache(maxsize=None)
+def _get_cache(user_id: str):
+    """
+    Get a user's cache of answers to previous questions (saved on exit).
+
+    Each user has their own cache file, so answers personalized for one
+    user are never served to another.
+    """
+    from documind.cache.semantic import SemanticCache, DEFAULT_SEMANTIC_CACHE_PATH
+    digest = hashlib.blake2b(user_id.encode('utf-8'), digest_size=8).hexdigest()
+    path = DEFAULT_SEMANTIC_CACHE_PATH.with_name(
+        f"{DEFAULT_SEMANTIC_CACHE_PATH.stem}-{digest}{DEFAULT_SEMANTIC_CACHE_PATH.suffix}"
+    )
+    cache = SemanticCache(path)
+    atexit.register(cache.save)
+    return cache
+
+
+# Conversation history sent with each question; older turns are summarized
+HISTORY_TOKEN_BUDGET = 3000
+SUMMARY_MODEL = 'openai/gpt-4o-mini'
+
+_ENCODING = tiktoken.encoding_for_model('gpt-4o') if tiktoken else None
+
+
+def _count_tokens(text: str) -> int:
+    """Token count (tiktoken when installed, else ~4 characters per token)."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text) // 4 + 1
+
+
+def _budget_messages(
+    messages: List[Dict[str, Any]],
+    max_tokens: int = HISTORY_TOKEN_BUDGET
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split history into (dropped prefix, kept suffix).
+
+    Keeps the most recent messages whose combined size fits max_tokens.
+    """
+    total = 0
+    keep_from = len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        total += _count_tokens(messages[i]["content"])
+        if total > max_tokens:
+            break
+        keep_from = i
+    return messages[:keep_from], messages[keep_from:]
+
+
+def _dedupe_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop chunks whose content repeats an earlier (higher ranked) chunk."""
+    seen = set()
+    unique = []
+    for chunk in chunks:
+        digest = hashlib.blake2b(chunk['content'].encode('utf-8'), digest_size=8).digest()
+        if digest not in seen:
+            seen.add(digest)
+            unique.append(chunk)
+    return unique
+
+
+def _merge_adjacent_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Join consecutive chunk_index runs from the same document into one block.
+
+    Blocks keep their best similarity and are returned highest first.
+    """
+    def doc_key(chunk):
+        return (chunk.get('metadata') or {}).get('document_id') or chunk['document_name']
+
+    blocks = []
+    for chunk in sorted(chunks, key=lambda c: (str(doc_key(c)), c.get('chunk_index', 0))):
+        last = blocks[-1] if blocks else None
+        if last and last['key'] == doc_key(chunk) and chunk.get('chunk_index', 0) == last['chunk_index'] + 1:
+            last['content'] += "\n" + chunk['content']
+            last['chunk_index'] = chunk.get('chunk_index', 0)
+            last['similarity'] = max(last['similarity'], chunk['similarity'])
+        else:
+            blocks.append({
+                'key': doc_key(chunk),
+                'document_name': chunk['document_name'],
+                'content': chunk['content'],
+                'chunk_index': chunk.get('chunk_index', 0),
+                'similarity': chunk['similarity']
+            })
+
+    blocks.sort(key=lambda b: b['similarity'], reverse=True)
+    return blocks
+
+
+async def _replay(text: str) -> AsyncIterator[str]:
+    """Yield an already complete answer as a single stream chunk."""
+    yield text
 
 
 class IntelligentQA:
@@ -36,6 +162,49 @@ class IntelligentQA:
         self.feedback_collector = FeedbackCollector(user_id=user_id)
         self.learning_system = LearningSystem()
         self.user_preferences = None
+        self.last_response: Optional[Dict[str, Any]] = None
+        # ((conversation_id, dropped message count), summary of those messages)
+        self._history_summary: Optional[Tuple[Tuple[str, int], str]] = None
+
+    @property
+    def user_preferences(self) -> Optional[Dict[str, Any]]:
+        return self._user_preferences
+
+    @user_preferences.setter
+    def user_preferences(self, preferences: Optional[Dict[str, Any]]) -> None:
+        """Store preferences and rebuild the preferred-document boosts."""
+        self._user_preferences = preferences
+        # Preferred document -> similarity boost (max 20%)
+        self._preferred_docs: Optional[Dict[str, float]] = None
+        if preferences and 'top_documents' in preferences:
+            self._preferred_docs = {
+                d['document']: min(0.2, d['count'] * 0.02)
+                for d in preferences.get('top_documents', [])
+            }
+        # document_name -> boost (None = not preferred), filled lazily
+        self._boost_by_doc: Dict[str, Optional[float]] = {}
+
+    def _preference_boost(self, doc_name: str) -> Optional[float]:
+        """
+        Similarity boost for a document the user prefers, or None.
+
+        Exact names are a dict hit; otherwise the first preferred name that
+        contains (or is contained in) doc_name is used. Results are memoized
+        per document name until preferences change, so the substring scan
+        runs at most once per distinct document.
+        """
+        if doc_name in self._boost_by_doc:
+            return self._boost_by_doc[doc_name]
+
+        boost = self._preferred_docs.get(doc_name)
+        if boost is None:
+            boost = next(
+                (doc_boost for pref_doc, doc_boost in self._preferred_docs.items()
+                 if pref_doc in doc_name or doc_name in pref_doc),
+                None
+            )
+        self._boost_by_doc[doc_name] = boost
+        return boost
 
     def start_conversation(self, conversation_id: Optional[str] = None) -> str:
         """
@@ -67,13 +236,53 @@ class IntelligentQA:
 
         Steps:
         1. Add user message to conversation
-        2. Get conversation context
+        2. Get conversation context (concurrently with the query embedding)
         3. Retrieve documents (with personalization)
         4. Generate answer with context
         5. Add assistant message
         6. Return response
+
+        Synchronous wrapper around aask(); runs it on the event loop shared
+        by sync callers (see _get_loop).
+        """
+        return _get_loop().run_until_complete(self.aask(question, model))
+
+    async def aask(
+        self,
+        question: str,
+        model: str = 'openai/gpt-4o'
+    ) -> Dict[str, Any]:
+        """Async variant of ask()."""
+        return await self._ask(question, model)
+
+    async def ask_stream(
+        self,
+        question: str,
+        model: str = 'openai/gpt-4o'
+    ) -> AsyncIterator[str]:
+        """
+        Ask a question and yield the answer as text deltas.
+
+        Steps 5-6 of ask() run when the stream is exhausted; the response
+        dict is then available as ``self.last_response``.
+        """
+        async for delta in await self._ask(question, model, stream=True):
+            yield delta
+
+    async def _ask(
+        self,
+        question: str,
+        model: str,
+        stream: bool = False
+    ) -> Union[Dict[str, Any], AsyncIterator[str]]:
+        """
+        Shared implementation of aask() and ask_stream().
+
+        With stream=True, retrieval completes before this returns and the
+        answer comes back as an async iterator of text deltas.
         """
         import time
+        from documind.rag.search import get_query_embedding_async
         start_time = time.time()
 
         # Ensure conversation is started
@@ -83,16 +292,33 @@ class IntelligentQA:
         # 1. Add user message to conversation
         user_message = self.conversation.add_message("user", question)
 
-        # 2. Get conversation context
-        context_messages = self.conversation.get_context()
+        # 2. Get conversation context while the question is embedded
+        q_emb, context_messages = await asyncio.gather(
+            get_query_embedding_async(question),
+            asyncio.to_thread(self.conversation.get_context)
+        )
+
+        # Reuse the answer to a near-identical earlier question. Only the
+        # first question of a conversation is cached: later ones ("tell me
+        # more") depend on the turns before them.
+        cacheable = len(context_messages) <= 1
+        if cacheable:
+            hit = _get_cache(self.user_id).lookup(q_emb, tau=0.85)
+            if hit and hit["model"] == model:
+                response = self._answer_from_cache(hit, start_time)
+                return _replay(response["answer"]) if stream else response
 
         # 3. Retrieve documents with personalization
-        sources = self.personalize_search(question, top_k=5)
+        sources = await asyncio.to_thread(
+            self.personalize_search, question, top_k=5, query_embedding=q_emb
+        )
 
-        # Build context from retrieved documents
+        # Build context from retrieved documents (duplicates dropped,
+        # neighbouring chunks of one document merged)
+        sources = _dedupe_chunks(sources)
         doc_context = "\n\n".join([
-            f"[Source: {doc['document_name']} (relevance: {doc['similarity']:.2f})]\n{doc['content']}"
-            for doc in sources
+            f"[Source: {block['document_name']} (relevance: {block['similarity']:.2f})]\n{block['content']}"
+            for block in _merge_adjacent_chunks(sources)
         ])
 
         # 4. Generate answer with context
@@ -105,8 +331,15 @@ Previous conversation context is provided to maintain continuity."""
 
         messages = [{"role": "system", "content": system_prompt}]
 
-        # Add conversation history for context
-        for msg in context_messages[:-1]:  # Exclude the current question
+        # Add conversation history for context, within the token budget
+        dropped, recent = _budget_messages(context_messages[:-1])  # Exclude the current question
+        if dropped:
+            summary = await self._summarize_history(dropped)
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{summary}"
+            })
+        for msg in recent:
             messages.append({"role": msg["role"], "content": msg["content"]})
 
         # Add current question with document context
@@ -123,7 +356,10 @@ Provide a helpful, accurate answer based on the context. Cite sources when appro
         })
 
         # Call LLM
-        response = client.chat.completions.create(
+        if stream:
+            return self._stream_answer(messages, sources, q_emb, model, start_time, cacheable)
+
+        response = await _get_client().chat.completions.create(
             model=model,
             messages=messages,
             temperature=0.7,
@@ -131,6 +367,75 @@ Provide a helpful, accurate answer based on the context. Cite sources when appro
         )
 
         answer = response.choices[0].message.content
+        return self._record_answer(answer, sources, q_emb, model, start_time, cacheable)
+
+    async def _summarize_history(self, dropped: List[Dict[str, Any]]) -> str:
+        """
+        Summarize history that no longer fits the token budget.
+
+        The summary is kept until more messages fall out of the budget, so
+        it is regenerated at most once per turn.
+        """
+        key = (self.conversation.conversation_id, len(dropped))
+        if self._history_summary and self._history_summary[0] == key:
+            return self._history_summary[1]
+
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in dropped)
+        response = await _get_client().chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[{
+                "role": "user",
+                "content": f"""Summarize this conversation in a few sentences. Keep names, numbers and any decisions or open questions.
+
+{transcript}"""
+            }],
+            temperature=0,
+            max_tokens=300
+        )
+        summary = response.choices[0].message.content
+        self._history_summary = (key, summary)
+        return summary
+
+    async def _stream_answer(
+        self,
+        messages: List[Dict[str, str]],
+        sources: List[Dict[str, Any]],
+        q_emb: List[float],
+        model: str,
+        start_time: float,
+        cacheable: bool = True
+    ) -> AsyncIterator[str]:
+        """Yield answer deltas from a streamed completion, then record the answer."""
+        stream = await _get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=1024,
+            stream=True
+        )
+
+        parts = []
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+
+        self._record_answer("".join(parts), sources, q_emb, model, start_time, cacheable)
+
+    def _record_answer(
+        self,
+        answer: str,
+        sources: List[Dict[str, Any]],
+        q_emb: List[float],
+        model: str,
+        start_time: float,
+        cacheable: bool = True
+    ) -> Dict[str, Any]:
+        """Store a generated answer in the conversation and cache (steps 5-6)."""
+        import time
         response_time = time.time() - start_time
 
         # 5. Add assistant message with sources and metadata
@@ -151,15 +456,50 @@ Provide a helpful, accurate answer based on the context. Cite sources when appro
             metadata=metadata
         )
 
+        if cacheable:
+            _get_cache(self.user_id).insert(
+                q_emb, {"answer": answer, "sources": source_refs, "model": model}
+            )
+
         # 6. Return response
-        return {
+        self.last_response = {
             "answer": answer,
             "sources": source_refs,
             "message_id": assistant_message["id"],
             "conversation_id": self.conversation.conversation_id,
             "response_time": response_time,
-            "model": model
+            "model": model,
+            "cache_hit": False
+        }
+        return self.last_response
+
+    def _answer_from_cache(self, hit: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        """Record and return a semantic cache hit as this turn's answer."""
+        import time
+        response_time = time.time() - start_time
+
+        assistant_message = self.conversation.add_message(
+            "assistant",
+            hit["answer"],
+            sources=hit["sources"],
+            metadata={
+                "model": hit["model"],
+                "response_time": round(response_time, 2),
+                "sources_count": len(hit["sources"]),
+                "cache_hit": True
+            }
+        )
+
+        self.last_response = {
+            "answer": hit["answer"],
+            "sources": hit["sources"],
+            "message_id": assistant_message["id"],
+            "conversation_id": self.conversation.conversation_id,
+            "response_time": response_time,
+            "model": hit["model"],
+            "cache_hit": True
         }
+        return self.last_response
 
     def submit_feedback(
         self,
@@ -192,7 +532,8 @@ Provide a helpful, accurate answer based on the context. Cite sources when appro
     def personalize_search(
         self,
         query: str,
-        top_k: int = 5
+        top_k: int = 5,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Personalized document retrieval.
@@ -203,36 +544,41 @@ Provide a helpful, accurate answer based on the context. Cite sources when appro
         3. Boost preferred documents
         4. Re-rank results
         """
+        import numpy as np
+        from documind.rag.search import search_documents
+
         # 1 & 2. Retrieve documents using standard search
-        results = search_documents(query, top_k=top_k * 2, similarity_threshold=0.3)
+        results = search_documents(
+            query,
+            top_k=top_k * 2,
+            similarity_threshold=0.3,
+            query_embedding=query_embedding
+        )
 
         if not results:
             return []
 
         # 3. Boost preferred documents based on user preferences
-        if self.user_preferences and 'top_documents' in self.user_preferences:
-            preferred_docs = {
-                d['document']: d['count']
-                for d in self.user_preferences.get('top_documents', [])
-            }
-
-            for result in results:
-                doc_name = result.get('document_name', '')
-                # Check if this document is in user's preferred list
-                for pref_doc, pref_count in preferred_docs.items():
-                    if pref_doc in doc_name or doc_name in pref_doc:
-                        # Boost by preference score (max 20% boost)
-                        boost = min(0.2, pref_count * 0.02)
-                        result['similarity'] = min(1.0, result['similarity'] + boost)
-                        result['personalized'] = True
-                        break
-                else:
-                    result['personalized'] = False
-
-        # 4. Re-rank results by adjusted similarity
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-
-        return results[:top_k]
+        sims = np.fromiter(
+            (r['similarity'] for r in results), dtype=np.float64, count=len(results)
+        )
+        if self._preferred_docs is not None:
+            boosts = np.fromiter(
+                (self._preference_boost(r.get('document_name', '')) for r in results),
+                dtype=np.float64,
+                count=len(results)
+            )  # None -> nan
+            preferred = ~np.isnan(boosts)
+            boosted = np.minimum(1.0, sims + boosts)
+            sims = np.where(preferred, boosted, sims)
+            for result, sim, is_preferred in zip(results, sims.tolist(), preferred.tolist()):
+                result['personalized'] = is_preferred
+                if is_preferred:
+                    result['similarity'] = sim
+
+        # 4. Re-rank results by adjusted similarity (stable, highest first)
+        order = np.argsort(-sims, kind='stable')[:top_k]
+        return [results[i] for i in order]
 
     def apply_learning(self) -> Dict[str, Any]:
         """
@@ -272,16 +618,18 @@ Provide a helpful, accurate answer based on the context. Cite sources when appro
         Returns:
             User statistics and preferences
         """
-        # Get user preferences
-        preferences = self.learning_system.learn_user_preferences(
-            self.user_id, days=30
-        )
-
-        # Get feedback analysis
-        feedback_analysis = self.feedback_collector.analyze_feedback(days=30)
-
-        # Get conversation statistics
-        conversations = self.get_conversation_list()
+        # Preferences, feedback analysis and conversation statistics are
+        # independent queries, so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            f_prefs = executor.submit(
+                self.learning_system.learn_user_preferences, self.user_id, days=30
+            )
+            f_feedback = executor.submit(self.feedback_collector.analyze_feedback, days=30)
+            f_conversations = executor.submit(self.get_conversation_list)
+
+            preferences = f_prefs.result()
+            feedback_analysis = f_feedback.result()
+            conversations = f_conversations.result()
 
         return {
             "user_id": self.user_id,
@@ -295,6 +643,15 @@ Provide a helpful, accurate answer based on the context. Cite sources when appro
         }
 
 
+async def _print_answer_stream(qa: IntelligentQA, question: str) -> Dict[str, Any]:
+    """Print an answer as it streams in; return the final response."""
+    print("\nAssistant: ", end="", flush=True)
+    async for token in qa.ask_stream(question):
+        print(token, end="", flush=True)
+    print()
+    return qa.last_response
+
+
 def main():
     """
     Interactive CLI with all features:
@@ -320,6 +677,10 @@ def main():
     qa = IntelligentQA(user_id=user_id)
     last_message_id = None
 
+    # One event loop for the whole session, so pooled HTTP/2 connections
+    # to OpenRouter stay usable between questions
+    loop = _get_loop()
+
     print(f"\nWelcome, {user_id}!")
     print("\nCommands:")
     print("  /new      - Start new conversation")
@@ -444,10 +805,9 @@ def main():
                 # Regular question
                 print("\nSearching and generating answer...")
                 try:
-                    response = qa.ask(user_input)
+                    response = loop.run_until_complete(_print_answer_stream(qa, user_input))
                     last_message_id = response['message_id']
 
-                    print(f"\nAssistant: {response['answer']}")
                     print(f"\n[Sources: {len(response['sources'])} documents | "
                           f"Time: {response['response_time']:.2f}s]")
 
@@ -467,6 +827,8 @@ def main():
             print("\n\nGoodbye!")
             break
 
+    loop.close()
+
 
 if __name__ == "__main__":
     main()
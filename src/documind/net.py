@@ -0,0 +1,43 @@
+"""
+DocuMind Network Clients
+
+Process-wide HTTP clients passed to the OpenAI SDK (``http_client=``) and
+to Supabase (``ClientOptions(httpx_client=...)``) so OpenRouter, OpenAI and
+PostgREST calls from every module share one HTTP/2 connection pool instead
+of each client instance opening its own connections.
+"""
+
+from functools import lru_cache
+
+import httpx
+
+HTTP_TIMEOUT = 60.0
+HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+
+
+@lru_cache(maxsize=1)
+def shared_http_client() -> httpx.Client:
+    """Shared synchronous HTTP/2 client (thread-safe)."""
+    return httpx.Client(http2=True, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+
+
+@lru_cache(maxsize=1)
+def shared_async_http_client() -> httpx.AsyncClient:
+    """
+    Shared asynchronous HTTP/2 client.
+
+    Pooled connections belong to the event loop that opened them, so use it
+    from a single long-lived loop rather than repeated asyncio.run() calls.
+    """
+    return httpx.AsyncClient(http2=True, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+
+
+def supabase_client_options():
+    """
+    Supabase ClientOptions that send requests over shared_http_client().
+
+    Pass as ``create_client(url, key, options=supabase_client_options())``;
+    every Supabase client created this way reuses the same warm connections.
+    """
+    from supabase import ClientOptions
+    return ClientOptions(httpx_client=shared_http_client())
@@ -8,8 +8,9 @@ Production-ready document processing pipeline that:
 - Integrates with DocuMind database via MCP
 """
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import BinaryIO, Dict, List, Optional, Union
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import io
 import logging
 
 from .format_detector import FormatDetector
@@ -129,8 +130,98 @@ class DocumentProcessor:
         detected_format = f".{format_type}" if not format_type.startswith('.') else format_type
         logger.debug(f"Detected format: {detected_format}")
 
+        # Step 2-7: Extract, enrich, format, chunk and optionally upload
+        return self._process_source(
+            source=str(file_path),
+            detected_format=detected_format,
+            file_name=file_path.name,
+            file_path=str(file_path.absolute()),
+            upload=upload,
+            custom_metadata=custom_metadata
+        )
+
+    def process_document_bytes(
+        self,
+        data: Union[bytes, bytearray, memoryview],
+        ext: str,
+        name: str,
+        upload: Optional[bool] = None,
+        custom_metadata: Optional[Dict] = None
+    ) -> ProcessedDocument:
+        """
+        Process a document held in memory, without writing it to disk.
+
+        Useful for browser uploads, where the content is already resident
+        (e.g. Streamlit's ``uploaded_file.getbuffer()``).
+
+        Args:
+            data: Raw file contents
+            ext: File extension hint, with or without the leading dot
+            name: Original file name, used for titles and metadata
+            upload: Override auto_upload setting
+            custom_metadata: Additional metadata to include
+
+        Returns:
+            ProcessedDocument with all extracted data
+
+        Raises:
+            ValueError: If file format is unsupported or validation fails
+        """
+        ext = ext.lower() if ext.startswith('.') else f".{ext.lower()}"
+        file_name = Path(name).name
+        if Path(file_name).suffix.lower() != ext:
+            file_name = f"{Path(file_name).stem}{ext}"
+        logger.info(f"Processing in-memory document: {file_name}")
+
+        # Step 1: Validate and detect format
+        try:
+            format_type, mime_type = self.format_detector.validate_and_detect_bytes(
+                file_name, len(data)
+            )
+        except Exception as e:
+            raise ValueError(f"Validation failed: {str(e)}")
+
+        detected_format = f".{format_type}" if not format_type.startswith('.') else format_type
+        logger.debug(f"Detected format: {detected_format}")
+
+        # Extractors accept binary file objects; name carries the extension
+        source = io.BytesIO(data)
+        source.name = file_name
+
+        return self._process_source(
+            source=source,
+            detected_format=detected_format,
+            file_name=file_name,
+            file_path=file_name,
+            upload=upload,
+            custom_metadata=custom_metadata,
+            file_size=len(data)
+        )
+
+    def _process_source(
+        self,
+        source: Union[str, BinaryIO],
+        detected_format: str,
+        file_name: str,
+        file_path: str,
+        upload: Optional[bool],
+        custom_metadata: Optional[Dict],
+        file_size: Optional[int] = None
+    ) -> ProcessedDocument:
+        """
+        Run extraction through upload for a validated path or in-memory file.
+
+        Args:
+            source: Filesystem path, or binary file object with a name
+            detected_format: Extension-style format (e.g. ".pdf")
+            file_name: File name for titles and logging
+            file_path: Path recorded on the ProcessedDocument
+            upload: Override auto_upload setting
+            custom_metadata: Additional metadata to include
+            file_size: Content size for in-memory sources (skips stat)
+        """
         # Step 2: Extract content using appropriate extractor
-        extraction_result = self._extract_content(str(file_path), detected_format)
+        extraction_result = self._extract_content(source, detected_format)
 
         if not extraction_result.success:
             raise ValueError(f"Extraction failed: {extraction_result.error}")
@@ -141,9 +232,10 @@ class DocumentProcessor:
             format_metadata.update(custom_metadata)
 
         metadata = self.metadata_extractor.extract_all(
-            str(file_path),
+            file_path,
             extraction_result.text,
-            format_metadata
+            format_metadata,
+            file_size=file_size
         )
 
         # Convert to EnrichedMetadata dataclass
@@ -189,8 +281,8 @@ class DocumentProcessor:
         from datetime import datetime
         processed = ProcessedDocument(
             document_id=str(uuid.uuid4()),
-            file_path=str(file_path.absolute()),
-            file_name=file_path.name,
+            file_path=file_path,
+            file_name=file_name,
             content=llm_formatted,
             raw_content=extraction_result.text,
             tables=[],  # Tables already included in content
@@ -204,7 +296,7 @@ class DocumentProcessor:
         should_upload = upload if upload is not None else self.auto_upload
         if should_upload:
             upload_result = self.uploader.upload_document(
-                title=file_path.stem,
+                title=Path(file_name).stem,
                 content=llm_formatted,
                 metadata=metadata,
                 file_type=detected_format
@@ -212,7 +304,7 @@ class DocumentProcessor:
             processed.upload_result = upload_result
             logger.info(f"Uploaded to DocuMind: {upload_result.document_id}")
 
-        logger.info(f"Successfully processed: {file_path.name} ({len(chunk_objects)} chunks)")
+        logger.info(f"Successfully processed: {file_name} ({len(chunk_objects)} chunks)")
         return processed
 
     def process_batch(
@@ -259,7 +351,7 @@ class DocumentProcessor:
 
         return results
 
-    def _extract_content(self, file_path: str, format: str) -> ExtractionResult:
+    def _extract_content(self, file_path: Union[str, BinaryIO], format: str) -> ExtractionResult:
         """Route to appropriate extractor based on format."""
         extractor_func = self._extractors.get(format)
 
@@ -344,7 +436,7 @@ class DocumentProcessor:
 
     def _extract_spreadsheet(self, file_path: str) -> ExtractionResult:
         """Extract content from CSV or Excel file."""
-        ext = Path(file_path).suffix.lower()
+        ext = Path(getattr(file_path, "name", file_path)).suffix.lower()
 
         if ext == ".csv":
             result = self.spreadsheet_extractor.extract_csv(file_path)
@@ -393,7 +485,10 @@ class DocumentProcessor:
 
     def _extract_text(self, file_path: str) -> ExtractionResult:
         """Extract content from plain text or Markdown file."""
-        result = self.text_extractor.extract(file_path)
+        if isinstance(file_path, str):
+            result = self.text_extractor.extract(file_path)
+        else:
+            result = self.text_extractor.extract_bytes(file_path.getvalue(), file_path.name)
 
         if not result.get("success", False):
             return ExtractionResult(
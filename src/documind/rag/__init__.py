@@ -7,15 +7,24 @@ for the DocuMind knowledge management system.
 
 from .search import (
     get_query_embedding,
+    get_query_embeddings,
+    get_query_embedding_async,
     search_documents,
+    search_documents_batch,
+    BatchingRetriever,
     hybrid_search,
+    keyword_search,
+    rrf_hybrid_search,
+    populate_embeddings,
 )
 
 from .qa_pipeline import (
     assemble_context,
     build_qa_prompt,
     generate_answer,
+    stream_answer,
     compare_models,
+    acompare_models,
 )
 
 from .cag_pipeline import (
@@ -26,13 +35,22 @@ from .cag_pipeline import (
 __all__ = [
     # Search functions (RAG)
     "get_query_embedding",
+    "get_query_embeddings",
+    "get_query_embedding_async",
     "search_documents",
+    "search_documents_batch",
+    "BatchingRetriever",
     "hybrid_search",
+    "keyword_search",
+    "rrf_hybrid_search",
+    "populate_embeddings",
     # Q&A Pipeline functions (RAG)
     "assemble_context",
     "build_qa_prompt",
     "generate_answer",
+    "stream_answer",
     "compare_models",
+    "acompare_models",
     # CAG Pipeline functions (no database)
     "load_all_documents",
     "generate_answer_cag",
@@ -11,37 +11,73 @@ CAG vs RAG:
 """
 
 import os
-from typing import Dict, Any, List
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
 from dotenv import load_dotenv
-from openai import OpenAI
-from supabase import create_client, Client
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Supabase client
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY")
+
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError(
-        "SUPABASE_URL and SUPABASE_SERVICE_KEY environment variables must be set"
+# Clients are created on first use, so importing this module (e.g. via
+# documind.rag) doesn't pay for the supabase/openai imports or need keys
+@lru_cache(maxsize=1)
+def _get_supabase_client():
+    """Get or create the Supabase client."""
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise ValueError(
+            "SUPABASE_URL and SUPABASE_SERVICE_KEY environment variables must be set"
+        )
+    from supabase import create_client
+    from documind.net import supabase_client_options
+    return create_client(SUPABASE_URL, SUPABASE_KEY, options=supabase_client_options())
+
+
+@lru_cache(maxsize=1)
+def _get_openrouter_client():
+    """Get or create the OpenRouter client."""
+    if not OPENROUTER_API_KEY:
+        raise ValueError("OPENROUTER_API_KEY environment variable must be set")
+    from openai import OpenAI
+    from documind.net import shared_http_client
+    return OpenAI(
+        api_key=OPENROUTER_API_KEY,
+        base_url="https://openrouter.ai/api/v1",
+        http_client=shared_http_client()
     )
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Initialize OpenRouter client
-OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY")
+# Formatted context per max_docs, as (corpus_version, context). Rebuilt
+# only when _current_version() changes.
+_CONTEXT_CACHE: Dict[int, Tuple[str, str]] = {}
+_CONTEXT_CACHE_LOCK = threading.Lock()
+
+
+def _current_version() -> str:
+    """
+    Cheap fingerprint of the document_chunks table.
 
-if not OPENROUTER_API_KEY:
-    raise ValueError("OPENROUTER_API_KEY environment variable must be set")
+    One-row query returning the exact row count and newest created_at;
+    any chunk insert or delete changes it.
 
-openrouter_client = OpenAI(
-    api_key=OPENROUTER_API_KEY,
-    base_url="https://openrouter.ai/api/v1"
-)
+    Returns:
+        Version token such as "42:2026-10-15T09:30:00+00:00"
+    """
+    response = _get_supabase_client().from_("document_chunks") \
+        .select("created_at", count="exact") \
+        .order("created_at", desc=True) \
+        .limit(1) \
+        .execute()
+
+    newest = response.data[0].get("created_at") if response.data else None
+    return f"{response.count}:{newest}"
 
 
 def load_all_documents(max_docs: int = 20) -> str:
@@ -49,9 +85,14 @@ def load_all_documents(max_docs: int = 20) -> str:
     Load all document chunks from the knowledge base into a single context string.
 
     Fetches document chunks from Supabase and formats them into a concatenated
-    string suitable for inclusion in an LLM prompt. This is the core of the CAG
+    string suitable for inclusion in an LLM prompt (in the database, via the
+    cag_context RPC, when migration 007 is applied). This is the core of the CAG
     approach - loading the entire knowledge base rather than retrieving selectively.
 
+    The result is cached in-process per max_docs. Each call only probes the
+    corpus version (see _current_version) and refetches when it changed;
+    threads that miss at the same time share a single fetch.
+
     Args:
         max_docs: Maximum number of document chunks to load. Defaults to 20.
             Keep this low to avoid exceeding context limits.
@@ -72,6 +113,37 @@ def load_all_documents(max_docs: int = 20) -> str:
         [Document: Employee Handbook]
         ...
     """
+    version = _current_version()
+    cached = _CONTEXT_CACHE.get(max_docs)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    # Concurrent misses (e.g. compare_approaches_batch) fetch only once
+    with _CONTEXT_CACHE_LOCK:
+        cached = _CONTEXT_CACHE.get(max_docs)
+        if cached and cached[0] == version:
+            return cached[1]
+        context = _fetch_context(max_docs)
+        _CONTEXT_CACHE[max_docs] = (version, context)
+    return context
+
+
+def _fetch_context(max_docs: int) -> str:
+    """
+    Fetch and format up to max_docs chunks (uncached).
+
+    Uses the cag_context RPC (migrations/007_cag_context.sql) so the string
+    is joined in the database; databases without it fall back to fetching
+    the rows and formatting them here.
+    """
+    supabase = _get_supabase_client()
+    try:
+        response = supabase.rpc("cag_context", {"max_docs": max_docs}).execute()
+        if isinstance(response.data, str):
+            return response.data
+    except Exception:
+        pass
+
     # Fetch document chunks with their parent document titles
     response = supabase.from_("document_chunks") \
         .select("chunk_text, chunk_index, document_id, documents!inner(title)") \
@@ -95,11 +167,32 @@ def load_all_documents(max_docs: int = 20) -> str:
     return "\n---\n".join(formatted_docs)
 
 
+def _build_cag_prompt(query: str, full_context: str) -> str:
+    """Build the CAG prompt with the whole knowledge base as context."""
+    return f"""You are a helpful assistant with access to a complete knowledge base.
+
+INSTRUCTIONS:
+1. Answer the question using the information from the documents provided below.
+2. Be concise but comprehensive in your response.
+3. Reference specific documents when citing information (e.g., "According to the HR Policy Manual...").
+4. If the answer cannot be found in the documents, say "I don't have enough information to answer that question."
+5. Do not make up information that is not in the documents.
+
+KNOWLEDGE BASE:
+{full_context}
+
+QUESTION:
+{query}
+
+ANSWER:"""
+
+
 def generate_answer_cag(
     query: str,
     model: str = "anthropic/claude-3.5-sonnet",
     temperature: float = 0.1,
-    max_tokens: int = 500
+    max_tokens: int = 500,
+    context_override: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Generate an answer using Context-Augmented Generation (CAG).
@@ -117,6 +210,8 @@ def generate_answer_cag(
         temperature: Sampling temperature for response generation. Lower values
             produce more deterministic responses. Defaults to 0.1.
         max_tokens: Maximum tokens in the generated response. Defaults to 500.
+        context_override: Use this context instead of loading the whole
+            knowledge base (e.g. chunks RAG already retrieved).
 
     Returns:
         A dictionary containing:
@@ -142,7 +237,7 @@ def generate_answer_cag(
         raise ValueError("Query cannot be empty")
 
     # Load ALL documents into context
-    full_context = load_all_documents()
+    full_context = context_override if context_override is not None else load_all_documents()
 
     if not full_context:
         return {
@@ -155,25 +250,10 @@ def generate_answer_cag(
         }
 
     # Build prompt with full context
-    prompt = f"""You are a helpful assistant with access to a complete knowledge base.
-
-INSTRUCTIONS:
-1. Answer the question using the information from the documents provided below.
-2. Be concise but comprehensive in your response.
-3. Reference specific documents when citing information (e.g., "According to the HR Policy Manual...").
-4. If the answer cannot be found in the documents, say "I don't have enough information to answer that question."
-5. Do not make up information that is not in the documents.
-
-KNOWLEDGE BASE:
-{full_context}
-
-QUESTION:
-{query}
-
-ANSWER:"""
+    prompt = _build_cag_prompt(query, full_context)
 
     # Generate answer using OpenRouter
-    response = openrouter_client.chat.completions.create(
+    response = _get_openrouter_client().chat.completions.create(
         model=model,
         messages=[
             {"role": "user", "content": prompt}
@@ -194,9 +274,91 @@ ANSWER:"""
     }
 
 
+def generate_answer_cag_stream(
+    query: str,
+    model: str = "anthropic/claude-3.5-sonnet",
+    temperature: float = 0.1,
+    max_tokens: int = 500,
+    on_complete: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Iterator[str]:
+    """
+    Stream a CAG answer as it is generated.
+
+    Same inputs and prompt as generate_answer_cag(), but yields text deltas
+    as they arrive so callers can show the answer from the first token.
+    When the stream ends, on_complete (if given) receives the same result
+    dictionary generate_answer_cag() would have returned.
+
+    Args:
+        query: The user's question to answer.
+        model: OpenRouter model identifier. Defaults to "anthropic/claude-3.5-sonnet".
+        temperature: Sampling temperature for response generation. Defaults to 0.1.
+        max_tokens: Maximum tokens in the generated response. Defaults to 500.
+        on_complete: Optional callback for the final result dictionary.
+
+    Yields:
+        Chunks of the answer text.
+
+    Raises:
+        ValueError: If the query is empty.
+        Exception: If document loading or LLM generation fails.
+
+    Example:
+        >>> for token in generate_answer_cag_stream("What is the vacation policy?"):
+        ...     print(token, end="", flush=True)
+    """
+    if not query or not query.strip():
+        raise ValueError("Query cannot be empty")
+
+    full_context = load_all_documents()
+
+    if not full_context:
+        answer = "No documents found in the knowledge base."
+        parts = [answer]
+        yield answer
+    else:
+        stream = _get_openrouter_client().chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "user", "content": _build_cag_prompt(query, full_context)}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+
+        parts = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+
+    if on_complete:
+        on_complete({
+            "answer": "".join(parts),
+            "method": "CAG",
+            "query": query,
+            "model": model,
+            "context_size": len(full_context),
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+
 if __name__ == "__main__":
     import argparse
-    import json
+    import sys
+    from pathlib import Path
+
+    try:
+        from documind.utils.json_io import dumps_json
+    except ImportError:
+        # Direct execution - make the documind package (also imported lazily
+        # above) importable
+        sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+        from documind.utils.json_io import dumps_json
 
     parser = argparse.ArgumentParser(
         description="DocuMind CAG Pipeline - Full context Q&A"
@@ -266,19 +428,26 @@ if __name__ == "__main__":
 
                 print("\nGenerating answer (CAG method)...\n")
 
-                result = generate_answer_cag(
-                    query,
-                    model=args.model,
-                    temperature=args.temperature
-                )
-
                 if args.json:
-                    print(json.dumps(result, indent=2))
+                    result = generate_answer_cag(
+                        query,
+                        model=args.model,
+                        temperature=args.temperature
+                    )
+                    print(dumps_json(result))
                 else:
+                    result = {}
                     print("-" * 60)
                     print("ANSWER (CAG):")
                     print("-" * 60)
-                    print(result["answer"])
+                    for token in generate_answer_cag_stream(
+                        query,
+                        model=args.model,
+                        temperature=args.temperature,
+                        on_complete=result.update
+                    ):
+                        print(token, end="", flush=True)
+                    print()
                     print(f"\n[Context size: {result['context_size']} chars]")
 
                 print()
@@ -301,24 +470,31 @@ if __name__ == "__main__":
                 print(context[:2000] + "..." if len(context) > 2000 else context)
                 print()
 
-            result = generate_answer_cag(
-                args.query,
-                model=args.model,
-                temperature=args.temperature
-            )
-
             if args.json:
-                print(json.dumps(result, indent=2))
+                result = generate_answer_cag(
+                    args.query,
+                    model=args.model,
+                    temperature=args.temperature
+                )
+                print(dumps_json(result))
             else:
+                result = {}
                 print("=" * 60)
                 print("DocuMind CAG Response")
                 print("=" * 60)
-                print(f"\nQuery: {result['query']}")
-                print(f"Model: {result['model']}")
-                print(f"Method: {result['method']}")
+                print(f"\nQuery: {args.query}")
+                print(f"Model: {args.model}")
+                print("Method: CAG")
                 print("-" * 60)
                 print("\nANSWER:")
-                print(result["answer"])
+                for token in generate_answer_cag_stream(
+                    args.query,
+                    model=args.model,
+                    temperature=args.temperature,
+                    on_complete=result.update
+                ):
+                    print(token, end="", flush=True)
+                print()
                 print(f"\n[Context size: {result['context_size']} chars]")
                 print()
 
@@ -0,0 +1,197 @@
+"""
+Local Vector Index - Answer semantic searches from memory.
+
+Loads every embedded document chunk (id, content, metadata, embedding) from
+Supabase once and searches it in-process, so a query costs a local
+nearest-neighbour lookup instead of a match_documents round trip. Meant for
+corpora that fit in memory (1536 float32 dims is ~6 KB per chunk).
+
+When hnswlib is installed and the index holds at least ANN_MIN_CHUNKS
+chunks, lookups go through an HNSW graph (which keeps the only copy of the
+vectors); smaller indexes (or installs without hnswlib) use an exact scan,
+one matrix-vector product over L2-normalized rows. Similarities are
+cosine, like match_documents().
+
+With quantize=True the scanned rows are stored int8 (one float32 scale per
+row, a quarter of the float32 size) and dequantized in blocks during the
+scan; similarities then carry a quantization error of about 1e-3.
+
+The index is a snapshot: chunks uploaded after it was built are not seen
+until it is rebuilt.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from documind.utils.json_io import loads_json
+
+try:
+    import hnswlib
+except ImportError:  # Optional: pip install hnswlib (falls back to an exact scan)
+    hnswlib = None
+
+# Below this many chunks an exact scan beats an HNSW traversal
+ANN_MIN_CHUNKS = 1_000
+
+# HNSW build parameters
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Rows fetched per request while loading from Supabase
+LOAD_PAGE_SIZE = 1_000
+
+# Rows dequantized per matrix-vector product in the int8 scan
+SCAN_BLOCK_ROWS = 4_096
+
+
+def _parse_embedding(value: Any) -> List[float]:
+    # PostgREST returns pgvector columns as their text form, e.g. "[0.1,0.2]"
+    return loads_json(value) if isinstance(value, str) else value
+
+
+class LocalVectorIndex:
+    """
+    In-memory cosine-similarity index over document chunks.
+
+    Example:
+        index = LocalVectorIndex.from_supabase(client)
+        rows = index.search(get_query_embedding("vacation policy"), top_k=5)
+    """
+
+    def __init__(
+        self,
+        chunks: List[Dict[str, Any]],
+        embeddings: Sequence[Sequence[float]],
+        quantize: bool = False
+    ):
+        """
+        Build the index.
+
+        Args:
+            chunks: Row payloads (id, content, metadata), one per embedding
+            embeddings: Chunk embeddings, in the same order as chunks
+            quantize: Store scanned rows as int8 codes instead of float32
+        """
+        self.chunks = chunks
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(chunks), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        self._vectors: Optional[np.ndarray] = None
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._index = None
+
+        if hnswlib is not None and len(chunks) >= ANN_MIN_CHUNKS:
+            self._index = hnswlib.Index(space='cosine', dim=vectors.shape[1])
+            self._index.init_index(
+                max_elements=len(chunks), M=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION
+            )
+            self._index.add_items(vectors, np.arange(len(chunks)))
+            self._index.set_ef(HNSW_EF_SEARCH)
+        elif quantize:
+            # Symmetric per-row int8 quantization: row ~= codes * scale
+            peaks = np.abs(vectors).max(axis=1) if vectors.size else np.zeros(len(chunks))
+            self._scales = np.where(peaks > 0, peaks / 127, 1.0).astype(np.float32)
+            self._codes = np.round(vectors / self._scales[:, np.newaxis]).astype(np.int8)
+        else:
+            self._vectors = vectors
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @classmethod
+    def from_supabase(
+        cls,
+        client: Any,
+        page_size: int = LOAD_PAGE_SIZE,
+        quantize: bool = False
+    ) -> "LocalVectorIndex":
+        """
+        Load every embedded chunk from the document_chunks table.
+
+        Args:
+            client: Supabase client
+            page_size: Rows per request
+            quantize: Store scanned rows as int8 codes (see __init__)
+
+        Returns:
+            Index over all chunks that have an embedding.
+        """
+        chunks: List[Dict[str, Any]] = []
+        embeddings: List[List[float]] = []
+        offset = 0
+        while True:
+            rows = (
+                client.table("document_chunks")
+                .select("id, content, metadata, embedding")
+                .not_.is_("embedding", "null")
+                .order("id")
+                .range(offset, offset + page_size - 1)
+                .execute()
+            ).data or []
+            for row in rows:
+                embeddings.append(_parse_embedding(row.pop("embedding")))
+                chunks.append(row)
+            if len(rows) < page_size:
+                break
+            offset += page_size
+        return cls(chunks, embeddings, quantize=quantize)
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int = 5,
+        similarity_threshold: float = 0.1
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the chunks most similar to a query embedding.
+
+        Args:
+            query_embedding: Query embedding
+            top_k: Maximum number of results
+            similarity_threshold: Only return chunks scoring above this
+
+        Returns:
+            Rows shaped like match_documents() output (id, content,
+            metadata, similarity), best first.
+        """
+        if not self.chunks or top_k <= 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        k = min(top_k, len(self.chunks))
+
+        if self._index is not None:
+            self._index.set_ef(max(HNSW_EF_SEARCH, k))
+            labels, distances = self._index.knn_query(query, k=k)
+            rows = labels[0]
+            scores = 1.0 - distances[0]
+        else:
+            all_scores = self._scan(query)
+            rows = np.argpartition(-all_scores, k - 1)[:k] if k < len(all_scores) else np.arange(k)
+            rows = rows[np.argsort(-all_scores[rows], kind="stable")]
+            scores = all_scores[rows]
+
+        return [
+            {**self.chunks[row], "similarity": float(score)}
+            for row, score in zip(rows.tolist(), scores.tolist())
+            if score > similarity_threshold
+        ]
+
+    def _scan(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every row to a unit-length query."""
+        if self._codes is None:
+            return self._vectors @ query
+
+        # Dequantize in blocks so the float32 temporary stays small
+        rows = len(self._codes)
+        scores = np.empty(rows, dtype=np.float32)
+        for start in range(0, rows, SCAN_BLOCK_ROWS):
+            end = min(start + SCAN_BLOCK_ROWS, rows)
+            block = self._codes[start:end].astype(np.float32)
+            scores[start:end] = (block @ query) * self._scales[start:end]
+        return scores
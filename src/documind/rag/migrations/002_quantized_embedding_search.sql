@@ -0,0 +1,88 @@
+-- Migration: Binary-quantized embedding index for faster semantic search
+-- Run this in Supabase SQL Editor
+-- Version: 002
+-- Date: 2026-10-15
+--
+-- Requires pgvector >= 0.7 (binary_quantize, bit_hamming_ops).
+--
+-- Adds an HNSW index over the 1-bit quantization of document_chunks.embedding
+-- (1536 bits = 192 bytes per vector instead of 6 KB) and a
+-- match_documents_quantized() RPC that:
+--   1. finds candidate_count nearest chunks by Hamming distance on the
+--      quantized index, then
+--   2. re-ranks those candidates by exact cosine similarity on the full
+--      FP32 embedding and returns the top match_count.
+--
+-- Enable from the application with DOCUMIND_QUANTIZED_SEARCH=1.
+-- match_documents() is left unchanged, so this is safe to roll back by
+-- unsetting the flag.
+
+-- =============================================================================
+-- QUANTIZED INDEX
+-- =============================================================================
+
+-- Expression index: no extra column to backfill or keep in sync
+CREATE INDEX IF NOT EXISTS idx_document_chunks_embedding_binary
+    ON document_chunks
+    USING hnsw ((binary_quantize(embedding)::bit(1536)) bit_hamming_ops);
+
+-- =============================================================================
+-- SEARCH FUNCTION
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION match_documents_quantized(
+    query_embedding vector(1536),
+    match_count INT DEFAULT 5,
+    similarity_threshold FLOAT DEFAULT 0.1,
+    candidate_count INT DEFAULT 50
+)
+RETURNS TABLE (
+    id UUID,
+    content TEXT,
+    metadata JSONB,
+    similarity FLOAT
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH candidates AS (
+        SELECT dc.id, dc.content, dc.metadata, dc.embedding
+        FROM document_chunks dc
+        WHERE dc.embedding IS NOT NULL
+        ORDER BY binary_quantize(dc.embedding)::bit(1536)
+            <~> binary_quantize(query_embedding)::bit(1536)
+        LIMIT GREATEST(candidate_count, match_count)
+    )
+    SELECT
+        c.id,
+        c.content,
+        c.metadata,
+        1 - (c.embedding <=> query_embedding) AS similarity
+    FROM candidates c
+    WHERE 1 - (c.embedding <=> query_embedding) > similarity_threshold
+    ORDER BY c.embedding <=> query_embedding
+    LIMIT match_count;
+$$;
+
+GRANT EXECUTE ON FUNCTION match_documents_quantized(vector, INT, FLOAT, INT)
+    TO anon, authenticated, service_role;
+
+-- =============================================================================
+-- VERIFICATION
+-- =============================================================================
+
+-- Check index exists
+SELECT indexname FROM pg_indexes
+WHERE tablename = 'document_chunks'
+    AND indexname = 'idx_document_chunks_embedding_binary';
+
+-- Check function exists
+SELECT EXISTS (
+    SELECT FROM pg_proc WHERE proname = 'match_documents_quantized'
+) AS function_exists;
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Migration 002_quantized_embedding_search completed successfully!';
+END
+$$;
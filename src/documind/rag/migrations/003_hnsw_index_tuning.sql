@@ -0,0 +1,127 @@
+-- Migration: HNSW index and ef_search tuning for document_chunks
+-- Run this in Supabase SQL Editor
+-- Version: 003
+-- Date: 2026-10-15
+--
+-- 1. Ensures document_chunks.embedding has an HNSW cosine index with
+--    explicit build parameters (m = 16, ef_construction = 64). Databases
+--    created from the workshop schema already have one; it is kept.
+-- 2. Makes match_documents() and match_documents_quantized() set
+--    hnsw.ef_search per call. PostgREST runs each RPC in its own
+--    transaction on a pooled connection, so a separate "SET" request would
+--    not carry over; set_config(..., is_local => true) inside the function
+--    scopes the setting to exactly that query.
+--
+-- ef_search is max(40, rows the index scan must produce), so large top_k
+-- requests are never truncated by the HNSW candidate list.
+
+-- =============================================================================
+-- HNSW INDEX
+-- =============================================================================
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_indexes
+        WHERE tablename = 'document_chunks'
+            AND indexdef ILIKE '%USING hnsw (embedding vector_cosine_ops)%'
+    ) THEN
+        CREATE INDEX idx_document_chunks_embedding_hnsw
+            ON document_chunks
+            USING hnsw (embedding vector_cosine_ops)
+            WITH (m = 16, ef_construction = 64);
+    END IF;
+END
+$$;
+
+-- =============================================================================
+-- SEARCH FUNCTIONS
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION match_documents(
+    query_embedding vector(1536),
+    match_count INT DEFAULT 5,
+    similarity_threshold FLOAT DEFAULT 0.1
+)
+RETURNS TABLE (
+    id UUID,
+    content TEXT,
+    metadata JSONB,
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM set_config('hnsw.ef_search', GREATEST(40, match_count)::text, true);
+
+    RETURN QUERY
+    SELECT
+        dc.id,
+        dc.content,
+        dc.metadata,
+        1 - (dc.embedding <=> query_embedding) AS similarity
+    FROM document_chunks dc
+    WHERE dc.embedding IS NOT NULL
+        AND 1 - (dc.embedding <=> query_embedding) > similarity_threshold
+    ORDER BY dc.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION match_documents_quantized(
+    query_embedding vector(1536),
+    match_count INT DEFAULT 5,
+    similarity_threshold FLOAT DEFAULT 0.1,
+    candidate_count INT DEFAULT 50
+)
+RETURNS TABLE (
+    id UUID,
+    content TEXT,
+    metadata JSONB,
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM set_config(
+        'hnsw.ef_search',
+        GREATEST(40, candidate_count, match_count)::text,
+        true
+    );
+
+    RETURN QUERY
+    WITH candidates AS (
+        SELECT dc.id, dc.content, dc.metadata, dc.embedding
+        FROM document_chunks dc
+        WHERE dc.embedding IS NOT NULL
+        ORDER BY binary_quantize(dc.embedding)::bit(1536)
+            <~> binary_quantize(query_embedding)::bit(1536)
+        LIMIT GREATEST(candidate_count, match_count)
+    )
+    SELECT
+        c.id,
+        c.content,
+        c.metadata,
+        1 - (c.embedding <=> query_embedding) AS similarity
+    FROM candidates c
+    WHERE 1 - (c.embedding <=> query_embedding) > similarity_threshold
+    ORDER BY c.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+-- =============================================================================
+-- VERIFICATION
+-- =============================================================================
+
+-- Check HNSW index on embeddings
+SELECT indexname, indexdef FROM pg_indexes
+WHERE tablename = 'document_chunks' AND indexdef ILIKE '%hnsw%';
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Migration 003_hnsw_index_tuning completed successfully!';
+END
+$$;
@@ -0,0 +1,151 @@
+-- Migration: Metadata pre-filters for vector search
+-- Run this in Supabase SQL Editor
+-- Version: 004
+-- Date: 2026-10-15
+--
+-- Requires pgvector >= 0.8 (hnsw.iterative_scan).
+--
+-- Adds optional filters to match_documents() and match_documents_quantized():
+--   - filter_file_types: only chunks whose parent document has one of these
+--     documents.file_type values (e.g. '{pdf,docx}')
+--   - filter_after: only chunks created after this timestamp
+-- Both default to NULL (no filter), so existing callers are unaffected.
+--
+-- With filters, the HNSW scan runs in relaxed iterative mode: it keeps
+-- walking the graph until match_count rows survive the WHERE clause,
+-- instead of filtering a fixed ef_search candidate list down to too few.
+--
+-- The old 3/4-argument functions are dropped first; leaving them would make
+-- PostgREST calls without filter arguments ambiguous.
+
+-- =============================================================================
+-- INDEXES
+-- =============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_documents_file_type
+    ON documents(file_type);
+
+CREATE INDEX IF NOT EXISTS idx_document_chunks_created_at
+    ON document_chunks(created_at DESC);
+
+-- =============================================================================
+-- SEARCH FUNCTIONS
+-- =============================================================================
+
+DROP FUNCTION IF EXISTS match_documents(vector, INT, FLOAT);
+DROP FUNCTION IF EXISTS match_documents_quantized(vector, INT, FLOAT, INT);
+
+CREATE OR REPLACE FUNCTION match_documents(
+    query_embedding vector(1536),
+    match_count INT DEFAULT 5,
+    similarity_threshold FLOAT DEFAULT 0.1,
+    filter_file_types TEXT[] DEFAULT NULL,
+    filter_after TIMESTAMPTZ DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    content TEXT,
+    metadata JSONB,
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM set_config('hnsw.ef_search', GREATEST(40, match_count)::text, true);
+    IF filter_file_types IS NOT NULL OR filter_after IS NOT NULL THEN
+        PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        dc.id,
+        dc.content,
+        dc.metadata,
+        1 - (dc.embedding <=> query_embedding) AS similarity
+    FROM document_chunks dc
+    WHERE dc.embedding IS NOT NULL
+        AND 1 - (dc.embedding <=> query_embedding) > similarity_threshold
+        AND (filter_after IS NULL OR dc.created_at > filter_after)
+        AND (filter_file_types IS NULL OR EXISTS (
+            SELECT 1 FROM documents d
+            WHERE d.id = dc.document_id
+                AND d.file_type = ANY(filter_file_types)
+        ))
+    ORDER BY dc.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION match_documents_quantized(
+    query_embedding vector(1536),
+    match_count INT DEFAULT 5,
+    similarity_threshold FLOAT DEFAULT 0.1,
+    candidate_count INT DEFAULT 50,
+    filter_file_types TEXT[] DEFAULT NULL,
+    filter_after TIMESTAMPTZ DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    content TEXT,
+    metadata JSONB,
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM set_config(
+        'hnsw.ef_search',
+        GREATEST(40, candidate_count, match_count)::text,
+        true
+    );
+    IF filter_file_types IS NOT NULL OR filter_after IS NOT NULL THEN
+        PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+    END IF;
+
+    RETURN QUERY
+    WITH candidates AS (
+        SELECT dc.id, dc.content, dc.metadata, dc.embedding
+        FROM document_chunks dc
+        WHERE dc.embedding IS NOT NULL
+            AND (filter_after IS NULL OR dc.created_at > filter_after)
+            AND (filter_file_types IS NULL OR EXISTS (
+                SELECT 1 FROM documents d
+                WHERE d.id = dc.document_id
+                    AND d.file_type = ANY(filter_file_types)
+            ))
+        ORDER BY binary_quantize(dc.embedding)::bit(1536)
+            <~> binary_quantize(query_embedding)::bit(1536)
+        LIMIT GREATEST(candidate_count, match_count)
+    )
+    SELECT
+        c.id,
+        c.content,
+        c.metadata,
+        1 - (c.embedding <=> query_embedding) AS similarity
+    FROM candidates c
+    WHERE 1 - (c.embedding <=> query_embedding) > similarity_threshold
+    ORDER BY c.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION match_documents(vector, INT, FLOAT, TEXT[], TIMESTAMPTZ)
+    TO anon, authenticated, service_role;
+GRANT EXECUTE ON FUNCTION match_documents_quantized(vector, INT, FLOAT, INT, TEXT[], TIMESTAMPTZ)
+    TO anon, authenticated, service_role;
+
+-- =============================================================================
+-- VERIFICATION
+-- =============================================================================
+
+-- Check function signatures
+SELECT proname, pg_get_function_arguments(oid) AS arguments
+FROM pg_proc
+WHERE proname IN ('match_documents', 'match_documents_quantized');
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Migration 004_filtered_vector_search completed successfully!';
+END
+$$;
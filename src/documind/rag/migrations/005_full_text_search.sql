@@ -0,0 +1,80 @@
+-- Migration: Full-text search over document chunks for hybrid retrieval
+-- Run this in Supabase SQL Editor
+-- Version: 005
+-- Date: 2026-10-15
+--
+-- Adds a stored tsvector column on document_chunks.content with a GIN index,
+-- and a match_documents_fts() RPC ranking chunks with ts_rank_cd. The
+-- application fuses these keyword ranks with vector ranks using Reciprocal
+-- Rank Fusion (see rrf_hybrid_search in src/documind/rag/search.py).
+--
+-- Filter arguments mirror match_documents() (migration 004).
+
+-- =============================================================================
+-- TSVECTOR COLUMN AND INDEX
+-- =============================================================================
+
+-- Generated column: populated for existing rows and kept in sync on write
+ALTER TABLE document_chunks
+    ADD COLUMN IF NOT EXISTS content_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_document_chunks_content_tsv
+    ON document_chunks USING GIN (content_tsv);
+
+-- =============================================================================
+-- SEARCH FUNCTION
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION match_documents_fts(
+    query_text TEXT,
+    match_count INT DEFAULT 10,
+    filter_file_types TEXT[] DEFAULT NULL,
+    filter_after TIMESTAMPTZ DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    content TEXT,
+    metadata JSONB,
+    rank FLOAT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        dc.id,
+        dc.content,
+        dc.metadata,
+        ts_rank_cd(dc.content_tsv, query)::FLOAT AS rank
+    FROM document_chunks dc,
+        websearch_to_tsquery('english', query_text) AS query
+    WHERE dc.content_tsv @@ query
+        AND (filter_after IS NULL OR dc.created_at > filter_after)
+        AND (filter_file_types IS NULL OR EXISTS (
+            SELECT 1 FROM documents d
+            WHERE d.id = dc.document_id
+                AND d.file_type = ANY(filter_file_types)
+        ))
+    ORDER BY rank DESC
+    LIMIT match_count;
+$$;
+
+GRANT EXECUTE ON FUNCTION match_documents_fts(TEXT, INT, TEXT[], TIMESTAMPTZ)
+    TO anon, authenticated, service_role;
+
+-- =============================================================================
+-- VERIFICATION
+-- =============================================================================
+
+-- Check column and index
+SELECT column_name FROM information_schema.columns
+WHERE table_name = 'document_chunks' AND column_name = 'content_tsv';
+
+SELECT indexname FROM pg_indexes
+WHERE tablename = 'document_chunks' AND indexname = 'idx_document_chunks_content_tsv';
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Migration 005_full_text_search completed successfully!';
+END
+$$;
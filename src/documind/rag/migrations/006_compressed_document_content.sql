@@ -0,0 +1,59 @@
+-- Migration: zstd-compressed full document text
+-- Run this in Supabase SQL Editor
+-- Version: 006
+-- Date: 2026-10-15
+--
+-- Adds documents.content_zstd (BYTEA). With DOCUMIND_COMPRESS_CONTENT=1 and
+-- the zstandard package installed, the upload CLI stores each document's
+-- full text there (zstd level 3) and leaves documents.content NULL.
+-- The documind-mcp server (src/documind-mcp/server.py), the only reader of
+-- documents.content, decodes either form through decompress_content()
+-- (src/documind/utils/compression.py).
+--
+-- document_chunks.content is not compressed: embeddings, match_documents(),
+-- the CAG context (migration 007) and the content_tsv full-text index
+-- (migration 005) all work on chunk text, so search is unaffected.
+-- Server-side filters on documents.content (e.g. the MCP search tool's
+-- ILIKE) will not see compressed rows.
+
+-- =============================================================================
+-- COLUMN
+-- =============================================================================
+
+ALTER TABLE documents
+    ADD COLUMN IF NOT EXISTS content_zstd BYTEA;
+
+-- content may now be NULL, but only when the compressed copy is present
+ALTER TABLE documents
+    ALTER COLUMN content DROP NOT NULL;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'documents_content_present'
+    ) THEN
+        ALTER TABLE documents
+            ADD CONSTRAINT documents_content_present
+            CHECK (content IS NOT NULL OR content_zstd IS NOT NULL);
+    END IF;
+END
+$$;
+
+-- Already compressed; skip TOAST's own pglz pass
+ALTER TABLE documents
+    ALTER COLUMN content_zstd SET STORAGE EXTERNAL;
+
+-- =============================================================================
+-- VERIFICATION
+-- =============================================================================
+
+-- Check column
+SELECT column_name, data_type, is_nullable FROM information_schema.columns
+WHERE table_name = 'documents' AND column_name IN ('content', 'content_zstd');
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Migration 006_compressed_document_content completed successfully!';
+END
+$$;
@@ -0,0 +1,57 @@
+-- Migration: Server-side context assembly for the CAG pipeline
+-- Run this in Supabase SQL Editor
+-- Version: 007
+-- Date: 2026-10-15
+--
+-- Adds cag_context(max_docs), which returns the first max_docs chunks
+-- (ordered by document, then chunk index) already formatted as
+--   [Document: <title>]
+--   <chunk text>
+-- and joined with "---" lines: the exact string load_all_documents() in
+-- src/documind/rag/cag_pipeline.py builds from individual rows. One text
+-- value comes back instead of max_docs JSON objects; databases without this
+-- function fall back to the row-by-row path.
+
+-- =============================================================================
+-- CONTEXT FUNCTION
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION cag_context(max_docs INT DEFAULT 20)
+RETURNS TEXT
+LANGUAGE sql STABLE
+AS $$
+    SELECT coalesce(
+        string_agg(
+            format(E'[Document: %s]\n%s', c.title, c.chunk_text),
+            E'\n---\n'
+            ORDER BY c.document_id, c.chunk_index
+        ),
+        ''
+    )
+    FROM (
+        SELECT dc.document_id, dc.chunk_index, dc.chunk_text, d.title
+        FROM document_chunks dc
+        JOIN documents d ON d.id = dc.document_id
+        ORDER BY dc.document_id, dc.chunk_index
+        LIMIT max_docs
+    ) c;
+$$;
+
+GRANT EXECUTE ON FUNCTION cag_context(INT)
+    TO anon, authenticated, service_role;
+
+-- =============================================================================
+-- VERIFICATION
+-- =============================================================================
+
+-- Check function exists
+SELECT EXISTS (
+    SELECT FROM pg_proc WHERE proname = 'cag_context'
+) AS function_exists;
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Migration 007_cag_context completed successfully!';
+END
+$$;
@@ -0,0 +1,67 @@
+-- Migration: Batched vector search
+-- Run this in Supabase SQL Editor
+-- Version: 008
+-- Date: 2026-10-16
+--
+-- Adds match_documents_batch(query_embeddings, ...), which runs
+-- match_documents() (migration 004) for every embedding in a JSON array and
+-- returns all matches in one response, tagged with the 0-based query_index
+-- of the embedding they belong to. search_documents_batch() and
+-- BatchingRetriever in src/documind/rag/search.py use it to answer several
+-- concurrent questions with a single round trip.
+--
+-- Embeddings are passed as JSONB (an array of float arrays) rather than
+-- vector[], since PostgREST cannot coerce nested JSON arrays into an array
+-- of vectors.
+
+-- =============================================================================
+-- SEARCH FUNCTION
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION match_documents_batch(
+    query_embeddings JSONB,
+    match_count INT DEFAULT 5,
+    similarity_threshold FLOAT DEFAULT 0.1
+)
+RETURNS TABLE (
+    query_index INT,
+    id UUID,
+    content TEXT,
+    metadata JSONB,
+    similarity FLOAT
+)
+LANGUAGE sql
+AS $$
+    SELECT
+        (q.ordinality - 1)::INT AS query_index,
+        m.id,
+        m.content,
+        m.metadata,
+        m.similarity
+    FROM jsonb_array_elements(query_embeddings) WITH ORDINALITY AS q(embedding, ordinality)
+    CROSS JOIN LATERAL match_documents(
+        (q.embedding::text)::vector(1536),
+        match_count,
+        similarity_threshold
+    ) AS m
+    ORDER BY q.ordinality, m.similarity DESC;
+$$;
+
+GRANT EXECUTE ON FUNCTION match_documents_batch(JSONB, INT, FLOAT)
+    TO anon, authenticated, service_role;
+
+-- =============================================================================
+-- VERIFICATION
+-- =============================================================================
+
+-- Check function signature
+SELECT proname, pg_get_function_arguments(oid) AS arguments
+FROM pg_proc
+WHERE proname = 'match_documents_batch';
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Migration 008_batch_vector_search completed successfully!';
+END
+$$;
@@ -0,0 +1,125 @@
+-- Migration: Server-side aggregation for query analytics
+-- Run this in Supabase SQL Editor
+-- Version: 009
+-- Date: 2026-10-16
+--
+-- Adds get_query_analytics(start_at, end_at, max_rows), which aggregates the
+-- newest max_rows query_logs rows in [start_at, end_at] and returns one JSON
+-- object:
+--   {
+--     "total": <rows>,
+--     "response_times": {"avg", "p50", "p95", "min", "max"} | null,
+--     "models": [{"model", "count", "avg_latency", "fallback_count"}, ...],
+--     "popular_terms": [{"term", "count"}, ...]   -- top 10, words > 3 chars
+--   }
+-- ProductionQA.get_analytics() (src/documind/rag/production_qa.py) used to
+-- download every row and compute the same figures in Python; it still does
+-- so when this function is missing.
+--
+-- Percentiles index the sorted response times exactly like the Python code
+-- (p50 = times[n / 2], p95 = times[floor(n * 0.95)], 0-based), and zero or
+-- NULL response times are ignored. Models and tied terms are listed in
+-- order of first appearance, newest log first.
+
+-- =============================================================================
+-- ANALYTICS FUNCTION
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION get_query_analytics(
+    start_at TIMESTAMPTZ,
+    end_at TIMESTAMPTZ,
+    max_rows INT DEFAULT 100
+)
+RETURNS JSONB
+LANGUAGE sql STABLE
+AS $$
+    WITH recent AS (
+        SELECT
+            row_number() OVER (ORDER BY created_at DESC) AS rn,
+            question,
+            coalesce(model, 'unknown') AS model,
+            nullif(response_time, 0) AS response_time,
+            coalesce(fallback_used, false) AS fallback_used
+        FROM query_logs
+        WHERE created_at >= start_at AND created_at <= end_at
+        ORDER BY created_at DESC
+        LIMIT max_rows
+    ),
+    times AS (
+        SELECT
+            array_agg(response_time ORDER BY response_time) AS sorted,
+            count(*) AS n,
+            avg(response_time) AS avg
+        FROM recent
+        WHERE response_time IS NOT NULL
+    ),
+    models AS (
+        SELECT
+            model,
+            count(*) AS count,
+            avg(response_time) AS avg_latency,
+            count(*) FILTER (WHERE fallback_used) AS fallback_count,
+            min(rn) AS first_seen
+        FROM recent
+        GROUP BY model
+    ),
+    terms AS (
+        SELECT
+            w.word AS term,
+            count(*) AS count,
+            min(r.rn * 100000 + w.pos) AS first_seen
+        FROM recent r,
+            unnest(regexp_split_to_array(lower(coalesce(r.question, '')), '\s+'))
+                WITH ORDINALITY AS w(word, pos)
+        WHERE char_length(w.word) > 3
+        GROUP BY w.word
+        ORDER BY count(*) DESC, min(r.rn * 100000 + w.pos)
+        LIMIT 10
+    )
+    SELECT jsonb_build_object(
+        'total', (SELECT count(*) FROM recent),
+        'response_times', (
+            SELECT CASE WHEN n = 0 THEN NULL ELSE jsonb_build_object(
+                'avg', avg,
+                'p50', sorted[n / 2 + 1],
+                'p95', sorted[floor(n * 0.95)::INT + 1],
+                'min', sorted[1],
+                'max', sorted[n]
+            ) END
+            FROM times
+        ),
+        'models', coalesce((
+            SELECT jsonb_agg(jsonb_build_object(
+                'model', model,
+                'count', count,
+                'avg_latency', avg_latency,
+                'fallback_count', fallback_count
+            ) ORDER BY first_seen)
+            FROM models
+        ), '[]'::jsonb),
+        'popular_terms', coalesce((
+            SELECT jsonb_agg(jsonb_build_object('term', term, 'count', count)
+                ORDER BY count DESC, first_seen)
+            FROM terms
+        ), '[]'::jsonb)
+    );
+$$;
+
+GRANT EXECUTE ON FUNCTION get_query_analytics(TIMESTAMPTZ, TIMESTAMPTZ, INT)
+    TO anon, authenticated, service_role;
+
+-- =============================================================================
+-- VERIFICATION
+-- =============================================================================
+
+-- Check function signature
+SELECT proname, pg_get_function_arguments(oid) AS arguments
+FROM pg_proc
+WHERE proname = 'get_query_analytics';
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Migration 009_query_analytics completed successfully!';
+END
+$$;
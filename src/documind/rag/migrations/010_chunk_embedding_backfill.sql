@@ -0,0 +1,56 @@
+-- Migration: Bulk embedding backfill
+-- Run this in Supabase SQL Editor
+-- Version: 010
+-- Date: 2026-10-16
+--
+-- Adds set_chunk_embeddings(chunk_embeddings), which writes a batch of
+-- embeddings to document_chunks in one UPDATE and returns the number of rows
+-- updated. chunk_embeddings is a JSON array of
+-- {"id": <chunk uuid>, "embedding": [floats]}.
+-- populate_embeddings() in src/documind/rag/search.py uses it to write each
+-- embedded batch with a single round trip instead of one UPDATE per chunk
+-- (a PostgREST upsert of {id, embedding} would fail on the other NOT NULL
+-- columns). It runs with the caller's privileges, so table grants and RLS
+-- policies on document_chunks still apply.
+
+-- =============================================================================
+-- BACKFILL FUNCTION
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION set_chunk_embeddings(chunk_embeddings JSONB)
+RETURNS INT
+LANGUAGE sql
+AS $$
+    WITH updated AS (
+        UPDATE document_chunks c
+        SET embedding = (r.embedding::text)::vector(1536)
+        FROM jsonb_to_recordset(chunk_embeddings) AS r(id UUID, embedding JSONB)
+        WHERE c.id = r.id
+        RETURNING c.id
+    )
+    SELECT count(*)::INT FROM updated;
+$$;
+
+GRANT EXECUTE ON FUNCTION set_chunk_embeddings(JSONB)
+    TO anon, authenticated, service_role;
+
+-- =============================================================================
+-- VERIFICATION
+-- =============================================================================
+
+-- Check function signature
+SELECT proname, pg_get_function_arguments(oid) AS arguments
+FROM pg_proc
+WHERE proname = 'set_chunk_embeddings';
+
+-- Chunks still waiting for an embedding
+SELECT count(*) AS chunks_without_embedding
+FROM document_chunks
+WHERE embedding IS NULL;
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Migration 010_chunk_embedding_backfill completed successfully!';
+END
+$$;
@@ -0,0 +1,32 @@
+-- Migration: Record semantic cache hits in query_logs
+-- Run this in Supabase SQL Editor
+-- Version: 011
+-- Date: 2026-10-16
+--
+-- Adds query_logs.cache_hit. ProductionQA logs answers served from its
+-- semantic cache too (src/documind/rag/production_qa.py), with cache_hit set
+-- to true, so analytics count every query that was answered. Rows logged
+-- before this migration default to false.
+
+-- =============================================================================
+-- CACHE HIT COLUMN
+-- =============================================================================
+
+ALTER TABLE query_logs
+    ADD COLUMN IF NOT EXISTS cache_hit BOOLEAN DEFAULT false;
+
+-- =============================================================================
+-- VERIFICATION
+-- =============================================================================
+
+-- Check the new column
+SELECT column_name, data_type, column_default
+FROM information_schema.columns
+WHERE table_name = 'query_logs' AND column_name = 'cache_hit';
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE '✓ Migration 011_query_logs_cache_hit completed successfully!';
+END
+$$;
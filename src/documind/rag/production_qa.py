@@ -17,15 +17,23 @@ Usage:
     python src/documind/rag/production_qa.py --interactive
 """
 
+import asyncio
+import atexit
 import os
+import queue
+import threading
 import time
 import hashlib
+import heapq
 import re
+import sys
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any, Optional, Tuple
-from collections import defaultdict
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from operator import itemgetter
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from statistics import mean
 
 from dotenv import load_dotenv
@@ -34,25 +42,45 @@ from supabase import create_client, Client
 
 # Support both module and direct execution
 try:
-    from documind.rag.search import search_documents, hybrid_search, get_query_embedding
+    from documind.cache.semantic import SemanticCache
+    from documind.net import supabase_client_options
+    from documind.utils.json_io import dumps_json
+    from documind.rag.search import (
+        BatchingRetriever,
+        search_documents,
+        hybrid_search,
+        get_query_embedding,
+    )
     from documind.rag.qa_pipeline import (
         MODELS,
         MODEL_INFO,
         assemble_context,
         build_qa_prompt,
         _get_openrouter_client,
+        _get_async_openrouter_client,
+        llm_slot,
     )
 except ImportError:
     # Direct execution - use absolute imports
     import sys
     sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
-    from src.documind.rag.search import search_documents, hybrid_search, get_query_embedding
+    from src.documind.cache.semantic import SemanticCache
+    from src.documind.net import supabase_client_options
+    from src.documind.utils.json_io import dumps_json
+    from src.documind.rag.search import (
+        BatchingRetriever,
+        search_documents,
+        hybrid_search,
+        get_query_embedding,
+    )
     from src.documind.rag.qa_pipeline import (
         MODELS,
         MODEL_INFO,
         assemble_context,
         build_qa_prompt,
         _get_openrouter_client,
+        _get_async_openrouter_client,
+        llm_slot,
     )
 
 # Load environment variables
@@ -75,10 +103,77 @@ def _get_supabase_client() -> Client:
             raise ValueError(
                 "SUPABASE_URL and SUPABASE_ANON_KEY environment variables must be set"
             )
-        _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        _supabase_client = create_client(
+            SUPABASE_URL, SUPABASE_KEY, options=supabase_client_options()
+        )
     return _supabase_client
 
 
+class QueryLogWriter:
+    """Write query_logs rows from a background thread in batched inserts.
+
+    ``submit`` only enqueues, so queries return without waiting on a
+    Supabase round trip. A daemon thread collects rows until ``max_batch``
+    are queued or ``max_wait`` seconds have passed since the first one,
+    then inserts them with a single multi-row request. Pending rows are
+    flushed at interpreter exit.
+    """
+
+    def __init__(self, max_batch: int = 64, max_wait: float = 0.1):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, entry: Dict[str, Any]) -> None:
+        """Queue a query_logs row for insertion."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+        self._queue.put_nowait(entry)
+
+    def flush(self) -> None:
+        """Block until every submitted row has been written (or dropped)."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _write(batch: List[Dict[str, Any]]) -> None:
+        try:
+            _get_supabase_client().table("query_logs").insert(batch).execute()
+        except Exception as e:
+            # Logging shouldn't break queries (or kill the writer thread)
+            print(f"Warning: Failed to log {len(batch)} queries: {e}")
+
+
+@lru_cache(maxsize=1)
+def _get_query_log_writer() -> QueryLogWriter:
+    """Get the process-wide background query log writer."""
+    return QueryLogWriter()
+
+
 # =============================================================================
 # PRODUCTION QA CLASS
 # =============================================================================
@@ -116,6 +211,10 @@ class ProductionQA:
         fallback_models: Optional[List[str]] = None,
         enable_logging: bool = True,
         enable_pii_redaction: bool = False,
+        enable_semantic_cache: bool = False,
+        cache_threshold: float = 0.92,
+        batch_retrieval: bool = False,
+        context_cache_size: int = 0,
     ):
         """
         Initialize ProductionQA system.
@@ -127,6 +226,20 @@ class ProductionQA:
                 Defaults to [gpt-4o-mini, claude-3.5-haiku, deepseek-chat].
             enable_logging: Whether to log queries to database. Defaults to True.
             enable_pii_redaction: Whether to redact PII in logs. Defaults to False.
+            enable_semantic_cache: Answer near-duplicate questions from an
+                in-memory cache instead of re-running retrieval and
+                generation. Hits are still logged, with cache_hit set
+                (requires migration 011). Defaults to False.
+            cache_threshold: Minimum cosine similarity between question
+                embeddings for a cache hit. Defaults to 0.92.
+            batch_retrieval: Coalesce the semantic searches of concurrent
+                aquery() calls into batched database round trips (requires
+                migration 008). Defaults to False.
+            context_cache_size: Remember the retrieved documents and built
+                context of this many recent (question, top_k, use_hybrid)
+                combinations, so exact repeats skip retrieval. Entries are
+                not invalidated when documents change, so leave this off
+                (0, the default) for long-lived services.
         """
         # Resolve model alias if provided
         if default_model in MODELS:
@@ -141,9 +254,28 @@ class ProductionQA:
         self.enable_logging = enable_logging
         self.enable_pii_redaction = enable_pii_redaction
 
-        # Embedding cache for performance
-        self._embedding_cache: Dict[str, List[float]] = {}
-        self._cache_max_size = 100
+        # Query embeddings are cached process-wide by get_query_embedding(),
+        # so every ProductionQA instance (and Streamlit rerun) shares them.
+
+        # Full result of the most recent stream_query() once it finishes
+        self.last_result: Optional[Dict[str, Any]] = None
+
+        # Answers keyed by question embedding (LRU + TTL bounded), one cache
+        # per (model, enable_fallback, include_sources, top_k, use_hybrid)
+        self.cache_threshold = cache_threshold
+        self.semantic_caches: Optional[Dict[Tuple[Any, ...], SemanticCache]] = (
+            {} if enable_semantic_cache else None
+        )
+
+        # Shared by concurrent aquery() calls (same threshold as enhanced_search)
+        self.batch_retriever: Optional[BatchingRetriever] = (
+            BatchingRetriever(similarity_threshold=0.3) if batch_retrieval else None
+        )
+
+        # (question, top_k, use_hybrid) -> (documents, context, citation_map), LRU
+        self.context_cache_size = context_cache_size
+        self._ctx_cache: OrderedDict = OrderedDict()
+        self._ctx_lock = threading.Lock()
 
     # =========================================================================
     # ENHANCED SEARCH
@@ -193,28 +325,77 @@ class ProductionQA:
                 query, top_k=fetch_k, similarity_threshold=similarity_threshold
             )
 
+        return self._refine_results(results, query, top_k, rerank, deduplicate)
+
+    def _refine_results(
+        self,
+        results: List[Dict[str, Any]],
+        query: str,
+        top_k: int,
+        rerank: bool = True,
+        deduplicate: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Deduplicate, re-rank, trim to top_k and add citation info."""
         # Deduplication
         if deduplicate and results:
             results = self._deduplicate_results(results)
 
         # Re-ranking
         if rerank and results:
-            results = self._rerank_results(results, query)
+            results = self._rerank_results(results, query, top_k)
 
         # Limit to top_k
         results = results[:top_k]
 
         # Enrich results with citation info
+        highlight_patterns = self._highlight_patterns(query)
         for i, doc in enumerate(results, 1):
             doc["citation_number"] = i
             doc["document_link"] = self._generate_document_link(doc)
             doc["citation_format"] = f"[Source {i}]"
             doc["highlighted_content"] = self._highlight_query_terms(
-                doc.get("content", ""), query
+                doc.get("content", ""), query, highlight_patterns
             )
 
         return results
 
+    def _retrieve_context(
+        self, question: str, top_k: int = 5, use_hybrid: bool = False
+    ) -> Tuple[List[Dict[str, Any]], str, Dict[str, int]]:
+        """
+        Retrieve documents for a question and build the cited context.
+
+        Served from the exact-match context cache when enabled.
+
+        Returns:
+            Tuple of (documents, context, citation_map)
+        """
+        key = (question, top_k, use_hybrid)
+        if self.context_cache_size > 0:
+            with self._ctx_lock:
+                cached = self._ctx_cache.get(key)
+                if cached is not None:
+                    self._ctx_cache.move_to_end(key)
+                    return cached
+
+        documents = self.enhanced_search(
+            question,
+            top_k=top_k,
+            rerank=True,
+            deduplicate=True,
+            use_hybrid=use_hybrid,
+        )
+        context, citation_map = self._build_cited_context(documents)
+        entry = (documents, context, citation_map)
+
+        if self.context_cache_size > 0:
+            with self._ctx_lock:
+                self._ctx_cache[key] = entry
+                self._ctx_cache.move_to_end(key)
+                while len(self._ctx_cache) > self.context_cache_size:
+                    self._ctx_cache.popitem(last=False)
+        return entry
+
     def _deduplicate_results(
         self, results: List[Dict[str, Any]], threshold: float = 0.85
     ) -> List[Dict[str, Any]]:
@@ -238,34 +419,43 @@ class ProductionQA:
         return unique_results
 
     def _rerank_results(
-        self, results: List[Dict[str, Any]], query: str
+        self,
+        results: List[Dict[str, Any]],
+        query: str,
+        top_k: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
-        """Re-rank results using multiple signals."""
-        query_terms = set(query.lower().split())
+        """
+        Re-rank results using multiple signals.
+
+        Args:
+            results: Search results to score (modified in place).
+            query: The search query.
+            top_k: Return only the best top_k results. Defaults to all.
+
+        Returns:
+            Results ordered by final_score, best first.
+        """
+        query_terms = tuple(set(query.lower().split()))
+        term_weight = 0.1 / max(len(query_terms), 1)
 
         for doc in results:
-            base_score = doc.get("similarity", 0.5)
             content = doc.get("content", "").lower()
 
             # Term frequency boost
             term_matches = sum(1 for term in query_terms if term in content)
-            term_boost = min(
-                term_matches / max(len(query_terms), 1) * 0.1, 0.1)
+            term_boost = min(term_matches * term_weight, 0.1)
 
             # Length penalty (prefer medium-length chunks)
-            content_len = len(content)
-            if 100 <= content_len <= 1000:
-                length_boost = 0.05
-            else:
-                length_boost = 0
+            length_boost = 0.05 if 100 <= len(content) <= 1000 else 0
 
             # Calculate final score
-            doc["final_score"] = base_score + term_boost + length_boost
+            doc["final_score"] = doc.get("similarity", 0.5) + term_boost + length_boost
 
-        # Sort by final score
-        results.sort(key=lambda x: x.get(
-            "final_score", x.get("similarity", 0)), reverse=True)
+        # Only the top_k survive, so a partial selection beats a full sort
+        if top_k is not None and top_k < len(results):
+            return heapq.nlargest(top_k, results, key=itemgetter("final_score"))
 
+        results.sort(key=itemgetter("final_score"), reverse=True)
         return results
 
     def _generate_document_link(self, doc: Dict[str, Any]) -> str:
@@ -275,19 +465,39 @@ class ProductionQA:
         doc_id = doc.get("id", "")
         return f"doc://{doc_name}#chunk-{chunk_idx}?id={doc_id}"
 
-    def _highlight_query_terms(self, content: str, query: str) -> str:
-        """Highlight query terms in content using **bold** markers."""
+    def _highlight_query_terms(
+        self,
+        content: str,
+        query: str,
+        patterns: Optional[List[Tuple[re.Pattern, str]]] = None,
+    ) -> str:
+        """
+        Highlight query terms in content using **bold** markers.
+
+        Pass patterns from _highlight_patterns(query) when highlighting
+        several chunks for the same query.
+        """
         if not content or not query:
             return content
 
+        if patterns is None:
+            patterns = self._highlight_patterns(query)
+
         highlighted = content
-        for term in query.lower().split():
-            if len(term) > 2:  # Skip short words
-                pattern = re.compile(re.escape(term), re.IGNORECASE)
-                highlighted = pattern.sub(f"**{term}**", highlighted)
+        for pattern, replacement in patterns:
+            highlighted = pattern.sub(replacement, highlighted)
 
         return highlighted
 
+    @staticmethod
+    def _highlight_patterns(query: str) -> List[Tuple[re.Pattern, str]]:
+        """Compiled (pattern, replacement) pairs for each query term."""
+        return [
+            (re.compile(re.escape(term), re.IGNORECASE), f"**{term}**")
+            for term in query.lower().split()
+            if len(term) > 2  # Skip short words
+        ]
+
     # =========================================================================
     # MAIN QUERY METHOD
     # =========================================================================
@@ -323,6 +533,7 @@ class ProductionQA:
                 - complexity: Query complexity estimate
                 - query: Original question
                 - timestamp: ISO timestamp
+                - cache_hit: Present (True) when answered from the semantic cache
 
         Raises:
             ValueError: If question is empty.
@@ -340,23 +551,27 @@ class ProductionQA:
         if target_model in MODELS:
             target_model = MODELS[target_model]
 
+        cache_params = (target_model, enable_fallback, include_sources, top_k, use_hybrid)
+        question_embedding = None
+        if self.semantic_caches is not None:
+            # Memoized, so enhanced_search below reuses it on a miss
+            question_embedding = get_query_embedding(question)
+            cached = self._cache_lookup(question, question_embedding, cache_params, start_time)
+            if cached is not None:
+                if log_query and self.enable_logging:
+                    self._queue_log_result(cached)
+                return cached
+
         # Analyze query complexity
         complexity = self._analyze_complexity(question)
 
-        # Step 1: Retrieve documents
+        # Steps 1-2: Retrieve documents and build context with citations
         search_start = time.perf_counter()
-        documents = self.enhanced_search(
-            question,
-            top_k=top_k,
-            rerank=True,
-            deduplicate=True,
-            use_hybrid=use_hybrid,
+        documents, context, citation_map = self._retrieve_context(
+            question, top_k, use_hybrid
         )
         timing["search"] = time.perf_counter() - search_start
 
-        # Step 2: Build context with citations
-        context, citation_map = self._build_cited_context(documents)
-
         # Step 3: Build prompt
         prompt = self._build_production_prompt(question, context, citation_map)
 
@@ -368,12 +583,250 @@ class ProductionQA:
         timing["generation"] = time.perf_counter() - gen_start
         timing["total"] = time.perf_counter() - start_time
 
-        # Step 5: Extract cited sources
+        # Steps 5-6: Extract cited sources and format response
+        result = self._format_query_result(
+            question, answer, documents, citation_map, model_used,
+            fallback_used, timing, complexity, include_sources,
+        )
+        self._cache_store(question_embedding, cache_params, result)
+
+        # Step 7: Log query
+        if log_query and self.enable_logging:
+            self._queue_log_result(result)
+
+        return result
+
+    async def aquery(
+        self,
+        question: str,
+        model: Optional[str] = None,
+        enable_fallback: bool = True,
+        include_sources: bool = True,
+        log_query: bool = True,
+        top_k: int = 5,
+        use_hybrid: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Async variant of query() for concurrent batch workloads.
+
+        Retrieval and logging run in worker threads; generation awaits the
+        AsyncOpenAI OpenRouter client, so many questions can be in flight at
+        once with asyncio.gather (e.g. RAGAS evaluation).
+
+        Args:
+            Same as query().
+
+        Returns:
+            Same dictionary as query().
+
+        Raises:
+            ValueError: If question is empty.
+            Exception: If all models fail.
+        """
+        if not question or not question.strip():
+            raise ValueError("Question cannot be empty")
+
+        start_time = time.perf_counter()
+        timing = {"embedding": 0, "search": 0, "generation": 0, "total": 0}
+
+        target_model = model if model else self.default_model
+        if target_model in MODELS:
+            target_model = MODELS[target_model]
+
+        cache_params = (target_model, enable_fallback, include_sources, top_k, use_hybrid)
+        question_embedding = None
+        if self.semantic_caches is not None:
+            question_embedding = await asyncio.to_thread(get_query_embedding, question)
+            cached = self._cache_lookup(question, question_embedding, cache_params, start_time)
+            if cached is not None:
+                if log_query and self.enable_logging:
+                    self._queue_log_result(cached)
+                return cached
+
+        complexity = self._analyze_complexity(question)
+
+        search_start = time.perf_counter()
+        if self.batch_retriever is not None and not use_hybrid:
+            results = await self.batch_retriever.search(question, top_k=top_k * 2)
+            documents = self._refine_results(results, question, top_k)
+            context, citation_map = self._build_cited_context(documents)
+        else:
+            documents, context, citation_map = await asyncio.to_thread(
+                self._retrieve_context, question, top_k, use_hybrid
+            )
+        timing["search"] = time.perf_counter() - search_start
+        prompt = self._build_production_prompt(question, context, citation_map)
+
+        gen_start = time.perf_counter()
+        answer, model_used, fallback_used = await self._agenerate_with_fallback(
+            prompt, target_model, enable_fallback
+        )
+        timing["generation"] = time.perf_counter() - gen_start
+        timing["total"] = time.perf_counter() - start_time
+
+        result = self._format_query_result(
+            question, answer, documents, citation_map, model_used,
+            fallback_used, timing, complexity, include_sources,
+        )
+        self._cache_store(question_embedding, cache_params, result)
+
+        if log_query and self.enable_logging:
+            self._queue_log_result(result)
+
+        return result
+
+    def _cache_lookup(
+        self,
+        question: str,
+        question_embedding: List[float],
+        cache_params: Tuple[Any, ...],
+        start_time: float,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cached result for a similar question asked with the same options.
+
+        Returns:
+            Copy of the cached result with cache_hit/cache_similarity set,
+            query/timestamp describing this question and timing reflecting
+            the lookup, or None on a miss
+        """
+        cache = self.semantic_caches.get(cache_params)
+        hit = cache.lookup(question_embedding) if cache is not None else None
+        if hit is None:
+            return None
+
+        result = dict(hit["result"])
+        result["query"] = question
+        result["timestamp"] = datetime.now(timezone.utc).isoformat()
+        result["cache_hit"] = True
+        result["cache_similarity"] = round(hit["cache_similarity"], 4)
+        result["timing"] = {
+            "embedding": 0, "search": 0, "generation": 0,
+            "total": time.perf_counter() - start_time,
+        }
+        return result
+
+    def _cache_store(
+        self,
+        question_embedding: Optional[List[float]],
+        cache_params: Tuple[Any, ...],
+        result: Dict[str, Any],
+    ) -> None:
+        """Remember a freshly generated result (no-op without the cache)."""
+        if question_embedding is not None:
+            cache = self.semantic_caches.get(cache_params)
+            if cache is None:
+                cache = self.semantic_caches.setdefault(
+                    cache_params, SemanticCache(threshold=self.cache_threshold)
+                )
+            cache.insert(question_embedding, {"result": dict(result)})
+
+    def _queue_log_result(self, result: Dict[str, Any]) -> None:
+        """Queue a query result for logging, recording (not raising) failures."""
+        try:
+            self.queue_log(result)
+        except Exception as e:
+            # Don't fail the query if logging fails
+            result["logging_error"] = str(e)
+
+    def stream_query(
+        self,
+        question: str,
+        model: Optional[str] = None,
+        enable_fallback: bool = True,
+        include_sources: bool = True,
+        log_query: bool = True,
+        top_k: int = 5,
+        use_hybrid: bool = False,
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Iterator[str]:
+        """
+        Streaming variant of query() that yields the answer as it is generated.
+
+        Retrieval runs first; answer text is then yielded delta by delta from
+        a streaming completion, so UIs (e.g. st.write_stream) show the first
+        tokens without waiting for the whole answer. When the generator is
+        exhausted, the full query() result dictionary, with
+        timing["first_token"] added, is passed to on_complete and stored in
+        self.last_result. Prefer on_complete when the instance is shared
+        between threads (e.g. a Streamlit cache_resource).
+
+        Fallback models are only tried if a model fails before producing any
+        output; a failure mid-stream is raised.
+
+        Args:
+            Same as query(), plus:
+            on_complete: Called with the full result once streaming ends.
+
+        Yields:
+            Answer text deltas.
+
+        Raises:
+            ValueError: If question is empty.
+            Exception: If all models fail.
+        """
+        if not question or not question.strip():
+            raise ValueError("Question cannot be empty")
+
+        self.last_result = None
+        start_time = time.perf_counter()
+        timing = {"embedding": 0, "search": 0, "first_token": 0, "generation": 0, "total": 0}
+
+        target_model = model if model else self.default_model
+        if target_model in MODELS:
+            target_model = MODELS[target_model]
+
+        complexity = self._analyze_complexity(question)
+
+        search_start = time.perf_counter()
+        documents, context, citation_map = self._retrieve_context(
+            question, top_k, use_hybrid
+        )
+        timing["search"] = time.perf_counter() - search_start
+        prompt = self._build_production_prompt(question, context, citation_map)
+
+        gen_start = time.perf_counter()
+        answer_parts: List[str] = []
+        model_used, fallback_used = target_model, False
+        for delta, model_used, fallback_used in self._stream_with_fallback(
+            prompt, target_model, enable_fallback
+        ):
+            if not answer_parts:
+                timing["first_token"] = time.perf_counter() - start_time
+            answer_parts.append(delta)
+            yield delta
+        timing["generation"] = time.perf_counter() - gen_start
+        timing["total"] = time.perf_counter() - start_time
+
+        result = self._format_query_result(
+            question, "".join(answer_parts), documents, citation_map, model_used,
+            fallback_used, timing, complexity, include_sources,
+        )
+
+        if log_query and self.enable_logging:
+            self._queue_log_result(result)
+
+        self.last_result = result
+        if on_complete is not None:
+            on_complete(result)
+
+    def _format_query_result(
+        self,
+        question: str,
+        answer: str,
+        documents: List[Dict[str, Any]],
+        citation_map: Dict[str, int],
+        model_used: str,
+        fallback_used: bool,
+        timing: Dict[str, float],
+        complexity: str,
+        include_sources: bool,
+    ) -> Dict[str, Any]:
+        """Assemble the query() response dictionary."""
         cited_sources = self._extract_cited_sources(
             answer, documents, citation_map)
 
-        # Step 6: Format response
-        result = {
+        return {
             "answer": answer,
             "sources": cited_sources if include_sources else [],
             "model": model_used,
@@ -385,16 +838,6 @@ class ProductionQA:
             "context_chunks": len(documents),
         }
 
-        # Step 7: Log query
-        if log_query and self.enable_logging:
-            try:
-                self.log_query(result)
-            except Exception as e:
-                # Don't fail the query if logging fails
-                result["logging_error"] = str(e)
-
-        return result
-
     def _analyze_complexity(self, question: str) -> str:
         """Analyze query complexity: simple, medium, or complex."""
         words = question.split()
@@ -501,6 +944,73 @@ ANSWER (remember to cite sources with [Source X]):"""
 
         raise Exception(f"All models failed. Last error: {last_error}")
 
+    def _stream_with_fallback(
+        self, prompt: str, primary_model: str, enable_fallback: bool
+    ) -> Iterator[Tuple[str, str, bool]]:
+        """Stream (delta, model_used, fallback_used) tuples, with fallback."""
+        client = _get_openrouter_client()
+        last_error = None
+
+        models_to_try = [primary_model]
+        if enable_fallback:
+            models_to_try += [m for m in self.fallback_models if m != primary_model]
+
+        for i, candidate in enumerate(models_to_try):
+            started = False
+            try:
+                stream = client.chat.completions.create(
+                    model=candidate,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.1,
+                    max_tokens=500,
+                    timeout=60.0,
+                    stream=True,
+                )
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        started = True
+                        yield delta, candidate, i > 0
+                return
+            except Exception as e:
+                # Output already shown to the caller can't be retracted
+                if started:
+                    raise
+                if i == 0:
+                    last_error = e
+
+        raise Exception(f"All models failed. Last error: {last_error}")
+
+    async def _agenerate_with_fallback(
+        self, prompt: str, primary_model: str, enable_fallback: bool
+    ) -> Tuple[str, str, bool]:
+        """Async counterpart of _generate_with_fallback()."""
+        client = _get_async_openrouter_client()
+        last_error = None
+
+        models_to_try = [primary_model]
+        if enable_fallback:
+            models_to_try += [m for m in self.fallback_models if m != primary_model]
+
+        for i, candidate in enumerate(models_to_try):
+            try:
+                async with llm_slot():
+                    response = await client.chat.completions.create(
+                        model=candidate,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0.1,
+                        max_tokens=500,
+                        timeout=60.0,
+                    )
+                return response.choices[0].message.content, candidate, i > 0
+            except Exception as e:
+                if i == 0:
+                    last_error = e
+
+        raise Exception(f"All models failed. Last error: {last_error}")
+
     def _extract_cited_sources(
         self,
         answer: str,
@@ -562,21 +1072,10 @@ ANSWER (remember to cite sources with [Source X]):"""
                 - sources: Shared source documents
                 - timestamp: ISO timestamp
         """
-        # Default models
-        if models is None:
-            models = ["default", "premium", "budget"]
-
-        # Resolve aliases
-        resolved_models = []
-        for m in models:
-            if m in MODELS:
-                resolved_models.append(MODELS[m])
-            else:
-                resolved_models.append(m)
+        resolved_models = self._resolve_models(models)
 
         # Get shared context
-        documents = self.enhanced_search(question, top_k=5)
-        context, citation_map = self._build_cited_context(documents)
+        documents, context, citation_map = self._retrieve_context(question, top_k=5)
         prompt = self._build_production_prompt(question, context, citation_map)
 
         # Execute queries
@@ -593,21 +1092,7 @@ ANSWER (remember to cite sources with [Source X]):"""
                     max_tokens=500,
                     timeout=timeout,
                 )
-                latency = int((time.perf_counter() - start) * 1000)
-
-                result = {
-                    "answer": response.choices[0].message.content,
-                    "latency_ms": latency,
-                }
-
-                if hasattr(response, "usage") and response.usage:
-                    result["usage"] = {
-                        "prompt_tokens": response.usage.prompt_tokens,
-                        "completion_tokens": response.usage.completion_tokens,
-                        "total_tokens": response.usage.total_tokens,
-                    }
-
-                return model, result
+                return model, self._model_result(response, start)
 
             except Exception as e:
                 latency = int((time.perf_counter() - start) * 1000)
@@ -628,6 +1113,91 @@ ANSWER (remember to cite sources with [Source X]):"""
                 _, result = query_model(model)
                 results[model] = result
 
+        return self._format_comparison(question, resolved_models, results, documents)
+
+    async def acompare_models(
+        self,
+        question: str,
+        models: Optional[List[str]] = None,
+        timeout: float = 60.0,
+    ) -> Dict[str, Any]:
+        """
+        Async variant of compare_models().
+
+        All completions are awaited together on the AsyncOpenAI OpenRouter
+        client, so wall time is the slowest model's latency rather than the
+        sum, without a thread per model.
+
+        Args:
+            question: The question to answer.
+            models: List of models to compare. Defaults to [default, premium, budget].
+            timeout: Per-request timeout. Defaults to 60s.
+
+        Returns:
+            Same dictionary as compare_models().
+        """
+        resolved_models = self._resolve_models(models)
+
+        documents, context, citation_map = await asyncio.to_thread(
+            self._retrieve_context, question, 5
+        )
+        prompt = self._build_production_prompt(question, context, citation_map)
+
+        client = _get_async_openrouter_client()
+
+        async def query_model(model: str) -> Dict[str, Any]:
+            async with llm_slot():
+                start = time.perf_counter()
+                try:
+                    response = await client.chat.completions.create(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0.1,
+                        max_tokens=500,
+                        timeout=timeout,
+                    )
+                    return self._model_result(response, start)
+                except Exception as e:
+                    latency = int((time.perf_counter() - start) * 1000)
+                    return {"error": str(e), "latency_ms": latency}
+
+        answers = await asyncio.gather(*(query_model(m) for m in resolved_models))
+        results = dict(zip(resolved_models, answers))
+
+        return self._format_comparison(question, resolved_models, results, documents)
+
+    def _resolve_models(self, models: Optional[List[str]]) -> List[str]:
+        """Resolve MODELS aliases (default: [default, premium, budget])."""
+        if models is None:
+            models = ["default", "premium", "budget"]
+        return [MODELS.get(m, m) for m in models]
+
+    def _model_result(self, response: Any, start: float) -> Dict[str, Any]:
+        """Shape one model's completion for compare_models()."""
+        latency = int((time.perf_counter() - start) * 1000)
+
+        result = {
+            "answer": response.choices[0].message.content,
+            "latency_ms": latency,
+        }
+
+        if hasattr(response, "usage") and response.usage:
+            result["usage"] = {
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+                "total_tokens": response.usage.total_tokens,
+            }
+
+        return result
+
+    def _format_comparison(
+        self,
+        question: str,
+        resolved_models: List[str],
+        results: Dict[str, Dict[str, Any]],
+        documents: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Build the compare_models() result from per-model results."""
         # Analyze results
         analysis = self._analyze_comparison(results)
 
@@ -710,6 +1280,8 @@ ANSWER (remember to cite sources with [Source X]):"""
         """
         Store query and response in database for analytics.
 
+        Writes synchronously; the query methods use queue_log() instead.
+
         Args:
             query_data: Query result from self.query().
             include_sources: Whether to include source details. Defaults to True.
@@ -719,40 +1291,7 @@ ANSWER (remember to cite sources with [Source X]):"""
         """
         try:
             supabase = _get_supabase_client()
-
-            # Prepare data
-            question = query_data.get("query", "")
-            answer = query_data.get("answer", "")
-
-            # Optional PII redaction
-            if self.enable_pii_redaction:
-                question = self._redact_pii(question)
-                answer = self._redact_pii(answer)
-
-            # Format sources for JSONB
-            sources_json = None
-            if include_sources and "sources" in query_data:
-                sources_json = [
-                    {
-                        "document": src.get("document"),
-                        "chunk": src.get("chunk_index"),
-                        "similarity": src.get("similarity"),
-                        "cited": src.get("was_cited", False),
-                    }
-                    for src in query_data.get("sources", [])
-                ]
-
-            # Create log entry
-            timing = query_data.get("timing", {})
-            log_entry = {
-                "question": question,
-                "answer": answer,
-                "model": query_data.get("model", "unknown"),
-                "sources": sources_json,
-                "response_time": timing.get("total", 0),
-                "complexity": query_data.get("complexity", "medium"),
-                "fallback_used": query_data.get("fallback_used", False),
-            }
+            log_entry = self._build_log_entry(query_data, include_sources)
 
             # Insert into database
             response = supabase.table("query_logs").insert(log_entry).execute()
@@ -766,6 +1305,69 @@ ANSWER (remember to cite sources with [Source X]):"""
             print(f"Warning: Failed to log query: {e}")
             return None
 
+    def queue_log(
+        self,
+        query_data: Dict[str, Any],
+        include_sources: bool = True,
+    ) -> None:
+        """
+        Queue a query for logging without waiting on the database.
+
+        Rows are inserted in batches by a background thread; call
+        flush_logs() to wait for them.
+
+        Args:
+            query_data: Query result from self.query().
+            include_sources: Whether to include source details. Defaults to True.
+        """
+        _get_query_log_writer().submit(
+            self._build_log_entry(query_data, include_sources)
+        )
+
+    def flush_logs(self) -> None:
+        """Wait until all queued query logs have been written."""
+        _get_query_log_writer().flush()
+
+    def _build_log_entry(
+        self,
+        query_data: Dict[str, Any],
+        include_sources: bool = True,
+    ) -> Dict[str, Any]:
+        """Build a query_logs row from a query result."""
+        # Prepare data
+        question = query_data.get("query", "")
+        answer = query_data.get("answer", "")
+
+        # Optional PII redaction
+        if self.enable_pii_redaction:
+            question = self._redact_pii(question)
+            answer = self._redact_pii(answer)
+
+        # Format sources for JSONB
+        sources_json = None
+        if include_sources and "sources" in query_data:
+            sources_json = [
+                {
+                    "document": src.get("document"),
+                    "chunk": src.get("chunk_index"),
+                    "similarity": src.get("similarity"),
+                    "cited": src.get("was_cited", False),
+                }
+                for src in query_data.get("sources", [])
+            ]
+
+        timing = query_data.get("timing", {})
+        return {
+            "question": question,
+            "answer": answer,
+            "model": query_data.get("model", "unknown"),
+            "sources": sources_json,
+            "response_time": timing.get("total", 0),
+            "complexity": query_data.get("complexity", "medium"),
+            "fallback_used": query_data.get("fallback_used", False),
+            "cache_hit": query_data.get("cache_hit", False),
+        }
+
     def _redact_pii(self, text: str) -> str:
         """Redact potential PII from text."""
         # Email addresses
@@ -813,20 +1415,10 @@ ANSWER (remember to cite sources with [Source X]):"""
             if start_date is None:
                 start_date = end_date - timedelta(days=7)
 
-            # Fetch logs
-            response = (
-                supabase.table("query_logs")
-                .select("*")
-                .gte("created_at", start_date.isoformat())
-                .lte("created_at", end_date.isoformat())
-                .order("created_at", desc=True)
-                .limit(limit)
-                .execute()
-            )
-
-            logs = response.data or []
+            stats = self._fetch_query_stats(supabase, start_date, end_date, limit)
+            total = stats["total"]
 
-            if not logs:
+            if not total:
                 return {
                     "total_queries": 0,
                     "date_range": {
@@ -839,67 +1431,41 @@ ANSWER (remember to cite sources with [Source X]):"""
                     "insights": ["No queries found in the specified date range."],
                 }
 
-            # Calculate performance metrics
-            response_times = [log.get("response_time", 0)
-                              for log in logs if log.get("response_time")]
+            # Performance metrics
             performance = {}
-            if response_times:
-                sorted_times = sorted(response_times)
+            times = stats["response_times"]
+            if times:
                 performance = {
-                    "avg_response_time": round(mean(response_times), 3),
-                    "p50_response_time": round(sorted_times[len(sorted_times) // 2], 3),
-                    "p95_response_time": round(
-                        sorted_times[int(len(sorted_times) * 0.95)], 3
-                    )
-                    if len(sorted_times) > 1
-                    else sorted_times[0],
-                    "fastest_query": round(min(response_times), 3),
-                    "slowest_query": round(max(response_times), 3),
+                    "avg_response_time": round(times["avg"], 3),
+                    "p50_response_time": round(times["p50"], 3),
+                    "p95_response_time": round(times["p95"], 3),
+                    "fastest_query": round(times["min"], 3),
+                    "slowest_query": round(times["max"], 3),
                 }
 
             # Model usage statistics
-            model_stats = defaultdict(
-                lambda: {"count": 0, "latencies": [], "fallback_count": 0})
-            for log in logs:
-                model = log.get("model", "unknown")
-                model_stats[model]["count"] += 1
-                if log.get("response_time"):
-                    model_stats[model]["latencies"].append(
-                        log["response_time"])
-                if log.get("fallback_used"):
-                    model_stats[model]["fallback_count"] += 1
-
             models = {}
-            for model, stats in model_stats.items():
-                models[model] = {
-                    "usage_count": stats["count"],
-                    "usage_percentage": round((stats["count"] / len(logs)) * 100, 1),
-                    "avg_latency": round(mean(stats["latencies"]), 3) if stats["latencies"] else 0,
-                    "fallback_rate": round(
-                        (stats["fallback_count"] / stats["count"]) * 100, 1
-                    )
-                    if stats["count"] > 0
+            for stat in stats["models"]:
+                count = stat["count"]
+                models[stat["model"]] = {
+                    "usage_count": count,
+                    "usage_percentage": round((count / total) * 100, 1),
+                    "avg_latency": round(stat["avg_latency"], 3) if stat["avg_latency"] else 0,
+                    "fallback_rate": round((stat["fallback_count"] / count) * 100, 1)
+                    if count > 0
                     else 0,
                 }
 
-            # Popular queries (simple word frequency)
-            query_words = defaultdict(int)
-            for log in logs:
-                question = log.get("question", "").lower()
-                for word in question.split():
-                    if len(word) > 3:  # Skip short words
-                        query_words[word] += 1
-
-            popular_terms = sorted(query_words.items(), key=lambda x: x[1], reverse=True)[
-                :10
+            popular_terms = [
+                (term["term"], term["count"]) for term in stats["popular_terms"]
             ]
 
             # Generate insights
             insights = self._generate_insights(
-                len(logs), performance, models, popular_terms)
+                total, performance, models, popular_terms)
 
             return {
-                "total_queries": len(logs),
+                "total_queries": total,
                 "date_range": {
                     "start": start_date.isoformat(),
                     "end": end_date.isoformat(),
@@ -923,6 +1489,103 @@ ANSWER (remember to cite sources with [Source X]):"""
                 "insights": [f"Failed to fetch analytics: {e}"],
             }
 
+    def _fetch_query_stats(
+        self,
+        supabase: Client,
+        start_date: datetime,
+        end_date: datetime,
+        limit: int,
+    ) -> Dict[str, Any]:
+        """
+        Aggregate the newest `limit` query logs in the date range.
+
+        Uses the get_query_analytics RPC (migrations/009_query_analytics.sql)
+        so only the aggregates cross the wire; databases without it fall
+        back to fetching the rows and aggregating them here.
+        """
+        try:
+            response = supabase.rpc(
+                "get_query_analytics",
+                {
+                    "start_at": start_date.isoformat(),
+                    "end_at": end_date.isoformat(),
+                    "max_rows": limit,
+                },
+            ).execute()
+            if isinstance(response.data, dict):
+                return response.data
+        except Exception:
+            pass
+
+        response = (
+            supabase.table("query_logs")
+            .select("question, model, response_time, fallback_used")
+            .gte("created_at", start_date.isoformat())
+            .lte("created_at", end_date.isoformat())
+            .order("created_at", desc=True)
+            .limit(limit)
+            .execute()
+        )
+        return self._aggregate_query_logs(response.data or [])
+
+    @staticmethod
+    def _aggregate_query_logs(logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Compute get_query_analytics' result from query_logs rows."""
+        # Calculate performance metrics
+        response_times = [log.get("response_time", 0)
+                          for log in logs if log.get("response_time")]
+        times = None
+        if response_times:
+            sorted_times = sorted(response_times)
+            times = {
+                "avg": mean(response_times),
+                "p50": sorted_times[len(sorted_times) // 2],
+                "p95": sorted_times[int(len(sorted_times) * 0.95)],
+                "min": sorted_times[0],
+                "max": sorted_times[-1],
+            }
+
+        # Model usage statistics
+        model_stats = defaultdict(
+            lambda: {"count": 0, "latencies": [], "fallback_count": 0})
+        for log in logs:
+            model = log.get("model", "unknown")
+            model_stats[model]["count"] += 1
+            if log.get("response_time"):
+                model_stats[model]["latencies"].append(
+                    log["response_time"])
+            if log.get("fallback_used"):
+                model_stats[model]["fallback_count"] += 1
+
+        # Popular queries (simple word frequency)
+        query_words = defaultdict(int)
+        for log in logs:
+            question = log.get("question", "").lower()
+            for word in question.split():
+                if len(word) > 3:  # Skip short words
+                    query_words[word] += 1
+
+        popular_terms = sorted(query_words.items(), key=lambda x: x[1], reverse=True)[
+            :10
+        ]
+
+        return {
+            "total": len(logs),
+            "response_times": times,
+            "models": [
+                {
+                    "model": model,
+                    "count": stats["count"],
+                    "avg_latency": mean(stats["latencies"]) if stats["latencies"] else None,
+                    "fallback_count": stats["fallback_count"],
+                }
+                for model, stats in model_stats.items()
+            ],
+            "popular_terms": [
+                {"term": term, "count": count} for term, count in popular_terms
+            ],
+        }
+
     def _generate_insights(
         self,
         total_queries: int,
@@ -983,7 +1646,6 @@ ANSWER (remember to cite sources with [Source X]):"""
 def main():
     """Interactive CLI for production Q&A system."""
     import argparse
-    import json
 
     parser = argparse.ArgumentParser(
         description="DocuMind Production Q&A System",
@@ -1020,11 +1682,23 @@ Examples:
     parser.add_argument(
         "--no-log", action="store_true", help="Disable query logging"
     )
+    parser.add_argument(
+        "--semantic-cache", action="store_true",
+        help="Reuse answers for near-duplicate questions (interactive mode)"
+    )
+    parser.add_argument(
+        "--no-stream", action="store_true",
+        help="Print the answer only once it is complete"
+    )
 
     args = parser.parse_args()
 
     # Initialize system
-    qa = ProductionQA(enable_logging=not args.no_log)
+    qa = ProductionQA(
+        enable_logging=not args.no_log,
+        enable_semantic_cache=args.semantic_cache,
+        context_cache_size=128,
+    )
 
     print("\n" + "=" * 70)
     print("  DocuMind Production Q&A System")
@@ -1037,7 +1711,7 @@ Examples:
             analytics = qa.get_analytics()
 
             if args.json:
-                print(json.dumps(analytics, indent=2))
+                print(dumps_json(analytics, default=str))
             else:
                 _display_analytics(analytics)
             return
@@ -1063,9 +1737,14 @@ Examples:
                     _display_analytics(analytics)
                     continue
 
-                print("\n  Thinking...")
-                result = qa.query(question)
-                _display_result(result)
+                # Cached answers only come from query(), so don't stream then
+                if args.no_stream or args.semantic_cache:
+                    print("\n  Thinking...")
+                    result = qa.query(question)
+                    _display_result(result)
+                else:
+                    result = _stream_answer(qa, question)
+                    _display_result(result, show_answer=False)
 
             print("\n  Goodbye!")
             return
@@ -1082,10 +1761,10 @@ Examples:
             print("  Comparing models...")
 
             models = args.models or ["default", "premium", "budget"]
-            result = qa.compare_models(args.query, models=models)
+            result = asyncio.run(qa.acompare_models(args.query, models=models))
 
             if args.json:
-                print(json.dumps(result, indent=2, default=str))
+                print(dumps_json(result, default=str))
             else:
                 _display_comparison(result)
             return
@@ -1095,12 +1774,15 @@ Examples:
         print(f"  Model: {args.model}")
         print("-" * 70)
 
-        result = qa.query(args.query, model=args.model)
-
         if args.json:
-            print(json.dumps(result, indent=2, default=str))
-        else:
+            result = qa.query(args.query, model=args.model)
+            print(dumps_json(result, default=str))
+        elif args.no_stream:
+            result = qa.query(args.query, model=args.model)
             _display_result(result)
+        else:
+            result = _stream_answer(qa, args.query, model=args.model)
+            _display_result(result, show_answer=False)
 
     except ValueError as e:
         print(f"\n  Configuration Error: {e}")
@@ -1116,14 +1798,29 @@ Examples:
     print("\n" + "=" * 70)
 
 
-def _display_result(result: Dict[str, Any]) -> None:
-    """Display formatted query result."""
+def _stream_answer(
+    qa: ProductionQA, question: str, model: Optional[str] = None
+) -> Dict[str, Any]:
+    """Print the answer as it streams in and return the full query result."""
+    result: Dict[str, Any] = {}
     print(f"\n  Answer:\n")
+    sys.stdout.write("    ")
+    for delta in qa.stream_query(question, model=model, on_complete=result.update):
+        sys.stdout.write(delta.replace("\n", "\n    "))
+        sys.stdout.flush()
+    print()
+    return result
+
+
+def _display_result(result: Dict[str, Any], show_answer: bool = True) -> None:
+    """Display formatted query result (answer omitted if already streamed)."""
+    if show_answer:
+        print(f"\n  Answer:\n")
 
-    # Format answer with proper indentation
-    answer = result.get("answer", "No answer generated")
-    for line in answer.split("\n"):
-        print(f"    {line}")
+        # Format answer with proper indentation
+        answer = result.get("answer", "No answer generated")
+        for line in answer.split("\n"):
+            print(f"    {line}")
 
     # Display sources
     sources = result.get("sources", [])
@@ -1144,6 +1841,8 @@ def _display_result(result: Dict[str, Any]) -> None:
         print(f"\n  {'=' * 66}")
         print(f"  Performance:")
         print(f"    Total: {timing.get('total', 0)*1000:.0f}ms")
+        if timing.get("first_token"):
+            print(f"    First token: {timing['first_token']*1000:.0f}ms")
         print(f"    Search: {timing.get('search', 0)*1000:.0f}ms")
         print(f"    Generation: {timing.get('generation', 0)*1000:.0f}ms")
 
@@ -12,15 +12,25 @@ Models selected based on research for RAG optimization:
 - Cost efficiency for production use
 """
 
+import asyncio
 import os
-import json
+import sys
+import weakref
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
+try:
+    import tiktoken
+except ImportError:  # Optional: exact token counts for context budgeting
+    tiktoken = None
+
+from documind.net import shared_http_client
+from documind.utils.json_io import dumps_json
 from documind.rag.search import search_documents, get_query_embedding
 
 # Load environment variables
@@ -94,9 +104,28 @@ MODEL_INFO: Dict[str, Dict[str, Any]] = {
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 
-# Lazy-initialized client
+# Retries for rate limits (429), 5xx, timeouts and connection errors. The
+# OpenAI SDK backs off exponentially with jitter and honors Retry-After.
+LLM_MAX_RETRIES = int(os.getenv("DOCUMIND_LLM_MAX_RETRIES", "3"))
+
+# Upper bound on concurrent async completions per event loop (see llm_slot)
+LLM_MAX_CONCURRENCY = int(os.getenv("DOCUMIND_LLM_MAX_CONCURRENCY", "8"))
+
+# Lazy-initialized clients
 _openrouter_client: Optional[OpenAI] = None
 
+# AsyncOpenAI's pooled connections belong to the loop that opened them, so
+# keep one client per loop (a later asyncio.run gets a fresh one)
+_async_openrouter_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# asyncio.Semaphore is bound to the loop it is first used on, so keep one
+# per loop (repeated asyncio.run calls each get their own)
+_llm_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
 
 def _get_openrouter_client() -> OpenAI:
     """
@@ -120,14 +149,93 @@ def _get_openrouter_client() -> OpenAI:
         _openrouter_client = OpenAI(
             base_url=OPENROUTER_BASE_URL,
             api_key=OPENROUTER_API_KEY,
+            http_client=shared_http_client(),
+            max_retries=LLM_MAX_RETRIES,
         )
     return _openrouter_client
 
 
+def _get_async_openrouter_client() -> AsyncOpenAI:
+    """
+    Get or create the async OpenRouter client for the running event loop.
+
+    Async counterpart of _get_openrouter_client() for concurrent generation
+    with asyncio.gather. Must be called from a coroutine.
+
+    Returns:
+        AsyncOpenAI client configured for OpenRouter, shared by every caller
+        on the current event loop.
+
+    Raises:
+        ValueError: If OPENROUTER_API_KEY is not set.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_openrouter_clients.get(loop)
+    if client is None:
+        if not OPENROUTER_API_KEY:
+            raise ValueError(
+                "OPENROUTER_API_KEY environment variable is not set. "
+                "Get your API key at https://openrouter.ai/keys"
+            )
+        client = _async_openrouter_clients[loop] = AsyncOpenAI(
+            base_url=OPENROUTER_BASE_URL,
+            api_key=OPENROUTER_API_KEY,
+            max_retries=LLM_MAX_RETRIES,
+        )
+    return client
+
+
+def llm_slot() -> asyncio.Semaphore:
+    """
+    Get the semaphore bounding concurrent completions on the running loop.
+
+    Wrap async OpenRouter calls in ``async with llm_slot():`` so large
+    asyncio.gather batches queue locally (at most LLM_MAX_CONCURRENCY in
+    flight) instead of tripping provider rate limits.
+
+    Returns:
+        asyncio.Semaphore shared by every caller on the current event loop.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _llm_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _llm_semaphores[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return semaphore
+
+
 # =============================================================================
 # CONTEXT ASSEMBLY
 # =============================================================================
 
+# Estimate used when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Get the tokenizer used for context budgets (None without tiktoken)."""
+    if tiktoken is None:
+        return None
+    return tiktoken.encoding_for_model("gpt-4o")
+
+
+def count_tokens(text: str) -> int:
+    """Token count (tiktoken when installed, else ~4 characters per token)."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to its first max_tokens tokens."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max_tokens])
+    return text[:max_tokens * CHARS_PER_TOKEN]
+
+
 def assemble_context(
     documents: List[Dict[str, Any]],
     max_tokens: int = 3000
@@ -142,8 +250,8 @@ def assemble_context(
     Args:
         documents: List of document dictionaries from search_documents().
             Each should contain: content, document_name, chunk_index, similarity
-        max_tokens: Maximum estimated tokens for context. Uses ~4 chars per token.
-            Defaults to 3000 tokens (~12000 characters).
+        max_tokens: Maximum tokens for context, counted with tiktoken when
+            installed (else ~4 chars per token). Defaults to 3000 tokens.
 
     Returns:
         Formatted context string with source citations like:
@@ -157,9 +265,9 @@ def assemble_context(
     if not documents:
         return "No relevant documents found."
 
-    max_chars = max_tokens * 4  # ~4 characters per token estimate
+    separator_tokens = count_tokens(CONTEXT_SEPARATOR)
     context_parts: List[str] = []
-    current_chars = 0
+    current_tokens = 0
 
     for i, doc in enumerate(documents, 1):
         # Extract document info
@@ -173,30 +281,44 @@ def assemble_context(
 
         # Format document section
         doc_section = f"{source_header}\n{content}"
-        section_chars = len(doc_section) + 5  # +5 for separator
+        section_tokens = count_tokens(doc_section) + separator_tokens
 
         # Check if adding this would exceed limit
-        if current_chars + section_chars > max_chars:
+        if current_tokens + section_tokens > max_tokens:
             # Try to include a truncated version
-            remaining_chars = max_chars - \
-                current_chars - len(source_header) - 50
-            if remaining_chars > 100:
-                truncated_content = content[:remaining_chars] + \
+            remaining_tokens = max_tokens - current_tokens - \
+                count_tokens(source_header) - separator_tokens - 8
+            if remaining_tokens > 25:
+                truncated_content = _truncate_to_tokens(content, remaining_tokens) + \
                     "... [truncated]"
                 doc_section = f"{source_header}\n{truncated_content}"
                 context_parts.append(doc_section)
             break
 
         context_parts.append(doc_section)
-        current_chars += section_chars
+        current_tokens += section_tokens
 
-    return "\n\n---\n\n".join(context_parts)
+    return CONTEXT_SEPARATOR.join(context_parts)
 
 
 # =============================================================================
 # PROMPT BUILDING
 # =============================================================================
 
+# Static preamble of every Q&A prompt. It comes first and never varies, so
+# providers with automatic prefix caching can reuse it across requests;
+# keep per-request text (context, question) after it.
+QA_INSTRUCTIONS = """You are a helpful assistant that answers questions based ONLY on the provided context.
+
+IMPORTANT RULES:
+1. Answer using ONLY information from the CONTEXT below
+2. If the answer is not in the context, say "I don't have enough information in the provided documents to answer this question."
+3. ALWAYS cite your sources using [Source X] format when referencing information
+4. Be concise but comprehensive - include all relevant details from the context
+5. If multiple sources contain relevant information, synthesize them and cite all
+6. Do not make up or infer information not explicitly stated in the context"""
+
+
 def build_qa_prompt(query: str, context: str) -> str:
     """
     Create a RAG prompt with instructions for grounded Q&A.
@@ -218,17 +340,7 @@ def build_qa_prompt(query: str, context: str) -> str:
         >>> context = assemble_context(docs)
         >>> prompt = build_qa_prompt("What is the vacation policy?", context)
     """
-    system_instructions = """You are a helpful assistant that answers questions based ONLY on the provided context.
-
-IMPORTANT RULES:
-1. Answer using ONLY information from the CONTEXT below
-2. If the answer is not in the context, say "I don't have enough information in the provided documents to answer this question."
-3. ALWAYS cite your sources using [Source X] format when referencing information
-4. Be concise but comprehensive - include all relevant details from the context
-5. If multiple sources contain relevant information, synthesize them and cite all
-6. Do not make up or infer information not explicitly stated in the context"""
-
-    prompt = f"""{system_instructions}
+    prompt = f"""{QA_INSTRUCTIONS}
 
 CONTEXT:
 {context}
@@ -252,7 +364,9 @@ def generate_answer(
     temperature: float = 0.1,
     max_tokens: int = 500,
     top_k: int = 5,
-    context_max_tokens: int = 3000
+    context_max_tokens: int = 3000,
+    include_context: bool = False,
+    query_embedding: Optional[List[float]] = None
 ) -> Dict[str, Any]:
     """
     Generate an answer to a query using RAG pipeline.
@@ -273,6 +387,8 @@ def generate_answer(
         max_tokens: Maximum tokens in the response. Defaults to 500.
         top_k: Number of documents to retrieve. Defaults to 5.
         context_max_tokens: Maximum tokens for context. Defaults to 3000.
+        include_context: Also return the assembled context string.
+        query_embedding: Precomputed embedding of query (skips embedding it again).
 
     Returns:
         Dictionary containing:
@@ -284,6 +400,7 @@ def generate_answer(
             - context_chunks: Number of context chunks used
             - timestamp: ISO format timestamp
             - usage: Token usage statistics (if available)
+            - context: Assembled context (only with include_context=True)
 
     Raises:
         ValueError: If API keys are not configured.
@@ -295,28 +412,79 @@ def generate_answer(
         >>> for source in result["sources"]:
         ...     print(f"  - {source['document']}: {source['preview'][:50]}...")
     """
-    # Default model
-    if model is None:
-        model = MODELS["default"]
+    # Steps 1-3: Retrieve documents, assemble context, build prompt
+    model, documents, context, prompt = _prepare_answer(
+        query, model, top_k, context_max_tokens, query_embedding
+    )
 
-    # Resolve model alias if provided
-    if model in MODELS:
-        model = MODELS[model]
+    # Step 4: Generate answer via OpenRouter
+    client = _get_openrouter_client()
 
-    # Step 1: Retrieve documents
-    documents = search_documents(query, top_k=top_k, similarity_threshold=0.1)
+    try:
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=60.0,  # 60 second timeout
+        )
+    except Exception as e:
+        _raise_auth_error(e)
+        raise
 
-    # Step 2: Assemble context
-    context = assemble_context(documents, max_tokens=context_max_tokens)
+    answer = response.choices[0].message.content
 
-    # Step 3: Build prompt
-    prompt = build_qa_prompt(query, context)
+    # Step 5: Format response
+    return _format_answer(
+        query, answer, model, documents, context, include_context,
+        getattr(response, "usage", None)
+    )
+
+
+def stream_answer(
+    query: str,
+    model: Optional[str] = None,
+    temperature: float = 0.1,
+    max_tokens: int = 500,
+    top_k: int = 5,
+    context_max_tokens: int = 3000,
+    include_context: bool = False,
+    query_embedding: Optional[List[float]] = None,
+    on_complete: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Iterator[str]:
+    """
+    Streaming variant of generate_answer() that yields the answer as it is generated.
+
+    Retrieval runs first; answer text is then yielded delta by delta, so
+    the first words show up after time-to-first-token instead of the full
+    completion time. Once the stream ends, the same dictionary
+    generate_answer() returns is passed to on_complete.
+
+    Args:
+        Same as generate_answer(), plus:
+        on_complete: Called with the full result once streaming ends.
+
+    Yields:
+        Answer text deltas.
+
+    Raises:
+        ValueError: If API keys are not configured.
+        Exception: If LLM inference fails.
+
+    Example:
+        >>> for delta in stream_answer("What is the vacation policy?"):
+        ...     print(delta, end="", flush=True)
+    """
+    model, documents, context, prompt = _prepare_answer(
+        query, model, top_k, context_max_tokens, query_embedding
+    )
 
-    # Step 4: Generate answer via OpenRouter
     client = _get_openrouter_client()
 
     try:
-        response = client.chat.completions.create(
+        stream = client.chat.completions.create(
             model=model,
             messages=[
                 {"role": "user", "content": prompt}
@@ -324,19 +492,75 @@ def generate_answer(
             temperature=temperature,
             max_tokens=max_tokens,
             timeout=60.0,  # 60 second timeout
+            stream=True,
+            stream_options={"include_usage": True},
         )
     except Exception as e:
-        error_msg = str(e)
-        if "401" in error_msg or "auth" in error_msg.lower():
-            raise ValueError(
-                f"OpenRouter authentication failed. Please check your OPENROUTER_API_KEY. "
-                f"Get a new key at https://openrouter.ai/keys\nError: {error_msg}"
-            )
+        _raise_auth_error(e)
         raise
 
-    answer = response.choices[0].message.content
+    answer_parts: List[str] = []
+    usage = None
+    for chunk in stream:
+        # The final chunk carries usage and no choices
+        if getattr(chunk, "usage", None):
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            answer_parts.append(delta)
+            yield delta
+
+    if on_complete is not None:
+        on_complete(_format_answer(
+            query, "".join(answer_parts), model, documents, context,
+            include_context, usage
+        ))
+
+
+def _prepare_answer(
+    query: str,
+    model: Optional[str],
+    top_k: int,
+    context_max_tokens: int,
+    query_embedding: Optional[List[float]]
+) -> Tuple[str, List[Dict[str, Any]], str, str]:
+    """Resolve the model and retrieve, assemble and prompt for a query."""
+    # Default model
+    if model is None:
+        model = MODELS["default"]
+
+    # Resolve model alias if provided
+    if model in MODELS:
+        model = MODELS[model]
+
+    # Step 1: Retrieve documents
+    documents = search_documents(
+        query, top_k=top_k, similarity_threshold=0.1, query_embedding=query_embedding
+    )
+
+    # Step 2: Assemble context
+    context = assemble_context(documents, max_tokens=context_max_tokens)
 
-    # Step 5: Format sources
+    # Step 3: Build prompt
+    prompt = build_qa_prompt(query, context)
+
+    return model, documents, context, prompt
+
+
+def _raise_auth_error(error: Exception) -> None:
+    """Re-raise OpenRouter authentication failures as a ValueError with help text."""
+    error_msg = str(error)
+    if "401" in error_msg or "auth" in error_msg.lower():
+        raise ValueError(
+            f"OpenRouter authentication failed. Please check your OPENROUTER_API_KEY. "
+            f"Get a new key at https://openrouter.ai/keys\nError: {error_msg}"
+        )
+
+
+def _format_sources(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Source entries (id, document, chunk, similarity, preview) for a response."""
     sources = []
     for doc in documents:
         content = doc.get("content", "")
@@ -347,11 +571,22 @@ def generate_answer(
             "similarity": round(doc.get("similarity", 0.0), 4),
             "preview": content[:200] + "..." if len(content) > 200 else content,
         })
+    return sources
+
 
-    # Build response
+def _format_answer(
+    query: str,
+    answer: str,
+    model: str,
+    documents: List[Dict[str, Any]],
+    context: str,
+    include_context: bool,
+    usage: Any
+) -> Dict[str, Any]:
+    """Assemble the generate_answer() response dictionary."""
     result = {
         "answer": answer,
-        "sources": sources,
+        "sources": _format_sources(documents),
         "query": query,
         "model": model,
         "context_chunks": len(documents),
@@ -359,13 +594,16 @@ def generate_answer(
     }
 
     # Add usage if available
-    if hasattr(response, "usage") and response.usage:
+    if usage:
         result["usage"] = {
-            "prompt_tokens": response.usage.prompt_tokens,
-            "completion_tokens": response.usage.completion_tokens,
-            "total_tokens": response.usage.total_tokens,
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
         }
 
+    if include_context:
+        result["context"] = context
+
     return result
 
 
@@ -383,7 +621,9 @@ def compare_models(
     Compare responses from multiple models for the same query.
 
     Useful for A/B testing and evaluating model quality for specific
-    use cases. Each model receives the same context and prompt.
+    use cases. Each model receives the same context and prompt, and all
+    models are queried concurrently (see acompare_models()), so wall time
+    is the slowest model's latency rather than the sum.
 
     Args:
         query: The user's question.
@@ -412,6 +652,29 @@ def compare_models(
         ...     if "error" not in result:
         ...         print(f"{model}: {result['answer'][:100]}...")
     """
+    return asyncio.run(
+        acompare_models(query, models=models, temperature=temperature, max_tokens=max_tokens)
+    )
+
+
+async def acompare_models(
+    query: str,
+    models: Optional[List[str]] = None,
+    temperature: float = 0.1,
+    max_tokens: int = 500
+) -> Dict[str, Any]:
+    """
+    Async variant of compare_models() for callers already in an event loop.
+
+    Retrieval runs in a worker thread; the completions are awaited together
+    on the AsyncOpenAI OpenRouter client, bounded by llm_slot().
+
+    Args:
+        Same as compare_models().
+
+    Returns:
+        Same dictionary as compare_models().
+    """
     import time
 
     # Default models to compare
@@ -419,46 +682,40 @@ def compare_models(
         models = ["default", "premium", "budget"]
 
     # Resolve model aliases
-    resolved_models = []
-    for m in models:
-        if m in MODELS:
-            resolved_models.append(MODELS[m])
-        else:
-            resolved_models.append(m)
+    resolved_models = [MODELS.get(m, m) for m in models]
 
     # Get documents once (shared context)
-    documents = search_documents(query, top_k=5, similarity_threshold=0.1)
+    documents = await asyncio.to_thread(
+        search_documents, query, top_k=5, similarity_threshold=0.1
+    )
     context = assemble_context(documents, max_tokens=3000)
     prompt = build_qa_prompt(query, context)
 
     # Format shared sources
-    sources = []
-    for doc in documents:
-        content = doc.get("content", "")
-        sources.append({
-            "id": doc.get("id"),
-            "document": doc.get("document_name", "Unknown"),
-            "chunk": doc.get("chunk_index", 0),
-            "similarity": round(doc.get("similarity", 0.0), 4),
-            "preview": content[:200] + "..." if len(content) > 200 else content,
-        })
-
-    # Query each model
-    client = _get_openrouter_client()
-    results: Dict[str, Dict[str, Any]] = {}
-
-    for model in resolved_models:
-        start_time = time.time()
-        try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=temperature,
-                max_tokens=max_tokens,
-                timeout=60.0,  # 60 second timeout
-            )
+    sources = _format_sources(documents)
+
+    # Query all models concurrently
+    client = _get_async_openrouter_client()
+
+    async def query_model(model: str) -> Dict[str, Any]:
+        async with llm_slot():
+            start_time = time.perf_counter_ns()
+            try:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=60.0,  # 60 second timeout
+                )
+            except Exception as e:
+                latency_ms = (time.perf_counter_ns() - start_time) // 1_000_000
+                return {
+                    "error": str(e),
+                    "latency_ms": latency_ms,
+                }
 
-            latency_ms = int((time.time() - start_time) * 1000)
+            latency_ms = (time.perf_counter_ns() - start_time) // 1_000_000
 
             result_entry: Dict[str, Any] = {
                 "answer": response.choices[0].message.content,
@@ -472,14 +729,10 @@ def compare_models(
                     "total_tokens": response.usage.total_tokens,
                 }
 
-            results[model] = result_entry
+            return result_entry
 
-        except Exception as e:
-            latency_ms = int((time.time() - start_time) * 1000)
-            results[model] = {
-                "error": str(e),
-                "latency_ms": latency_ms,
-            }
+    answers = await asyncio.gather(*(query_model(m) for m in resolved_models))
+    results: Dict[str, Dict[str, Any]] = dict(zip(resolved_models, answers))
 
     return {
         "query": query,
@@ -559,6 +812,12 @@ Examples:
         help="List available models and exit"
     )
 
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Print the answer only once it is complete"
+    )
+
     args = parser.parse_args()
 
     # List models mode
@@ -609,7 +868,7 @@ Examples:
             )
 
             if args.json:
-                print(json.dumps(result, indent=2))
+                print(dumps_json(result))
             else:
                 # Display sources
                 print(f"\nSources ({len(result['sources'])} chunks):")
@@ -643,17 +902,33 @@ Examples:
             print(f"Model: {args.model}")
             print("-" * 70)
 
-            result = generate_answer(
-                args.query,
-                model=args.model,
-                temperature=args.temperature,
-                max_tokens=args.max_tokens
-            )
+            if args.json or args.no_stream:
+                result = generate_answer(
+                    args.query,
+                    model=args.model,
+                    temperature=args.temperature,
+                    max_tokens=args.max_tokens
+                )
+            else:
+                # Print the answer as it arrives; the result comes at the end
+                result = {}
+                print("\nAnswer:")
+                for delta in stream_answer(
+                    args.query,
+                    model=args.model,
+                    temperature=args.temperature,
+                    max_tokens=args.max_tokens,
+                    on_complete=result.update
+                ):
+                    sys.stdout.write(delta)
+                    sys.stdout.flush()
+                print()
 
             if args.json:
-                print(json.dumps(result, indent=2))
+                print(dumps_json(result))
             else:
-                print(f"\nAnswer:\n{result['answer']}")
+                if args.no_stream:
+                    print(f"\nAnswer:\n{result['answer']}")
 
                 print(f"\n{'=' * 70}")
                 print("Sources:")
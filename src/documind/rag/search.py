@@ -5,14 +5,28 @@ Provides semantic and hybrid search capabilities for document retrieval
 using OpenAI embeddings and Supabase vector search.
 """
 
+import asyncio
+import heapq
 import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 
 from dotenv import load_dotenv
 from openai import OpenAI
 from supabase import create_client, Client
 
+try:
+    from documind.net import shared_http_client, supabase_client_options
+except ImportError:
+    # Direct execution - make the documind package (also imported lazily
+    # below) importable
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from documind.net import shared_http_client, supabase_client_options
+
 # Load environment variables from .env file
 env_path = Path(__file__).resolve().parents[3] / ".env"
 load_dotenv(env_path)
@@ -23,6 +37,31 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY") or os.getenv("SUPABASE_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Search the binary-quantized HNSW index, re-ranking candidates at full
+# precision (see migrations/002_quantized_embedding_search.sql)
+QUANTIZED_SEARCH = os.getenv("DOCUMIND_QUANTIZED_SEARCH", "0") == "1"
+QUANTIZED_CANDIDATES = 50
+
+# Reciprocal Rank Fusion constant (rank offset) for rrf_hybrid_search
+RRF_K = 60
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Also keep query embeddings on disk, so repeat questions skip the API
+# across runs (see documind/cache/embeddings.py)
+EMBEDDING_CACHE_ENABLED = os.getenv("DOCUMIND_EMBEDDING_CACHE", "0") == "1"
+
+# Reuse search_documents() results for paraphrased queries whose embeddings
+# are nearly identical (see documind/cache/semantic.py)
+SEARCH_CACHE_ENABLED = os.getenv("DOCUMIND_SEARCH_CACHE", "0") == "1"
+SEARCH_CACHE_THRESHOLD = 0.97
+SEARCH_CACHE_MAX_ENTRIES = 1000
+SEARCH_CACHE_TTL = 60 * 60  # seconds; bounds staleness after uploads
+
+# Answer unfiltered semantic searches from an in-memory snapshot of all chunk
+# embeddings instead of the match_documents RPC (see local_index.py)
+LOCAL_INDEX_ENABLED = os.getenv("DOCUMIND_LOCAL_INDEX", "0") == "1"
+
 # Client instances (lazy initialization)
 _openai_client: Optional[OpenAI] = None
 _supabase_client: Optional[Client] = None
@@ -34,7 +73,7 @@ def _get_openai_client() -> OpenAI:
     if _openai_client is None:
         if not OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
-        _openai_client = OpenAI(api_key=OPENAI_API_KEY)
+        _openai_client = OpenAI(api_key=OPENAI_API_KEY, http_client=shared_http_client())
     return _openai_client
 
 
@@ -44,16 +83,114 @@ def _get_supabase_client() -> Client:
     if _supabase_client is None:
         if not SUPABASE_URL or not SUPABASE_KEY:
             raise ValueError("SUPABASE_URL and SUPABASE_KEY environment variables must be set")
-        _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        _supabase_client = create_client(
+            SUPABASE_URL, SUPABASE_KEY, options=supabase_client_options()
+        )
     return _supabase_client
 
 
+@lru_cache(maxsize=1)
+def _get_embedding_cache():
+    """Get the on-disk embedding cache, or None when disabled."""
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    from documind.cache.embeddings import EmbeddingCache
+    return EmbeddingCache()
+
+
+@lru_cache(maxsize=1)
+def _get_local_index():
+    """
+    Get the in-memory chunk index, or None when disabled.
+
+    Built from Supabase on first use; call _get_local_index.cache_clear()
+    to pick up newly uploaded chunks. With DOCUMIND_QUANTIZED_SEARCH=1 the
+    scanned vectors are kept int8-quantized.
+    """
+    if not LOCAL_INDEX_ENABLED:
+        return None
+    from documind.rag.local_index import LocalVectorIndex
+    return LocalVectorIndex.from_supabase(_get_supabase_client(), quantize=QUANTIZED_SEARCH)
+
+
+@lru_cache(maxsize=1)
+def _get_search_cache():
+    """Get the in-process semantic search cache, or None when disabled."""
+    if not SEARCH_CACHE_ENABLED:
+        return None
+    from documind.cache.semantic import SemanticCache
+    return SemanticCache(
+        threshold=SEARCH_CACHE_THRESHOLD,
+        max_entries=SEARCH_CACHE_MAX_ENTRIES,
+        ttl=SEARCH_CACHE_TTL
+    )
+
+
+def _normalize_query(query: str) -> str:
+    """Normalize query text so trivially different phrasings share a cache key."""
+    return " ".join(query.lower().split())
+
+
+class _QueryKey(str):
+    """Normalized query text (the cache key) that carries the query as asked."""
+
+    original: str
+
+
+def _query_key(query: str) -> _QueryKey:
+    key = _QueryKey(_normalize_query(query))
+    key.original = query
+    return key
+
+
+# Embeddings fetched ahead of time by get_query_embeddings(), handed to the
+# memo below on first use
+_prefetched_embeddings: Dict[str, Tuple[float, ...]] = {}
+
+
+@lru_cache(maxsize=1024)
+def _embed_query_cached(key: _QueryKey) -> Tuple[float, ...]:
+    """
+    Embed a query, memoized for the lifetime of the process.
+
+    Memoized (and stored on disk) under the normalized key, but the query is
+    embedded as asked, so casing of acronyms and names still reaches the
+    model.
+    """
+    prefetched = _prefetched_embeddings.pop(key, None)
+    if prefetched is not None:
+        return prefetched
+
+    disk_cache = _get_embedding_cache()
+    if disk_cache is not None:
+        stored = disk_cache.get(EMBEDDING_MODEL, key)
+        if stored is not None:
+            return stored
+
+    client = _get_openai_client()
+
+    response = client.embeddings.create(
+        model=EMBEDDING_MODEL,
+        input=key.original
+    )
+
+    # Tuples are immutable, so cached vectors can't be mutated by callers
+    embedding = tuple(response.data[0].embedding)
+    if disk_cache is not None:
+        disk_cache.put(EMBEDDING_MODEL, str(key), embedding)
+    return embedding
+
+
 def get_query_embedding(query: str) -> List[float]:
     """
     Generate embedding for a search query using OpenAI.
 
     Uses the text-embedding-3-small model to create a vector representation
-    of the query text for semantic similarity search.
+    of the query text for semantic similarity search. Embeddings are cached
+    in-process (LRU, 1024 entries) keyed on the normalized query, so repeated
+    questions - e.g. Streamlit reruns or monitoring loops - skip the API call.
+    With DOCUMIND_EMBEDDING_CACHE=1 they are also kept on disk, so later
+    runs reuse them too.
 
     Args:
         query: The search query text to embed.
@@ -70,20 +207,76 @@ def get_query_embedding(query: str) -> List[float]:
         >>> len(embedding)
         1536
     """
-    client = _get_openai_client()
+    return list(_embed_query_cached(_query_key(query)))
 
-    response = client.embeddings.create(
-        model="text-embedding-3-small",
-        input=query
-    )
 
-    return response.data[0].embedding
+def get_query_embeddings(queries: List[str]) -> List[List[float]]:
+    """
+    Embed several queries with a single API request.
+
+    The vectors also seed get_query_embedding()'s cache, so pipelines that
+    embed the same questions afterwards (e.g. generate_answer) don't make
+    another request.
+
+    Args:
+        queries: Query texts to embed.
+
+    Returns:
+        One embedding per query, in order.
+    """
+    keys = [_query_key(q) for q in queries]
+    # First phrasing of each normalized query is the one embedded
+    unique = list(dict.fromkeys(keys))
+    missing = unique
+    disk_cache = _get_embedding_cache()
+    if disk_cache is not None:
+        missing = []
+        for key in unique:
+            stored = disk_cache.get(EMBEDDING_MODEL, key)
+            if stored is None:
+                missing.append(key)
+            else:
+                _prefetched_embeddings[str(key)] = stored
+    if missing:
+        response = _get_openai_client().embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=[key.original for key in missing]
+        )
+        fetched = {str(key): tuple(item.embedding) for key, item in zip(missing, response.data)}
+        _prefetched_embeddings.update(fetched)
+        if disk_cache is not None:
+            disk_cache.put_many(EMBEDDING_MODEL, fetched)
+    embeddings = [list(_embed_query_cached(key)) for key in keys]
+    # Queries already memoized never consumed their prefetched vector
+    for key in unique:
+        _prefetched_embeddings.pop(key, None)
+    return embeddings
+
+
+async def get_query_embedding_async(query: str) -> List[float]:
+    """
+    Async variant of get_query_embedding.
+
+    Runs the (cached) embedding call in a worker thread so it can overlap
+    with other I/O, e.g. via asyncio.gather.
+
+    Args:
+        query: The search query text to embed.
+
+    Returns:
+        A list of floats representing the embedding vector.
+    """
+    return await asyncio.to_thread(get_query_embedding, query)
 
 
 def search_documents(
     query: str,
     top_k: int = 5,
-    similarity_threshold: float = 0.1
+    similarity_threshold: float = 0.1,
+    quantized: Optional[bool] = None,
+    file_types: Optional[List[str]] = None,
+    after: Optional[Union[datetime, date, str]] = None,
+    query_embedding: Optional[List[float]] = None
 ) -> List[Dict[str, Any]]:
     """
     Search documents using semantic similarity.
@@ -91,11 +284,36 @@ def search_documents(
     Generates an embedding for the query and searches for similar documents
     using Supabase's vector similarity search via the match_documents RPC function.
 
+    With quantized search, match_documents_quantized shortlists candidates
+    on a binary-quantized index and re-ranks them by exact cosine similarity,
+    so scores are comparable with the unquantized path.
+
+    Filters are applied inside the database before ranking (see
+    migrations/004_filtered_vector_search.sql), so a selective filter still
+    returns up to top_k matches.
+
+    With DOCUMIND_LOCAL_INDEX=1, unfiltered searches are answered from an
+    in-memory index of every chunk embedding, loaded once per process,
+    instead of the RPC.
+
+    With DOCUMIND_SEARCH_CACHE=1, results are also cached in-process by
+    query embedding: a query whose embedding has cosine similarity of at
+    least SEARCH_CACHE_THRESHOLD to an earlier one with the same options
+    is answered without the database call.
+
     Args:
         query: The search query text.
         top_k: Maximum number of results to return. Defaults to 5.
         similarity_threshold: Minimum similarity score (0-1) for results.
             Defaults to 0.7.
+        quantized: Use the quantized index. Defaults to the
+            DOCUMIND_QUANTIZED_SEARCH environment flag.
+        file_types: Only search documents with these file types
+            (e.g. ["pdf", "docx"]). Defaults to all.
+        after: Only search chunks created after this date/time
+            (datetime, date or ISO string). Defaults to no limit.
+        query_embedding: Precomputed embedding of query; skips the
+            embedding call when given.
 
     Returns:
         A list of dictionaries containing matching documents with keys:
@@ -116,49 +334,370 @@ def search_documents(
         ...     print(f"{doc['document_name']}: {doc['similarity']:.2f}")
     """
     # Generate query embedding
-    query_embedding = get_query_embedding(query)
+    if query_embedding is None:
+        query_embedding = get_query_embedding(query)
+
+    if not file_types and after is None:
+        local_index = _get_local_index()
+        if local_index is not None:
+            return [
+                _format_chunk(item)
+                for item in local_index.search(query_embedding, top_k, similarity_threshold)
+            ]
 
     # Get Supabase client
     supabase = _get_supabase_client()
 
-    # Call the match_documents RPC function
+    params = {
+        "query_embedding": query_embedding,
+        "match_count": top_k,
+        "similarity_threshold": similarity_threshold
+    }
+    # Filter arguments are only sent when set, so the RPCs from before
+    # migration 004 keep working for unfiltered searches
+    if file_types:
+        params["filter_file_types"] = list(file_types)
+    if after is not None:
+        params["filter_after"] = after.isoformat() if isinstance(after, (datetime, date)) else after
+    use_quantized = QUANTIZED_SEARCH if quantized is None else quantized
+    if use_quantized:
+        params["candidate_count"] = max(QUANTIZED_CANDIDATES, top_k * 5)
+
+    search_cache = _get_search_cache()
+    cache_params = (
+        top_k, similarity_threshold, use_quantized,
+        tuple(params.get("filter_file_types", ())), params.get("filter_after")
+    )
+    hit = None
+    if search_cache is not None:
+        # Each cached query holds results per option set, so one query can
+        # be cached with several (e.g. hybrid_search's lower threshold)
+        hit = search_cache.lookup(query_embedding)
+        if hit is not None and cache_params in hit["results"]:
+            # Copies, since callers annotate result dicts in place
+            return [dict(result) for result in hit["results"][cache_params]]
+
+    # Call the match_documents (or quantized) RPC function
     response = supabase.rpc(
-        "match_documents",
+        "match_documents_quantized" if use_quantized else "match_documents",
+        params
+    ).execute()
+
+    # Format results
+    results = [_format_chunk(item) for item in response.data or []]
+    if search_cache is not None:
+        cached = [dict(result) for result in results]
+        if hit is not None:
+            # lookup() copies the entry shallowly, so this updates it in place
+            hit["results"][cache_params] = cached
+        else:
+            search_cache.insert(query_embedding, {"results": {cache_params: cached}})
+    return results
+
+
+def _format_chunk(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a search RPC row into the standard result dictionary."""
+    metadata = item.get("metadata") or {}
+    # Try multiple field names for document name
+    doc_name = (
+        metadata.get("document_name") or
+        metadata.get("file_name") or
+        metadata.get("title") or
+        "Unknown"
+    )
+    # Strip YAML frontmatter from content if present
+    content = item.get("content") or ""
+    if content.startswith("---"):
+        parts = content.split("---", 2)
+        if len(parts) >= 3:
+            content = parts[2].strip()
+
+    return {
+        "id": item.get("id"),
+        "content": content,
+        "metadata": metadata,
+        "similarity": item.get("similarity"),
+        "document_name": doc_name,
+        "chunk_index": metadata.get("chunk_index", 0)
+    }
+
+
+def search_documents_batch(
+    queries: List[str],
+    top_k: int = 5,
+    similarity_threshold: float = 0.1,
+    query_embeddings: Optional[List[List[float]]] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Run semantic searches for several queries in one database round trip.
+
+    Queries are embedded with a single API request and matched by the
+    match_documents_batch RPC (migrations/008_batch_vector_search.sql),
+    which runs match_documents() once per embedding server-side.
+
+    Args:
+        queries: The search query texts.
+        top_k: Maximum number of results per query. Defaults to 5.
+        similarity_threshold: Minimum similarity score (0-1) for results.
+            Defaults to 0.1.
+        query_embeddings: Precomputed embeddings, one per query; skips the
+            embedding call when given.
+
+    Returns:
+        One result list per query, in order, each as from search_documents().
+    """
+    if not queries:
+        return []
+    if query_embeddings is None:
+        query_embeddings = get_query_embeddings(queries)
+
+    response = _get_supabase_client().rpc(
+        "match_documents_batch",
         {
-            "query_embedding": query_embedding,
+            "query_embeddings": query_embeddings,
             "match_count": top_k,
             "similarity_threshold": similarity_threshold
         }
     ).execute()
 
-    # Format results
+    grouped: List[List[Dict[str, Any]]] = [[] for _ in queries]
+    for item in response.data or []:
+        grouped[item["query_index"]].append(_format_chunk(item))
+    return grouped
+
+
+class BatchingRetriever:
+    """Coalesce concurrent semantic searches into batched database calls.
+
+    Callers await search(query) as usual; queries are buffered and sent
+    together through search_documents_batch() once max_batch are queued or
+    max_wait seconds have passed since the first one, whichever comes first.
+    Under concurrent load this replaces N embedding requests and N RPCs with
+    one of each.
+
+    The worker task is started on first use and restarted if the retriever
+    is used from a new event loop (e.g. successive asyncio.run calls).
+
+    Example:
+        retriever = BatchingRetriever()
+        results = await asyncio.gather(
+            retriever.search("vacation policy"),
+            retriever.search("remote work"),
+        )
+    """
+
+    def __init__(self, similarity_threshold: float = 0.1, max_batch: int = 32, max_wait: float = 0.05):
+        self.similarity_threshold = similarity_threshold
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """Queue a semantic search and wait for its results."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        await self._queue.put((query, top_k, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[str, int, asyncio.Future]]) -> None:
+        # One RPC serves every top_k; smaller requests take a prefix
+        top_k = max(k for _, k, _ in batch)
+        try:
+            results = await asyncio.to_thread(
+                search_documents_batch,
+                [query for query, _, _ in batch],
+                top_k=top_k,
+                similarity_threshold=self.similarity_threshold
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, k, future), matches in zip(batch, results):
+            if not future.done():
+                future.set_result(matches[:k])
+
+
+def keyword_search(
+    query: str,
+    top_k: int = 10,
+    file_types: Optional[List[str]] = None,
+    after: Optional[Union[datetime, date, str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Full-text search ranked by Postgres ts_rank_cd.
+
+    Uses the match_documents_fts RPC (migrations/005_full_text_search.sql),
+    which matches websearch-style queries against a GIN-indexed tsvector.
+
+    Args:
+        query: The search query text.
+        top_k: Maximum number of results to return. Defaults to 10.
+        file_types: Only search documents with these file types.
+        after: Only search chunks created after this date/time.
+
+    Returns:
+        Result dictionaries as from search_documents(), with "rank" holding
+        the text-search rank and "similarity" set to None.
+    """
+    params = {"query_text": query, "match_count": top_k}
+    if file_types:
+        params["filter_file_types"] = list(file_types)
+    if after is not None:
+        params["filter_after"] = after.isoformat() if isinstance(after, (datetime, date)) else after
+
+    response = _get_supabase_client().rpc("match_documents_fts", params).execute()
+
     results = []
     for item in response.data or []:
+        result = _format_chunk(item)
+        result["rank"] = item.get("rank")
+        results.append(result)
+    return results
+
+
+def rrf_hybrid_search(
+    query: str,
+    top_k: int = 10,
+    semantic_weight: float = 0.6,
+    k: int = RRF_K,
+    candidates: int = 50,
+    file_types: Optional[List[str]] = None,
+    after: Optional[Union[datetime, date, str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Hybrid vector + full-text search fused with Reciprocal Rank Fusion.
+
+    Runs search_documents() and keyword_search() concurrently and scores
+    each chunk as
+
+        rrf_score = w_vec / (k + rank_vec) + w_fts / (k + rank_fts)
+
+    where a missing rank contributes nothing. Ranks rather than raw scores
+    are fused, so cosine similarity and ts_rank_cd need no normalization.
+
+    If full-text search is unavailable (migration 005 not applied), results
+    fall back to vector ranking alone.
+
+    Args:
+        query: The search query text.
+        top_k: Maximum number of results to return. Defaults to 10.
+        semantic_weight: Weight of the vector ranking (0-1); full-text gets
+            1 - semantic_weight. Defaults to 0.6.
+        k: RRF rank constant. Defaults to 60.
+        candidates: Results fetched from each ranking before fusion.
+        file_types: Only search documents with these file types.
+        after: Only search chunks created after this date/time.
+
+    Returns:
+        Result dictionaries as from search_documents(), plus "rrf_score" and
+        "search_type" ("semantic", "keyword" or "both"), sorted by rrf_score.
+    """
+    fetch_k = max(candidates, top_k)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        semantic_future = executor.submit(
+            search_documents, query, top_k=fetch_k,
+            file_types=file_types, after=after
+        )
+        keyword_future = executor.submit(
+            keyword_search, query, top_k=fetch_k,
+            file_types=file_types, after=after
+        )
+        semantic_results = semantic_future.result()
+        try:
+            keyword_results = keyword_future.result()
+        except Exception:
+            keyword_results = []
+
+    keyword_weight = 1 - semantic_weight
+    fused: Dict[Any, Dict[str, Any]] = {}
+
+    for rank, result in enumerate(semantic_results, 1):
+        result["rrf_score"] = semantic_weight / (k + rank)
+        result["search_type"] = "semantic"
+        fused[result["id"]] = result
+
+    for rank, result in enumerate(keyword_results, 1):
+        score = keyword_weight / (k + rank)
+        existing = fused.get(result["id"])
+        if existing is not None:
+            existing["rrf_score"] += score
+            existing["rank"] = result.get("rank")
+            existing["search_type"] = "both"
+        else:
+            result["rrf_score"] = score
+            result["search_type"] = "keyword"
+            fused[result["id"]] = result
+
+    return heapq.nlargest(top_k, fused.values(), key=lambda r: r["rrf_score"])
+
+
+def list_file_types() -> List[str]:
+    """
+    List the distinct file types of stored documents, for search filters.
+
+    Returns:
+        Sorted list of file type strings (e.g. ["csv", "docx", "pdf"]).
+    """
+    supabase = _get_supabase_client()
+    response = supabase.table("documents").select("file_type").execute()
+    return sorted({row["file_type"] for row in response.data or [] if row.get("file_type")})
+
+
+def _substring_search(query: str, top_k: int) -> List[Dict[str, Any]]:
+    """Chunks whose content contains the query verbatim (case-insensitive)."""
+    # Get Supabase client for keyword search
+    supabase = _get_supabase_client()
+
+    # Perform keyword search using Supabase full-text search
+    keyword_response = supabase.table("document_chunks").select(
+        "id, content, metadata"
+    ).ilike("content", f"%{query}%").limit(top_k).execute()
+
+    # Process keyword results
+    keyword_results = []
+    for item in keyword_response.data or []:
         metadata = item.get("metadata", {})
-        # Try multiple field names for document name
         doc_name = (
             metadata.get("document_name") or
             metadata.get("file_name") or
             metadata.get("title") or
             "Unknown"
         )
-        # Strip YAML frontmatter from content if present
-        content = item.get("content", "")
-        if content.startswith("---"):
-            parts = content.split("---", 2)
-            if len(parts) >= 3:
-                content = parts[2].strip()
-
-        results.append({
+        keyword_results.append({
             "id": item.get("id"),
-            "content": content,
+            "content": item.get("content"),
             "metadata": metadata,
-            "similarity": item.get("similarity"),
+            "similarity": 1.0,  # Full match score for keyword results
             "document_name": doc_name,
             "chunk_index": metadata.get("chunk_index", 0)
         })
 
-    return results
+    return keyword_results
 
 
 def hybrid_search(
@@ -198,39 +737,17 @@ def hybrid_search(
         >>> for doc in results:
         ...     print(f"[{doc['search_type']}] {doc['document_name']}")
     """
-    # Get semantic search results
-    semantic_results = search_documents(
-        query,
-        top_k=top_k,
-        similarity_threshold=0.3  # Lower threshold to capture more matches
-    )
-
-    # Get Supabase client for keyword search
-    supabase = _get_supabase_client()
-
-    # Perform keyword search using Supabase full-text search
-    keyword_response = supabase.table("document_chunks").select(
-        "id, content, metadata"
-    ).ilike("content", f"%{query}%").limit(top_k).execute()
-
-    # Process keyword results
-    keyword_results = []
-    for item in keyword_response.data or []:
-        metadata = item.get("metadata", {})
-        doc_name = (
-            metadata.get("document_name") or
-            metadata.get("file_name") or
-            metadata.get("title") or
-            "Unknown"
+    # Run the semantic and keyword searches concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        semantic_future = executor.submit(
+            search_documents,
+            query,
+            top_k=top_k,
+            similarity_threshold=0.3  # Lower threshold to capture more matches
         )
-        keyword_results.append({
-            "id": item.get("id"),
-            "content": item.get("content"),
-            "metadata": metadata,
-            "similarity": 1.0,  # Full match score for keyword results
-            "document_name": doc_name,
-            "chunk_index": metadata.get("chunk_index", 0)
-        })
+        keyword_future = executor.submit(_substring_search, query, top_k)
+        semantic_results = semantic_future.result()
+        keyword_results = keyword_future.result()
 
     # Merge results avoiding duplicates
     seen_ids = set()
@@ -266,10 +783,78 @@ def hybrid_search(
             result["search_type"] = "keyword"
             combined_results.append(result)
 
-    # Sort by combined similarity score and return top_k
-    combined_results.sort(key=lambda x: x["similarity"], reverse=True)
+    # Best top_k by combined similarity score (same order as a full sort)
+    return heapq.nlargest(top_k, combined_results, key=lambda x: x["similarity"])
+
+
+def _embed_and_store_chunks(rows: List[Dict[str, Any]]) -> int:
+    """Embed one batch of chunks with a single request and write it back."""
+    response = _get_openai_client().embeddings.create(
+        model=EMBEDDING_MODEL,
+        input=[row["content"] for row in rows]
+    )
+    updates = [
+        {"id": row["id"], "embedding": item.embedding}
+        for row, item in zip(rows, response.data)
+    ]
+    result = _get_supabase_client().rpc(
+        "set_chunk_embeddings", {"chunk_embeddings": updates}
+    ).execute()
+    return result.data or 0
+
+
+def populate_embeddings(batch_size: int = 128, max_workers: int = 4) -> int:
+    """
+    Backfill embeddings for document chunks that don't have one yet.
+
+    Chunks with a NULL embedding are paged through in id order, embedded
+    batch_size at a time with one API request per batch, and written back
+    with one set_chunk_embeddings RPC call per batch
+    (migrations/010_chunk_embedding_backfill.sql). Up to max_workers
+    batches are in flight at once, so embedding requests overlap database
+    writes.
 
-    return combined_results[:top_k]
+    Args:
+        batch_size: Chunks per embedding request and write. Defaults to 128.
+        max_workers: Concurrent batches. Defaults to 4.
+
+    Returns:
+        Number of chunks updated.
+
+    Raises:
+        ValueError: If OpenAI or Supabase credentials are missing.
+        openai.OpenAIError: If an embedding request fails.
+    """
+    client = _get_supabase_client()
+    page_size = batch_size * max_workers
+    last_id = None
+    updated = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            query = (
+                client.table("document_chunks")
+                .select("id, content")
+                .is_("embedding", "null")
+                .order("id")
+                .limit(page_size)
+            )
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            page = query.execute().data or []
+            if not page:
+                break
+            last_id = page[-1]["id"]
+
+            # The embeddings endpoint rejects empty input
+            rows = [row for row in page if (row.get("content") or "").strip()]
+            batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+            updated += sum(executor.map(_embed_and_store_chunks, batches))
+
+            if len(page) < page_size:
+                break
+
+    return updated
 
 
 if __name__ == "__main__":
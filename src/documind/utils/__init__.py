@@ -1,4 +1,12 @@
 """Utility functions for document processing."""
-from .hashing import generate_fingerprint, generate_chunk_id, content_hash
+from .hashing import generate_fingerprint, generate_chunk_id, content_hash, file_hash
+from .file_io import read_file, iter_file_chunks
+from .json_io import load_json, loads_json, dump_json, dumps_json
+from .compression import compress_content, decompress_content
 
-__all__ = ['generate_fingerprint', 'generate_chunk_id', 'content_hash']
+__all__ = [
+    'generate_fingerprint', 'generate_chunk_id', 'content_hash', 'file_hash',
+    'read_file', 'iter_file_chunks',
+    'load_json', 'loads_json', 'dump_json', 'dumps_json',
+    'compress_content', 'decompress_content',
+]
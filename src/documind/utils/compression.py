@@ -0,0 +1,58 @@
+"""
+Document Content Compression
+zstd helpers for storing full document text in documents.content_zstd
+"""
+import os
+from typing import Any, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:  # Optional: pip install zstandard
+    zstandard = None
+
+# Store new uploads compressed (requires zstandard and migration 006)
+COMPRESS_CONTENT = os.getenv("DOCUMIND_COMPRESS_CONTENT", "0") == "1"
+ZSTD_LEVEL = 3
+
+
+def compression_enabled() -> bool:
+    """Whether uploads should write content_zstd instead of content."""
+    return COMPRESS_CONTENT and zstandard is not None
+
+
+def compress_content(text: str, level: int = ZSTD_LEVEL) -> str:
+    """
+    Compress document text for a bytea column.
+
+    Args:
+        text: Document content
+        level: zstd compression level (default 3)
+
+    Returns:
+        PostgREST bytea literal (``\\x`` + hex)
+    """
+    data = zstandard.ZstdCompressor(level=level).compress(text.encode('utf-8'))
+    return '\\x' + data.hex()
+
+
+def decompress_content(row: Dict[str, Any]) -> Optional[str]:
+    """
+    Get the document text from a documents row.
+
+    Rows written with compression carry ``content_zstd`` (a bytea literal as
+    returned by PostgREST, or raw bytes); others carry plain ``content``.
+
+    Args:
+        row: documents row
+
+    Returns:
+        Document content
+    """
+    packed = row.get('content_zstd')
+    if not packed:
+        return row.get('content')
+    if isinstance(packed, str):
+        packed = bytes.fromhex(packed[2:] if packed.startswith('\\x') else packed)
+    if zstandard is None:
+        raise RuntimeError("zstandard is required to read compressed document content")
+    return zstandard.ZstdDecompressor().decompress(bytes(packed)).decode('utf-8')
@@ -0,0 +1,78 @@
+"""
+File Reading
+Sequential reads with kernel readahead hints for batch ingestion
+"""
+import os
+from pathlib import Path
+from typing import Iterator, Union
+
+# posix_fadvise is Linux/BSD only; elsewhere the hints are skipped
+_HAS_FADVISE = hasattr(os, 'posix_fadvise')
+
+
+def _advise_sequential(fd: int) -> None:
+    """Tell the kernel the whole file will be read front to back."""
+    if not _HAS_FADVISE:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        # Some filesystems (pipes, FUSE) reject advice; reading still works
+        pass
+
+
+def read_file(path: Union[str, Path]) -> bytes:
+    """
+    Read a whole file into memory.
+
+    Sizes a single buffer from fstat and fills it with readinto, after
+    asking the kernel to start readahead for the full file. Falls back to
+    Path.read_bytes if the file changes size while being read.
+
+    Args:
+        path: File to read
+
+    Returns:
+        The file's raw bytes
+    """
+    with open(path, 'rb', buffering=0) as f:
+        fd = f.fileno()
+        size = os.fstat(fd).st_size
+        _advise_sequential(fd)
+
+        buf = bytearray(size)
+        view = memoryview(buf)
+        read = 0
+        while read < size:
+            n = f.readinto(view[read:])
+            if not n:
+                break
+            read += n
+        view.release()
+
+        if read != size or f.read(1):
+            return Path(path).read_bytes()
+    return bytes(buf)
+
+
+def iter_file_chunks(path: Union[str, Path], chunk_size: int = 1 << 20) -> Iterator[memoryview]:
+    """
+    Yield a file's bytes in fixed-size chunks.
+
+    Reuses one buffer for every chunk, so each yielded view is only valid
+    until the next iteration; copy it if it must outlive the loop.
+
+    Args:
+        path: File to read
+        chunk_size: Bytes per chunk (default 1 MiB)
+
+    Yields:
+        memoryview over the bytes read in this chunk
+    """
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    with open(path, 'rb', buffering=0) as f:
+        _advise_sequential(f.fileno())
+        while n := f.readinto(view):
+            yield view[:n]
@@ -3,7 +3,10 @@ Document Fingerprinting
 Generates SHA-256 hashes for duplicate detection
 """
 import hashlib
-from typing import Optional
+from pathlib import Path
+from typing import Optional, Union
+
+from .file_io import iter_file_chunks
 
 def generate_fingerprint(content: str, normalize: bool = True) -> str:
     """
@@ -46,3 +49,22 @@ def content_hash(content: str, algorithm: str = 'sha256') -> str:
         return hashlib.sha1(content.encode()).hexdigest()
     else:
         raise ValueError(f"Unsupported algorithm: {algorithm}")
+
+def file_hash(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """
+    Generate BLAKE2b hash of a file's raw bytes.
+
+    Reads the file in chunks so large documents are never fully loaded
+    into memory; the kernel is asked to read ahead while chunks hash.
+
+    Args:
+        path: File to hash
+        chunk_size: Bytes read per iteration (default 1 MiB)
+
+    Returns:
+        Hexadecimal BLAKE2b hash string
+    """
+    digest = hashlib.blake2b()
+    for chunk in iter_file_chunks(path, chunk_size):
+        digest.update(chunk)
+    return digest.hexdigest()
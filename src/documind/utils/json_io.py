@@ -0,0 +1,88 @@
+"""
+JSON File I/O
+Uses orjson when installed, falling back to the standard library
+"""
+import json
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # Optional speedup: pip install orjson
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def load_json(path: Union[str, Path]) -> Any:
+    """
+    Load a JSON file.
+
+    Args:
+        path: File to read
+
+    Returns:
+        Parsed JSON value
+    """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document.
+
+    Args:
+        data: JSON text or UTF-8 bytes
+
+    Returns:
+        Parsed JSON value
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(
+    obj: Any,
+    indent: bool = True,
+    default: Optional[Callable[[Any], Any]] = None
+) -> str:
+    """
+    Serialize a value to a JSON string.
+
+    Args:
+        obj: Value to serialize
+        indent: Pretty-print with two-space indentation (default True)
+        default: Called for values that are not JSON serializable
+            (e.g. ``str``); by default they raise TypeError
+
+    Returns:
+        JSON text
+    """
+    if orjson is not None:
+        option = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=default, option=option).decode('utf-8')
+    return json.dumps(obj, indent=2 if indent else None, default=default)
+
+
+def dump_json(obj: Any, path: Union[str, Path], indent: bool = True) -> None:
+    """
+    Write a value to a JSON file.
+
+    Args:
+        obj: Value to serialize
+        path: File to write
+        indent: Pretty-print with two-space indentation (default True)
+    """
+    if orjson is not None:
+        option = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=option))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, indent=2 if indent else None)
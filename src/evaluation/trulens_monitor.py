@@ -1,4 +1,5 @@
 # src/evaluation/trulens_monitor.py
+import asyncio
 import os
 from trulens.core import TruSession, Feedback, Select
 from trulens.apps.custom import TruCustomApp
@@ -139,6 +140,14 @@ class DocuMindTruLens:
             result = self.rag.query(question)
         return result
 
+    async def aquery(self, question: str):
+        """Async monitored query for concurrent fan-out with asyncio.gather
+
+        Retrieval and generation are network-bound, so each recording runs
+        in a worker thread and several queries overlap their round trips.
+        """
+        return await asyncio.to_thread(self.query, question)
+
     def get_records(self):
         """Get all recorded sessions"""
         records, feedback = self.session.get_records_and_feedback()
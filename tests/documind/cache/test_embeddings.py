@@ -0,0 +1,38 @@
+"""
+Tests for the on-disk embedding cache.
+"""
+import pytest
+
+from src.documind.cache.embeddings import EmbeddingCache
+
+MODEL = "text-embedding-3-small"
+
+
+class TestEmbeddingCache:
+    """Test suite for EmbeddingCache get/put/persistence."""
+
+    def test_miss_returns_none(self, tmp_path):
+        assert EmbeddingCache(tmp_path / "emb.sqlite").get(MODEL, "hello") is None
+
+    def test_round_trip_as_float32(self, tmp_path):
+        cache = EmbeddingCache(tmp_path / "emb.sqlite")
+        cache.put(MODEL, "hello", [0.1, -0.2, 0.3])
+
+        assert cache.get(MODEL, "hello") == pytest.approx((0.1, -0.2, 0.3), abs=1e-7)
+
+    def test_persists_across_instances(self, tmp_path):
+        path = tmp_path / "emb.sqlite"
+        first = EmbeddingCache(path)
+        first.put_many(MODEL, {"a": [1.0], "b": [2.0]})
+        first.close()
+
+        second = EmbeddingCache(path)
+
+        assert second.get(MODEL, "a") == (1.0,)
+        assert second.get(MODEL, "b") == (2.0,)
+
+    def test_keyed_by_model(self, tmp_path):
+        cache = EmbeddingCache(tmp_path / "emb.sqlite")
+        cache.put(MODEL, "hello", [1.0])
+
+        assert cache.get("text-embedding-3-large", "hello") is None
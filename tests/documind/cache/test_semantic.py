@@ -0,0 +1,240 @@
+"""
+Tests for the semantic answer cache.
+"""
+import numpy as np
+import pytest
+
+from src.documind.cache import _kernels, semantic
+from src.documind.cache.semantic import SemanticCache
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+class TestSemanticCache:
+    """Test suite for SemanticCache lookup/insert/persistence."""
+
+    def test_empty_cache_misses(self, rng):
+        assert SemanticCache().lookup(rng.normal(size=8)) is None
+
+    def test_near_duplicate_hits(self, rng):
+        cache = SemanticCache()
+        emb = rng.normal(size=64)
+        cache.insert(emb, {"answer": "20 days"})
+
+        hit = cache.lookup(emb * 3 + rng.normal(scale=0.01, size=64))
+
+        assert hit["answer"] == "20 days"
+        assert hit["cache_similarity"] > 0.99
+
+    def test_dissimilar_misses(self, rng):
+        cache = SemanticCache()
+        cache.insert(np.eye(8)[0], {"answer": "a"})
+
+        assert cache.lookup(np.eye(8)[1]) is None
+        assert cache.lookup(np.eye(8)[1], tau=-1.0)["answer"] == "a"
+
+    def test_returns_best_match(self):
+        cache = SemanticCache()
+        for i in range(4):
+            cache.insert(np.eye(4)[i], {"answer": str(i)})
+
+        assert cache.lookup([0.1, 0.2, 0.9, 0.1])["answer"] == "2"
+
+    def test_grows_past_initial_capacity(self, rng, monkeypatch):
+        monkeypatch.setattr(semantic, "SCAN_BLOCK_ROWS", 3)
+        cache = SemanticCache(initial_capacity=2, use_hnsw=False)
+        embeddings = rng.normal(size=(10, 16))
+        for i, emb in enumerate(embeddings):
+            cache.insert(emb, {"answer": str(i)})
+
+        assert len(cache) == 10
+        assert cache.lookup(embeddings[7])["answer"] == "7"
+
+    def test_save_and_load(self, tmp_path, rng):
+        path = tmp_path / "cache.sqlite"
+        cache = SemanticCache(path)
+        emb = rng.normal(size=32)
+        cache.insert(emb, {"answer": "saved", "sources": [{"document": "handbook.pdf"}]})
+        cache.save()
+
+        restored = SemanticCache(path)
+
+        assert len(restored) == 1
+        assert restored.lookup(emb)["sources"] == [{"document": "handbook.pdf"}]
+
+    def test_clear(self, rng):
+        cache = SemanticCache()
+        cache.insert(rng.normal(size=8), {"answer": "x"})
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_hnsw_index_matches_linear_scan(self, rng, monkeypatch):
+        pytest.importorskip("hnswlib")
+        monkeypatch.setattr(semantic, "ANN_MIN_ENTRIES", 0)
+        indexed = SemanticCache(use_hnsw=True)
+        linear = SemanticCache(use_hnsw=False)
+        embeddings = rng.normal(size=(50, 32))
+        for i, emb in enumerate(embeddings):
+            indexed.insert(emb, {"answer": str(i)})
+            linear.insert(emb, {"answer": str(i)})
+
+        for emb in embeddings[::7]:
+            query = emb + rng.normal(scale=0.01, size=32)
+            assert indexed.lookup(query)["answer"] == linear.lookup(query)["answer"]
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+class TestEviction:
+    """Test suite for LRU eviction and TTL expiry."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(semantic, "time", clock)
+        return clock
+
+    def test_evicts_least_recently_used(self):
+        cache = SemanticCache(max_entries=2, use_hnsw=False)
+        cache.insert(np.eye(4)[0], {"answer": "0"})
+        cache.insert(np.eye(4)[1], {"answer": "1"})
+        cache.lookup(np.eye(4)[0])  # refresh 0, so 1 is now LRU
+        cache.insert(np.eye(4)[2], {"answer": "2"})
+
+        assert len(cache) == 2
+        assert cache.lookup(np.eye(4)[0])["answer"] == "0"
+        assert cache.lookup(np.eye(4)[1]) is None
+        assert cache.lookup(np.eye(4)[2])["answer"] == "2"
+
+    def test_evicted_rows_are_reused(self, rng):
+        cache = SemanticCache(max_entries=3, initial_capacity=4, use_hnsw=False)
+        for emb in rng.normal(size=(20, 8)):
+            cache.insert(emb, {"answer": "x"})
+
+        assert len(cache) == 3
+        assert cache._codes.shape[0] == 4
+
+    def test_freed_rows_never_match(self):
+        cache = SemanticCache(max_entries=1, use_hnsw=False)
+        cache.insert(np.eye(4)[0], {"answer": "old"})
+        cache.insert(-np.eye(4)[0], {"answer": "new"})
+
+        # The live entry scores -1; the freed row must not win with 0
+        assert cache.lookup(np.eye(4)[0], tau=-1.0)["answer"] == "new"
+
+    def test_expired_entry_is_a_miss(self, clock):
+        cache = SemanticCache(ttl=60, use_hnsw=False)
+        cache.insert(np.eye(4)[0], {"answer": "stale"})
+
+        clock.now += 59
+        assert cache.lookup(np.eye(4)[0])["answer"] == "stale"
+        clock.now += 1
+        assert cache.lookup(np.eye(4)[0]) is None
+        assert len(cache) == 0
+
+    def test_no_ttl_never_expires(self, clock):
+        cache = SemanticCache(ttl=None, use_hnsw=False)
+        cache.insert(np.eye(4)[0], {"answer": "x"})
+        clock.now += 10 * semantic.DEFAULT_TTL
+        assert cache.lookup(np.eye(4)[0])["answer"] == "x"
+
+    def test_load_skips_expired_and_keeps_order(self, tmp_path, clock):
+        path = tmp_path / "cache.sqlite"
+        cache = SemanticCache(path, ttl=60, use_hnsw=False)
+        cache.insert(np.eye(4)[0], {"answer": "old"})
+        clock.now += 30
+        cache.insert(np.eye(4)[1], {"answer": "a"})
+        cache.insert(np.eye(4)[2], {"answer": "b"})
+        cache.lookup(np.eye(4)[1])  # 2 is now LRU
+        cache.save()
+
+        clock.now += 40  # "old" has expired; entries from t+30 are still fresh
+        restored = SemanticCache(path, ttl=60, max_entries=2, use_hnsw=False)
+        assert len(restored) == 2
+        restored.insert(np.eye(4)[3], {"answer": "c"})
+
+        assert restored.lookup(np.eye(4)[0], tau=0.99) is None
+        assert restored.lookup(np.eye(4)[1])["answer"] == "a"
+        assert restored.lookup(np.eye(4)[2]) is None
+
+    def test_hnsw_rebuilds_after_deletions(self, rng, monkeypatch):
+        pytest.importorskip("hnswlib")
+        monkeypatch.setattr(semantic, "ANN_MIN_ENTRIES", 0)
+        cache = SemanticCache(max_entries=10, use_hnsw=True)
+        embeddings = rng.normal(size=(10, 16))
+        for i, emb in enumerate(embeddings):
+            cache.insert(emb, {"answer": str(i)})
+        for i in range(3):
+            cache._remove(i)
+
+        assert cache._index.get_current_count() == 7
+        assert cache.lookup(embeddings[5])["answer"] == "5"
+        assert cache.lookup(embeddings[1], tau=0.99) is None
+
+
+class TestTop1CosineKernel:
+    """Test suite for the linear-scan kernel (pure Python without numba)."""
+
+    def quantized(self, mat):
+        pairs = [semantic._quantize(row) for row in mat]
+        codes = np.stack([c for c, _ in pairs])
+        scales = np.array([s for _, s in pairs], dtype=np.float32)
+        return codes, scales
+
+    def test_matches_float_argmax(self, rng):
+        mat = rng.normal(size=(40, 16)).astype(np.float32)
+        mat /= np.linalg.norm(mat, axis=1, keepdims=True)
+        q = mat[17] + rng.normal(scale=0.05, size=16).astype(np.float32)
+        q /= np.linalg.norm(q)
+        codes, scales = self.quantized(mat)
+        q_codes, q_scale = semantic._quantize(q)
+
+        best, score = _kernels._top1_cosine(codes, scales, q_codes, q_scale, 30, 16)
+
+        assert best == int(np.argmax(mat[:30] @ q))
+        assert score == pytest.approx(float(np.max(mat[:30] @ q)), abs=0.02)
+
+    def test_ignores_rows_past_n(self):
+        codes, scales = self.quantized(np.eye(3, dtype=np.float32))
+        best, _ = _kernels._top1_cosine(codes, scales, codes[2], scales[2], 2, 3)
+        assert best in (0, 1)
+
+
+class TestQuantization:
+    """Test suite for int8 embedding storage."""
+
+    def test_codes_stored_as_int8(self, rng):
+        cache = SemanticCache()
+        cache.insert(rng.normal(size=1536), {"answer": "x"})
+        assert cache._codes.dtype == np.int8
+        assert cache._codes.nbytes == cache._codes.shape[0] * 1536
+
+    def test_similarity_close_to_exact(self, rng):
+        cache = SemanticCache(use_hnsw=False)
+        a, b = rng.normal(size=(2, 1536))
+        cache.insert(a, {"answer": "a"})
+
+        exact = float(a @ b / np.linalg.norm(a) / np.linalg.norm(b))
+        hit = cache.lookup(b, tau=-1.0)
+
+        assert hit["cache_similarity"] == pytest.approx(exact, abs=0.01)
+
+    def test_save_load_keeps_codes(self, tmp_path, rng):
+        path = tmp_path / "cache.sqlite"
+        cache = SemanticCache(path)
+        for emb in rng.normal(size=(5, 64)):
+            cache.insert(emb, {"answer": "x"})
+        cache.save()
+
+        restored = SemanticCache(path)
+
+        np.testing.assert_array_equal(restored._codes[:5], cache._codes[:5])
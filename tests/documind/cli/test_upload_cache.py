@@ -0,0 +1,81 @@
+"""
+Tests for the upload CLI's on-disk cache.
+"""
+import os
+
+import pytest
+
+from src.documind.cli.upload_cache import UploadCache
+from src.documind.utils.hashing import file_hash
+
+
+class TestUploadCache:
+    """Test suite for UploadCache."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        cache = UploadCache(tmp_path / "cache" / "upload_cache.sqlite")
+        yield cache
+        cache.close()
+
+    @pytest.fixture
+    def sample_file(self, tmp_path):
+        path = tmp_path / "policy.txt"
+        path.write_text("Employees receive 15 vacation days.")
+        return path
+
+    def test_miss_then_hit(self, cache, sample_file):
+        """Test that a recorded upload is found by content hash."""
+        digest = file_hash(sample_file)
+        assert cache.get(digest) is None
+
+        cache.put(digest, "doc-1", has_embeddings=True, format="txt", words=5, chunks=1)
+
+        hit = cache.get(digest)
+        assert hit["document_id"] == "doc-1"
+        assert hit["words"] == 5
+
+    def test_upload_without_embeddings_not_reused_for_embedding_run(self, cache, sample_file):
+        """Test that uploads made with --no-embeddings don't satisfy embedding runs."""
+        digest = file_hash(sample_file)
+        cache.put(digest, "doc-1", has_embeddings=False)
+
+        assert cache.get(digest, with_embeddings=True) is None
+        assert cache.get(digest, with_embeddings=False)["document_id"] == "doc-1"
+
+    def test_cached_hash_invalidated_on_modification(self, cache, sample_file):
+        """Test that changing a file's size or mtime drops its stored hash."""
+        cache.remember_hash(sample_file, file_hash(sample_file))
+        assert cache.cached_hash(sample_file) == file_hash(sample_file)
+
+        sample_file.write_text("Employees receive 20 vacation days.")
+        os.utime(sample_file, ns=(0, 1))
+
+        assert cache.cached_hash(sample_file) is None
+
+    def test_persists_across_instances(self, tmp_path, sample_file):
+        """Test that the cache survives reopening the database."""
+        db_path = tmp_path / "upload_cache.sqlite"
+        digest = file_hash(sample_file)
+
+        first = UploadCache(db_path)
+        first.put(digest, "doc-1", has_embeddings=True)
+        first.close()
+
+        second = UploadCache(db_path)
+        assert second.get(digest)["document_id"] == "doc-1"
+        second.close()
+
+    def test_wal_mode(self, cache):
+        """Test that the database runs in WAL mode."""
+        assert cache._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_usable_from_worker_threads(self, cache, sample_file):
+        """Test that one instance can be shared with worker threads."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        digests = [f"hash-{i}" for i in range(20)]
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(lambda d: cache.put(d, d, has_embeddings=True), digests))
+
+        assert all(cache.get(d)["document_id"] == d for d in digests)
@@ -0,0 +1,200 @@
+"""
+Tests for the DocuMind upload CLI.
+Upload paths run against an in-memory httpx transport, no network needed.
+"""
+import asyncio
+import io
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src.documind.cli import upload_cli
+from src.documind.cli.upload_cli import (
+    DocumentInsertBatcher,
+    ProgressReporter,
+    collect_files,
+    process_and_upload,
+)
+
+
+def make_client(handler):
+    """Create an AsyncClient backed by a mock transport."""
+    return httpx.AsyncClient(base_url="http://supabase.test/rest/v1", transport=httpx.MockTransport(handler))
+
+
+class TestDocumentInsertBatcher:
+    """Test suite for bulk document inserts."""
+
+    @pytest.fixture
+    def requests_seen(self):
+        return []
+
+    @pytest.fixture
+    def handler(self, requests_seen):
+        ids = itertools.count(1)
+
+        def _handler(request):
+            rows = json.loads(request.content)
+            requests_seen.append(rows)
+            if any(row["title"] == "duplicate" for row in rows):
+                return httpx.Response(409, json={"message": "duplicate key"})
+            return httpx.Response(201, json=[{**row, "id": next(ids)} for row in rows])
+
+        return _handler
+
+    def insert_all(self, handler, titles, **kwargs):
+        async def run():
+            async with make_client(handler) as client:
+                async with DocumentInsertBatcher(client, **kwargs) as batcher:
+                    return await asyncio.gather(
+                        *[batcher.insert({"title": t}) for t in titles],
+                        return_exceptions=True
+                    )
+        return asyncio.run(run())
+
+    def test_concurrent_inserts_share_one_request(self, handler, requests_seen):
+        """Test that concurrent inserts are coalesced into a bulk insert."""
+        results = self.insert_all(handler, ["a.pdf", "b.pdf", "c.pdf"])
+
+        assert len(requests_seen) == 1
+        assert [r["title"] for r in results] == ["a.pdf", "b.pdf", "c.pdf"]
+        assert [r["id"] for r in results] == [1, 2, 3]
+
+    def test_max_batch_splits_requests(self, handler, requests_seen):
+        """Test that batches never exceed max_batch rows."""
+        self.insert_all(handler, [f"{i}.txt" for i in range(5)], max_batch=2)
+
+        assert [len(rows) for rows in requests_seen] == [2, 2, 1]
+
+    def test_conflict_retries_rows_individually(self, handler, requests_seen):
+        """Test that a constraint violation only fails the offending row."""
+        results = self.insert_all(handler, ["a.pdf", "duplicate", "c.pdf"])
+
+        assert results[0]["title"] == "a.pdf"
+        assert isinstance(results[1], httpx.HTTPStatusError)
+        assert results[2]["title"] == "c.pdf"
+        assert [len(rows) for rows in requests_seen] == [3, 1, 1, 1]
+
+
+class TestCollectFiles:
+    """Test suite for input file discovery."""
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        (tmp_path / "a.pdf").write_bytes(b"%PDF")
+        (tmp_path / "B.MD").write_text("# B")
+        (tmp_path / "notes.log").write_text("skip")
+        (tmp_path / "noext").write_text("skip")
+        nested = tmp_path / "nested"
+        nested.mkdir()
+        (nested / "c.csv").write_text("x,y")
+        return tmp_path
+
+    def test_directory_non_recursive(self, tree):
+        files = collect_files([], str(tree))
+        assert sorted(files) == sorted([str(tree / "a.pdf"), str(tree / "B.MD")])
+
+    def test_directory_recursive(self, tree):
+        files = collect_files([], str(tree), recursive=True)
+        assert str(tree / "nested" / "c.csv") in files
+        assert len(files) == 3
+
+    def test_duplicates_removed_in_order(self, tree):
+        pdf = str(tree / "a.pdf")
+        files = collect_files([pdf, str(tree / "nested" / "c.csv"), pdf])
+        assert files == [pdf, str(tree / "nested" / "c.csv")]
+
+    def test_directory_and_explicit_file_overlap(self, tree):
+        files = collect_files([str(tree / "a.pdf")], str(tree))
+        assert files.count(str(tree / "a.pdf")) == 1
+
+
+class CountingStream(io.StringIO):
+    """StringIO that counts write calls."""
+
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestProgressReporter:
+    """Test suite for batched progress output."""
+
+    def test_close_writes_pending_lines_in_one_call(self):
+        stream = CountingStream()
+        reporter = ProgressReporter(stream, interval=60).start()
+        for i in range(100):
+            reporter.push(f"line {i}")
+        reporter.close()
+        assert stream.writes == 1
+        assert stream.getvalue().splitlines() == [f"line {i}" for i in range(100)]
+
+    def test_drain_flushes_in_background(self):
+        stream = CountingStream()
+        reporter = ProgressReporter(stream, interval=0.01).start()
+        reporter.push("done")
+        for _ in range(200):
+            if stream.getvalue():
+                break
+            time.sleep(0.01)
+        assert stream.getvalue() == "done\n"
+        reporter.close()
+        assert stream.getvalue() == "done\n"
+
+
+class TestUploadLimits:
+    """Test suite for upload concurrency and startup checks."""
+
+    def test_upload_slots_bound_concurrent_uploads(self, monkeypatch):
+        active = peak = 0
+
+        async def fake_upload(doc, client, generate_emb=True, batcher=None):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {"success": True, "document_id": doc, "chunks_written": 0}
+
+        parsed = SimpleNamespace(
+            extractor_used="txt",
+            metadata=SimpleNamespace(basic=SimpleNamespace(word_count=1)),
+            chunks=[],
+        )
+        monkeypatch.setattr(upload_cli, "_parse_document", lambda path: parsed)
+        monkeypatch.setattr(upload_cli, "upload_to_documind", fake_upload)
+
+        async def run():
+            slots = asyncio.Semaphore(2)
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                return await asyncio.gather(*[
+                    process_and_upload(f"doc{i}.txt", None, executor, upload_slots=slots)
+                    for i in range(6)
+                ])
+
+        results = asyncio.run(run())
+        assert all(r["success"] for r in results)
+        assert peak == 2
+
+    def test_missing_supabase_config_exits_cleanly(self, tmp_path, monkeypatch, capsys):
+        doc = tmp_path / "a.txt"
+        doc.write_text("hello")
+        monkeypatch.delenv("SUPABASE_URL", raising=False)
+        monkeypatch.setattr("sys.argv", ["upload_cli", str(doc)])
+        upload_cli.get_supabase_rest_config.cache_clear()
+
+        try:
+            with pytest.raises(SystemExit) as exc:
+                upload_cli.main()
+        finally:
+            upload_cli.get_supabase_rest_config.cache_clear()
+
+        assert exc.value.code == 1
+        assert "SUPABASE_URL" in capsys.readouterr().out
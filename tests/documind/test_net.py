@@ -0,0 +1,27 @@
+"""
+Tests for shared network clients.
+"""
+import httpx
+
+from src.documind.net import (
+    shared_async_http_client,
+    shared_http_client,
+    supabase_client_options,
+)
+
+
+class TestSharedHttpClients:
+    """Test suite for the process-wide HTTP clients."""
+
+    def test_sync_client_is_shared(self):
+        assert shared_http_client() is shared_http_client()
+        assert isinstance(shared_http_client(), httpx.Client)
+
+    def test_async_client_is_shared(self):
+        assert shared_async_http_client() is shared_async_http_client()
+        assert isinstance(shared_async_http_client(), httpx.AsyncClient)
+
+    def test_supabase_options_use_shared_client(self):
+        options = supabase_client_options()
+
+        assert options.httpx_client is shared_http_client()
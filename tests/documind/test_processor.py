@@ -331,6 +331,55 @@ def hello():
         assert result.metadata.basic.word_count > 10000
 
 
+    # In-Memory Processing Tests
+    def test_process_document_bytes_matches_file(self, processor, sample_txt_file):
+        """Test in-memory processing produces the same content as the file path."""
+        data = Path(sample_txt_file).read_bytes()
+
+        from_bytes = processor.process_document_bytes(data, ".txt", "sample.txt")
+        from_file = processor.process_document(sample_txt_file)
+
+        assert from_bytes.file_name == "sample.txt"
+        assert from_bytes.raw_content == from_file.raw_content
+        assert from_bytes.metadata.fingerprint == from_file.metadata.fingerprint
+        assert from_bytes.metadata.basic.file_size_bytes == len(data)
+
+    def test_process_document_bytes_accepts_memoryview(self, processor):
+        """Test memoryview input (as returned by Streamlit's getbuffer)."""
+        data = memoryview(b"name,value\nA,1\nB,2\n")
+
+        result = processor.process_document_bytes(data, "csv", "values.csv")
+
+        assert result.extractor_used == "csv"
+        assert "values.csv" in result.raw_content
+
+    @pytest.mark.parametrize("sample", [
+        "simple_security_policy.pdf",
+        "meeting_notes.docx",
+        "employee_data.csv",
+    ])
+    def test_process_document_bytes_binary_formats(self, processor, sample):
+        """Test PDF, DOCX and CSV extraction from memory."""
+        path = Path("docs/workshops/S7-sample-docs") / sample
+        if not path.exists():
+            pytest.skip(f"Sample document not found: {path}")
+
+        result = processor.process_document_bytes(path.read_bytes(), path.suffix, path.name)
+
+        assert result.raw_content == processor.process_document(path).raw_content
+
+    def test_process_document_bytes_empty_raises_error(self, processor):
+        """Test empty uploads are rejected like empty files."""
+        with pytest.raises(ValueError) as exc_info:
+            processor.process_document_bytes(b"", ".txt", "empty.txt")
+        assert "empty" in str(exc_info.value).lower()
+
+    def test_process_document_bytes_unsupported_format(self, processor):
+        """Test unsupported extensions are rejected."""
+        with pytest.raises(ValueError):
+            processor.process_document_bytes(b"data", ".xyz", "file.xyz")
+
+
 class TestProcessedDocumentSerialization:
     """Test ProcessedDocument serialization."""
 
@@ -0,0 +1 @@
+"""Tests for document processing utilities."""
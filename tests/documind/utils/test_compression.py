@@ -0,0 +1,32 @@
+"""
+Tests for document content compression helpers.
+"""
+import pytest
+
+from src.documind.utils.compression import compress_content, decompress_content
+
+
+class TestDecompressContent:
+    """Test suite for reading documents rows."""
+
+    def test_plain_row(self):
+        assert decompress_content({"content": "hello", "content_zstd": None}) == "hello"
+
+    def test_missing_column(self):
+        assert decompress_content({"content": "hello"}) == "hello"
+
+    def test_round_trip_bytea_literal(self):
+        pytest.importorskip("zstandard")
+        text = "Employees accrue 1.5 days of PTO per month. " * 200
+
+        packed = compress_content(text)
+
+        assert packed.startswith("\\x")
+        assert len(packed) < len(text)
+        assert decompress_content({"content": None, "content_zstd": packed}) == text
+
+    def test_round_trip_raw_bytes(self):
+        pytest.importorskip("zstandard")
+        packed = bytes.fromhex(compress_content("café")[2:])
+
+        assert decompress_content({"content": None, "content_zstd": packed}) == "café"
@@ -0,0 +1,45 @@
+"""
+Tests for file reading helpers.
+"""
+import hashlib
+
+from src.documind.utils.file_io import read_file, iter_file_chunks
+from src.documind.utils.hashing import file_hash
+
+
+class TestReadFile:
+    """Test suite for read_file."""
+
+    def test_reads_whole_file(self, tmp_path):
+        data = bytes(range(256)) * 5000
+        path = tmp_path / "data.bin"
+        path.write_bytes(data)
+
+        assert read_file(path) == data
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+
+        assert read_file(path) == b""
+
+
+class TestIterFileChunks:
+    """Test suite for iter_file_chunks."""
+
+    def test_chunks_cover_file(self, tmp_path):
+        data = b"abcdefghij" * 101
+        path = tmp_path / "data.bin"
+        path.write_bytes(data)
+
+        chunks = [bytes(c) for c in iter_file_chunks(path, chunk_size=64)]
+
+        assert b"".join(chunks) == data
+        assert all(len(c) == 64 for c in chunks[:-1])
+
+    def test_file_hash_matches_blake2b(self, tmp_path):
+        data = b"x" * (3 * 1024 + 7)
+        path = tmp_path / "data.bin"
+        path.write_bytes(data)
+
+        assert file_hash(path, chunk_size=1024) == hashlib.blake2b(data).hexdigest()
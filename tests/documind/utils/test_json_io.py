@@ -0,0 +1,46 @@
+"""
+Tests for JSON file helpers.
+"""
+import json
+
+from src.documind.utils.json_io import load_json, loads_json, dump_json, dumps_json
+
+
+class TestJsonIO:
+    """Test suite for load_json/dump_json/dumps_json."""
+
+    def test_round_trip(self, tmp_path):
+        data = [{"question": "What is the PTO policy?", "score": 0.75, "tags": ["hr"]}]
+        path = tmp_path / "results.json"
+
+        dump_json(data, path)
+
+        assert load_json(path) == data
+
+    def test_dump_is_indented(self, tmp_path):
+        path = tmp_path / "results.json"
+
+        dump_json({"a": 1}, path)
+
+        assert path.read_text() == json.dumps({"a": 1}, indent=2)
+
+    def test_dumps_compact(self):
+        assert json.loads(dumps_json({"a": [1, 2]}, indent=False)) == {"a": [1, 2]}
+
+    def test_unicode_preserved(self, tmp_path):
+        path = tmp_path / "unicode.json"
+
+        dump_json({"text": "café 日本語"}, path)
+
+        assert load_json(path) == {"text": "café 日本語"}
+
+    def test_loads_text_and_bytes(self):
+        assert loads_json('{"a": [1, 2]}') == {"a": [1, 2]}
+        assert loads_json('{"text": "café"}'.encode('utf-8')) == {"text": "café"}
+
+    def test_dumps_default_handles_unserializable(self):
+        class Opaque:
+            def __str__(self):
+                return "opaque"
+
+        assert json.loads(dumps_json({"a": Opaque()}, default=str)) == {"a": "opaque"}
@@ -0,0 +1,177 @@
+"""
+Test Suite for DocuMind CAG Pipeline Module
+
+Tests cover:
+- Context caching keyed on corpus version
+- Streaming answers
+
+Run with: pytest tests/rag/test_cag_pipeline.py -v
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from documind.rag import cag_pipeline
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+
+CONTEXT = (
+    "[Document: Handbook]\nPTO accrues monthly.\n---\n"
+    "[Document: Policy]\nRemote work is allowed."
+)
+
+
+@pytest.fixture
+def mock_supabase():
+    """Supabase client answering the version probe and the cag_context RPC."""
+    cag_pipeline._CONTEXT_CACHE.clear()
+    state = {"count": 2, "fetches": 0}
+
+    def table(name):
+        query = MagicMock()
+        for method in ("select", "order", "limit"):
+            getattr(query, method).return_value = query
+        query.execute.side_effect = lambda: Mock(
+            data=[{"created_at": "2026-10-15T09:00:00"}], count=state["count"]
+        )
+        return query
+
+    def rpc(name, params):
+        assert name == "cag_context"
+        state["fetches"] += 1
+        state["max_docs"] = params["max_docs"]
+        return Mock(execute=Mock(return_value=Mock(data=CONTEXT)))
+
+    client = Mock()
+    client.from_.side_effect = table
+    client.rpc.side_effect = rpc
+    with patch.object(cag_pipeline, "_get_supabase_client", return_value=client):
+        yield state
+    cag_pipeline._CONTEXT_CACHE.clear()
+
+
+# =============================================================================
+# CONTEXT CACHE
+# =============================================================================
+
+
+class TestLoadAllDocumentsCache:
+    """Tests for load_all_documents caching."""
+
+    def test_returns_rpc_context(self, mock_supabase):
+        context = cag_pipeline.load_all_documents(max_docs=7)
+
+        assert context == CONTEXT
+        assert mock_supabase["max_docs"] == 7
+
+    def test_falls_back_to_select_without_rpc(self):
+        """Test databases without migration 007 still get the formatted context."""
+        cag_pipeline._CONTEXT_CACHE.clear()
+        rows = [
+            {"chunk_text": "PTO accrues monthly.", "documents": {"title": "Handbook"}},
+            {"chunk_text": "Remote work is allowed.", "documents": {"title": "Policy"}},
+        ]
+        query = MagicMock()
+        for method in ("select", "order", "limit"):
+            getattr(query, method).return_value = query
+        query.execute.return_value = Mock(data=rows, count=2)
+        client = Mock()
+        client.from_.return_value = query
+        client.rpc.return_value.execute.side_effect = Exception("function cag_context does not exist")
+
+        with patch.object(cag_pipeline, "_get_supabase_client", return_value=client):
+            context = cag_pipeline.load_all_documents(max_docs=7)
+        cag_pipeline._CONTEXT_CACHE.clear()
+
+        assert context == CONTEXT
+        query.limit.assert_called_with(7)
+
+    def test_unchanged_corpus_fetches_once(self, mock_supabase):
+        first = cag_pipeline.load_all_documents()
+        second = cag_pipeline.load_all_documents()
+
+        assert first == second
+        assert mock_supabase["fetches"] == 1
+
+    def test_version_change_refetches(self, mock_supabase):
+        cag_pipeline.load_all_documents()
+        mock_supabase["count"] = 3
+        cag_pipeline.load_all_documents()
+
+        assert mock_supabase["fetches"] == 2
+
+    def test_cached_per_max_docs(self, mock_supabase):
+        cag_pipeline.load_all_documents(max_docs=5)
+        cag_pipeline.load_all_documents(max_docs=10)
+
+        assert mock_supabase["fetches"] == 2
+
+    def test_concurrent_misses_fetch_once(self, mock_supabase):
+        fetch = cag_pipeline._fetch_context
+
+        def slow_fetch(max_docs):
+            time.sleep(0.05)
+            return fetch(max_docs)
+
+        with patch.object(cag_pipeline, "_fetch_context", side_effect=slow_fetch):
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                contexts = list(pool.map(lambda _: cag_pipeline.load_all_documents(), range(4)))
+
+        assert contexts == [CONTEXT] * 4
+        assert mock_supabase["fetches"] == 1
+
+
+# =============================================================================
+# STREAMING
+# =============================================================================
+
+
+def _stream_chunks(*texts):
+    """Build fake streaming completion chunks."""
+    return [Mock(choices=[Mock(delta=Mock(content=text))]) for text in texts]
+
+
+class TestGenerateAnswerCagStream:
+    """Tests for generate_answer_cag_stream."""
+
+    def test_yields_deltas_and_reports_result(self, mock_supabase):
+        completed = {}
+        client = Mock()
+        with patch.object(cag_pipeline, "_get_openrouter_client", return_value=client):
+            client.chat.completions.create.return_value = _stream_chunks("Twenty", None, " days")
+            tokens = list(cag_pipeline.generate_answer_cag_stream(
+                "How much PTO?", on_complete=completed.update
+            ))
+
+        assert tokens == ["Twenty", " days"]
+        assert client.chat.completions.create.call_args.kwargs["stream"] is True
+        assert completed["answer"] == "Twenty days"
+        assert completed["method"] == "CAG"
+        assert completed["context_size"] > 0
+
+    def test_empty_query_rejected(self):
+        with pytest.raises(ValueError):
+            list(cag_pipeline.generate_answer_cag_stream("  "))
+
+
+class TestLazyClients:
+    """Tests for deferred client creation."""
+
+    def test_missing_key_raises_on_use(self):
+        cag_pipeline._get_openrouter_client.cache_clear()
+        with patch.object(cag_pipeline, "OPENROUTER_API_KEY", None):
+            with pytest.raises(ValueError):
+                cag_pipeline._get_openrouter_client()
+        cag_pipeline._get_openrouter_client.cache_clear()
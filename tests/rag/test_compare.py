@@ -0,0 +1,242 @@
+"""
+Tests for the RAG vs CAG comparison tool.
+
+Run with: pytest tests/rag/test_compare.py -v
+"""
+
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from documind.rag import compare
+
+
+def slow_answer(delay, result):
+    def answer(query, **kwargs):
+        time.sleep(delay)
+        return result
+    return answer
+
+
+class TestCompareApproaches:
+    """Tests for compare_approaches()."""
+
+    def test_runs_pipelines_concurrently(self, capsys):
+        rag = slow_answer(0.3, {"answer": "rag", "sources": [], "context_chunks": 2})
+        cag = slow_answer(0.3, {"answer": "cag", "context_size": 100})
+
+        with patch.object(compare, "rag_answer", rag), \
+                patch.object(compare, "cag_answer", cag):
+            start = time.perf_counter()
+            results = compare.compare_approaches("What is the vacation policy?")
+            elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.55
+        assert results["rag"]["answer"] == "rag"
+        assert results["rag"]["context_chunks"] == 2
+        assert results["cag"]["context_size"] == 100
+        assert results["rag"]["latency"] == pytest.approx(0.3, abs=0.1)
+        assert results["cag"]["latency"] == pytest.approx(0.3, abs=0.1)
+
+    def test_failure_is_isolated(self, capsys):
+        def broken(query, **kwargs):
+            raise RuntimeError("boom")
+
+        cag = slow_answer(0, {"answer": "cag", "context_size": 10})
+
+        with patch.object(compare, "rag_answer", broken), \
+                patch.object(compare, "cag_answer", cag):
+            results = compare.compare_approaches("q")
+
+        assert results["rag"] == {
+            "answer": "Error: boom",
+            "latency": results["rag"]["latency"],
+            "sources": [],
+            "context_chunks": 0,
+            "success": False
+        }
+        assert results["cag"]["success"] is True
+        assert "RAG failed" in capsys.readouterr().out
+
+
+class TestSemanticResultCache:
+    """Tests for reusing results across similar queries (DOCUMIND_SEMCACHE=1)."""
+
+    @pytest.fixture
+    def cache_enabled(self, monkeypatch):
+        monkeypatch.setattr(compare, "SEMANTIC_CACHE_ENABLED", True)
+        monkeypatch.setattr(compare, "_RESULT_CACHE", compare.SemanticCache(use_hnsw=False))
+        embeddings = {
+            "vacation policy?": [1.0, 0.0, 0.0],
+            "what is the vacation policy": [0.98, 0.05, 0.0],
+            "remote work?": [0.0, 1.0, 0.0],
+        }
+
+        async def embed(query):
+            return embeddings[query]
+
+        monkeypatch.setattr(compare, "get_query_embedding_async", embed)
+
+    def test_similar_query_skips_pipelines(self, cache_enabled, capsys):
+        calls = []
+
+        def rag(query, **kwargs):
+            calls.append(("rag", query))
+            assert kwargs["query_embedding"] is not None
+            return {"answer": "20 days", "sources": [], "context_chunks": 1}
+
+        def cag(query, **kwargs):
+            calls.append(("cag", query))
+            return {"answer": "20 days", "context_size": 50}
+
+        with patch.object(compare, "rag_answer", rag), \
+                patch.object(compare, "cag_answer", cag):
+            first = compare.compare_approaches("vacation policy?")
+            second = compare.compare_approaches("what is the vacation policy")
+            third = compare.compare_approaches("remote work?")
+
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["rag"] == first["rag"]
+        assert third["cached"] is False
+        assert len(calls) == 4
+
+    def test_failures_are_not_cached(self, cache_enabled, capsys):
+        def broken(query, **kwargs):
+            raise RuntimeError("boom")
+
+        cag = slow_answer(0, {"answer": "cag", "context_size": 10})
+
+        with patch.object(compare, "rag_answer", broken), \
+                patch.object(compare, "cag_answer", cag):
+            compare.compare_approaches("vacation policy?")
+            again = compare.compare_approaches("vacation policy?")
+
+        assert again["cached"] is False
+
+
+class TestCompareApproachesBatch:
+    """Tests for compare_approaches_batch()."""
+
+    def test_embeds_once_and_runs_concurrently(self, capsys):
+        rag = slow_answer(0.3, {"answer": "rag", "sources": [], "context_chunks": 1})
+        cag = slow_answer(0.3, {"answer": "cag", "context_size": 10})
+        queries = ["q1", "q2", "q3"]
+
+        with patch.object(compare, "rag_answer", rag), \
+                patch.object(compare, "cag_answer", cag), \
+                patch.object(compare, "get_query_embeddings") as embed:
+            start = time.perf_counter()
+            results = compare.compare_approaches_batch(queries)
+            elapsed = time.perf_counter() - start
+
+        embed.assert_called_once_with(queries)
+        assert [r["query"] for r in results] == queries
+        assert all(r["comparison"]["faster_method"] in ("RAG", "CAG") for r in results)
+        assert elapsed < 0.8
+        assert capsys.readouterr().out == ""
+
+    def test_concurrency_is_capped(self, capsys):
+        active = []
+        peak = []
+
+        def rag(query, **kwargs):
+            active.append(query)
+            peak.append(len(active))
+            time.sleep(0.05)
+            active.remove(query)
+            return {"answer": "rag", "sources": [], "context_chunks": 1}
+
+        cag = slow_answer(0, {"answer": "cag", "context_size": 10})
+
+        with patch.object(compare, "rag_answer", rag), \
+                patch.object(compare, "cag_answer", cag), \
+                patch.object(compare, "get_query_embeddings"):
+            compare.compare_approaches_batch([f"q{i}" for i in range(6)], max_concurrency=2)
+
+        assert max(peak) <= 2
+
+
+class TestPrintComparison:
+    """Tests for rendering a comparison report."""
+
+    def test_single_write(self, capsys):
+        results = {
+            "query": "q",
+            "rag": {"answer": "Fifteen days.", "latency": 1.0, "success": True,
+                    "sources": [{"document": "hr.md", "chunk": 0, "similarity": 0.82}],
+                    "context_chunks": 1},
+            "cag": {"answer": "Fifteen days.", "latency": 2.0, "success": True,
+                    "context_size": 1234},
+        }
+
+        with patch.object(sys.stdout, "write", wraps=sys.stdout.write) as write:
+            compare.print_comparison(results)
+
+        write.assert_called_once()
+        out = capsys.readouterr().out
+        assert out == compare.format_comparison(results)
+        assert "hr.md (chunk 0, sim: 0.820)" in out
+        assert "Context: 1,234 characters loaded" in out
+        assert "RAG (by 1.00s)" in out
+
+    def test_quiet_mode_skips_rendering(self, capsys):
+        rag = slow_answer(0, {"answer": "rag", "sources": [], "context_chunks": 1})
+        cag = slow_answer(0, {"answer": "cag", "context_size": 10})
+
+        with patch.object(compare, "rag_answer", rag), \
+                patch.object(compare, "cag_answer", cag), \
+                patch.object(compare, "_wrap_text") as wrap:
+            results = compare.compare_approaches("q", verbose=False)
+
+        wrap.assert_not_called()
+        assert capsys.readouterr().out == ""
+        assert results["comparison"]["cag_context_chars"] == 10
+
+
+class TestReuseRagContext:
+    """Tests for fair_comparison=False (CAG answers from RAG's context)."""
+
+    def test_cag_receives_rag_context(self, capsys):
+        rag_calls = []
+        cag_calls = []
+
+        def rag(query, **kwargs):
+            rag_calls.append(kwargs)
+            return {"answer": "rag", "sources": [], "context_chunks": 2,
+                    "context": "[Source 1: hr.md]\nFifteen days."}
+
+        def cag(query, **kwargs):
+            cag_calls.append(kwargs)
+            return {"answer": "cag", "context_size": len(kwargs["context_override"] or "")}
+
+        with patch.object(compare, "rag_answer", rag), \
+                patch.object(compare, "cag_answer", cag):
+            results = compare.compare_approaches("q", verbose=False, fair_comparison=False)
+
+        assert rag_calls == [{"include_context": True}]
+        assert cag_calls == [{"context_override": "[Source 1: hr.md]\nFifteen days."}]
+        assert results["cag"]["context_size"] == 31
+        assert "context" not in results["rag"]
+
+    def test_rag_failure_falls_back_to_full_context(self, capsys):
+        def broken(query, **kwargs):
+            raise RuntimeError("boom")
+
+        cag_calls = []
+
+        def cag(query, **kwargs):
+            cag_calls.append(kwargs)
+            return {"answer": "cag", "context_size": 1000}
+
+        with patch.object(compare, "rag_answer", broken), \
+                patch.object(compare, "cag_answer", cag):
+            results = compare.compare_approaches("q", verbose=False, fair_comparison=False)
+
+        assert cag_calls == [{"context_override": None}]
+        assert results["cag"]["success"] is True
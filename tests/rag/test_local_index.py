@@ -0,0 +1,158 @@
+"""
+Test Suite for DocuMind Local Vector Index
+
+Tests cover:
+- Exact and HNSW nearest-neighbour search
+- Loading chunks from Supabase
+
+Run with: pytest tests/rag/test_local_index.py -v
+"""
+
+import json
+
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+
+# Import the module under test
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from documind.rag import local_index, search
+from documind.rag.local_index import LocalVectorIndex
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+
+@pytest.fixture
+def corpus():
+    """Random chunk embeddings with payloads."""
+    rng = np.random.default_rng(7)
+    embeddings = rng.normal(size=(200, 32)).astype(np.float32)
+    chunks = [
+        {"id": f"chunk-{i}", "content": f"content {i}", "metadata": {"chunk_index": i}}
+        for i in range(len(embeddings))
+    ]
+    return chunks, embeddings
+
+
+def _brute_force(embeddings, query, k):
+    normed = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    scores = normed @ (query / np.linalg.norm(query))
+    return [f"chunk-{i}" for i in np.argsort(-scores)[:k]]
+
+
+# =============================================================================
+# TEST: SEARCH
+# =============================================================================
+
+
+class TestLocalVectorIndex:
+    """Tests for LocalVectorIndex search."""
+
+    def test_exact_search_matches_brute_force(self, corpus):
+        """Test the scan returns the true top-k with cosine similarities."""
+        chunks, embeddings = corpus
+        index = LocalVectorIndex(chunks, embeddings)
+        query = embeddings[3] + 0.1
+
+        results = index.search(query, top_k=5, similarity_threshold=-1.0)
+
+        assert [r["id"] for r in results] == _brute_force(embeddings, query, 5)
+        assert results[0]["content"] == "content 3"
+        assert results[0]["similarity"] == pytest.approx(
+            float(np.dot(embeddings[3], query) / np.linalg.norm(embeddings[3]) / np.linalg.norm(query)),
+            abs=1e-5,
+        )
+        assert all(a["similarity"] >= b["similarity"] for a, b in zip(results, results[1:]))
+
+    def test_threshold_filters_weak_matches(self, corpus):
+        """Test chunks at or below similarity_threshold are dropped."""
+        chunks, embeddings = corpus
+        index = LocalVectorIndex(chunks, embeddings)
+
+        results = index.search(embeddings[0], top_k=10, similarity_threshold=0.99)
+
+        assert [r["id"] for r in results] == ["chunk-0"]
+
+    def test_int8_scan_ranks_like_float32(self, corpus):
+        """Test the quantized scan keeps the ranking and stores int8 rows."""
+        chunks, embeddings = corpus
+        exact = LocalVectorIndex(chunks, embeddings)
+        quantized = LocalVectorIndex(chunks, embeddings, quantize=True)
+        query = embeddings[10] + 0.05
+
+        expected = exact.search(query, top_k=3, similarity_threshold=-1.0)
+        results = quantized.search(query, top_k=3, similarity_threshold=-1.0)
+
+        assert quantized._codes.dtype == np.int8
+        assert quantized._vectors is None
+        assert [r["id"] for r in results] == [r["id"] for r in expected]
+        for got, want in zip(results, expected):
+            assert got["similarity"] == pytest.approx(want["similarity"], abs=1e-2)
+
+    def test_hnsw_search_finds_nearest(self, corpus):
+        """Test the HNSW path agrees with the exact scan on the nearest chunk."""
+        pytest.importorskip("hnswlib")
+        chunks, embeddings = corpus
+
+        with patch.object(local_index, "ANN_MIN_CHUNKS", 10):
+            index = LocalVectorIndex(chunks, embeddings)
+
+        assert index._index is not None
+        for row in (0, 42, 199):
+            assert index.search(embeddings[row], top_k=1)[0]["id"] == f"chunk-{row}"
+
+
+# =============================================================================
+# TEST: LOADING
+# =============================================================================
+
+
+class TestFromSupabase:
+    """Tests for building the index from document_chunks."""
+
+    def test_loads_all_pages_and_parses_vectors(self):
+        """Test pgvector text embeddings are parsed across paged requests."""
+        rows = [
+            {"id": f"c{i}", "content": f"text {i}", "metadata": {}, "embedding": json.dumps([1.0, float(i)])}
+            for i in range(3)
+        ]
+        client = Mock()
+        ranged = (
+            client.table.return_value.select.return_value.not_.is_.return_value
+            .order.return_value.range
+        )
+        ranged.side_effect = lambda start, end: Mock(
+            execute=Mock(return_value=Mock(data=rows[start:end + 1]))
+        )
+
+        index = LocalVectorIndex.from_supabase(client, page_size=2)
+
+        assert len(index) == 3
+        assert ranged.call_count == 2
+        assert "embedding" not in index.chunks[0]
+        assert index.search([1.0, 2.0], top_k=1)[0]["id"] == "c2"
+
+    def test_search_documents_uses_local_index(self):
+        """Test unfiltered searches skip the RPC when the local index is on."""
+        index = LocalVectorIndex(
+            [{"id": "c1", "content": "PTO rules", "metadata": {"document_name": "hr.md"}}],
+            [[1.0, 0.0]],
+        )
+        supabase = Mock()
+        supabase.rpc.return_value.execute.return_value = Mock(data=[])
+
+        with patch.object(search, "_get_local_index", return_value=index), \
+                patch.object(search, "_get_supabase_client", return_value=supabase):
+            results = search.search_documents("pto", query_embedding=[1.0, 0.1])
+            search.search_documents("pto", file_types=["pdf"], query_embedding=[1.0, 0.1])
+
+        assert results[0]["document_name"] == "hr.md"
+        assert supabase.rpc.call_count == 1
@@ -12,9 +12,10 @@ Run with: pytest tests/rag/test_production_qa.py -v
 """
 
 import pytest
+import asyncio
 import time
 from datetime import datetime, timezone, timedelta
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from typing import Dict, Any, List
 
 # Import the module under test
@@ -24,7 +25,7 @@ from pathlib import Path
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
 
-from documind.rag.production_qa import ProductionQA
+from documind.rag.production_qa import ProductionQA, QueryLogWriter, _stream_answer
 
 
 # =============================================================================
@@ -163,6 +164,17 @@ class TestEnhancedSearch:
         scores = [r["final_score"] for r in results]
         assert scores == sorted(scores, reverse=True)
 
+    def test_rerank_top_k_matches_full_sort(self, qa_system, sample_documents):
+        """Test partial re-ranking returns the head of the full ranking."""
+        full = qa_system._rerank_results(
+            [dict(d) for d in sample_documents], "vacation policy"
+        )
+        head = qa_system._rerank_results(
+            [dict(d) for d in sample_documents], "vacation policy", top_k=2
+        )
+
+        assert [d["id"] for d in head] == [d["id"] for d in full[:2]]
+
     @patch("documind.rag.production_qa.search_documents")
     def test_enhanced_search_citation_enrichment(
         self, mock_search, qa_system, sample_documents
@@ -326,6 +338,217 @@ class TestQuery:
         )
         assert result2["complexity"] == "complex"
 
+    @patch("documind.rag.production_qa._get_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_context_cache_skips_repeat_retrieval(
+        self, mock_search, mock_client, sample_documents, mock_llm_response
+    ):
+        """Test that exact repeats reuse context and the LRU evicts the oldest."""
+        mock_search.return_value = sample_documents
+        mock_client.return_value.chat.completions.create.return_value = mock_llm_response
+        qa = ProductionQA(enable_logging=False, context_cache_size=2)
+
+        first = qa.query("What is the vacation policy?")
+        qa.compare_models("What is the vacation policy?", models=["openai/gpt-4o-mini"])
+        second = qa.query("What is the vacation policy?")
+        assert mock_search.call_count == 1
+        assert second["sources"] == first["sources"]
+
+        qa.query("What is the vacation policy?", top_k=3)
+        qa.query("What is the sick leave policy?")
+        qa.query("What is the vacation policy?")
+        assert mock_search.call_count == 4
+
+
+class TestAsyncQuery:
+    """Tests for the async query variant."""
+
+    @patch("documind.rag.production_qa._get_async_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_aquery_matches_query_shape(
+        self, mock_search, mock_client, qa_system, sample_documents, mock_llm_response
+    ):
+        """Test aquery returns the same fields as query."""
+        mock_search.return_value = sample_documents
+        mock_client.return_value.chat.completions.create = AsyncMock(
+            return_value=mock_llm_response
+        )
+
+        result = asyncio.run(qa_system.aquery("What is the vacation policy?"))
+
+        assert "[Source" in result["answer"]
+        assert result["fallback_used"] is False
+        assert result["model"] == qa_system.default_model
+        assert len(result["sources"]) > 0
+
+    @patch("documind.rag.production_qa._get_async_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_aquery_fallback(
+        self, mock_search, mock_client, qa_system, sample_documents, mock_llm_response
+    ):
+        """Test aquery falls back to the next model on failure."""
+        mock_search.return_value = sample_documents
+        mock_client.return_value.chat.completions.create = AsyncMock(
+            side_effect=[Exception("Primary model failed"), mock_llm_response]
+        )
+
+        result = asyncio.run(qa_system.aquery("What is the vacation policy?"))
+
+        assert result["fallback_used"] is True
+        assert result["model"] == qa_system.fallback_models[0]
+
+    @patch("documind.rag.production_qa._get_async_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_aquery_without_fallback_fails(
+        self, mock_search, mock_client, qa_system, sample_documents
+    ):
+        """Test aquery raises when the only model fails."""
+        mock_search.return_value = sample_documents
+        mock_client.return_value.chat.completions.create = AsyncMock(
+            side_effect=Exception("Model failed")
+        )
+
+        with pytest.raises(Exception, match="failed"):
+            asyncio.run(
+                qa_system.aquery("What is the vacation policy?", enable_fallback=False)
+            )
+
+    @patch("documind.rag.production_qa._get_async_openrouter_client")
+    @patch("documind.rag.search.search_documents_batch")
+    def test_aquery_batch_retrieval_shares_one_search(
+        self, mock_batch, mock_client, sample_documents, mock_llm_response
+    ):
+        """Test concurrent aquery calls are served by one batched search."""
+        mock_batch.side_effect = lambda queries, **kwargs: [
+            [dict(d) for d in sample_documents] for _ in queries
+        ]
+        mock_client.return_value.chat.completions.create = AsyncMock(
+            return_value=mock_llm_response
+        )
+        qa = ProductionQA(enable_logging=False, batch_retrieval=True)
+
+        async def run():
+            return await asyncio.gather(
+                qa.aquery("What is the vacation policy?"),
+                qa.aquery("How do I request time off?"),
+            )
+
+        results = asyncio.run(run())
+
+        mock_batch.assert_called_once()
+        assert all(len(r["sources"]) > 0 for r in results)
+
+
+def _stream_chunks(*deltas):
+    """Build fake streaming completion chunks for the given text deltas."""
+    chunks = []
+    for delta in deltas:
+        chunk = Mock()
+        chunk.choices = [Mock()]
+        chunk.choices[0].delta.content = delta
+        chunks.append(chunk)
+    return iter(chunks)
+
+
+class TestStreamQuery:
+    """Tests for the streaming query variant."""
+
+    @patch("documind.rag.production_qa._get_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_stream_query_yields_deltas(
+        self, mock_search, mock_client, qa_system, sample_documents
+    ):
+        """Test stream_query yields text and stores the full result."""
+        mock_search.return_value = sample_documents
+        mock_client.return_value.chat.completions.create.return_value = _stream_chunks(
+            "Employees get ", None, "15 days [Source 1]."
+        )
+
+        deltas = list(qa_system.stream_query("What is the vacation policy?"))
+
+        assert deltas == ["Employees get ", "15 days [Source 1]."]
+        result = qa_system.last_result
+        assert result["answer"] == "Employees get 15 days [Source 1]."
+        assert result["fallback_used"] is False
+        assert result["timing"]["first_token"] > 0
+        assert len(result["sources"]) > 0
+        assert mock_client.return_value.chat.completions.create.call_args.kwargs["stream"] is True
+
+    @patch("documind.rag.production_qa._get_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_stream_query_fallback_before_first_token(
+        self, mock_search, mock_client, qa_system, sample_documents
+    ):
+        """Test stream_query falls back if the primary model fails up front."""
+        mock_search.return_value = sample_documents
+        mock_client.return_value.chat.completions.create.side_effect = [
+            Exception("Primary model failed"),
+            _stream_chunks("Answer [Source 1]."),
+        ]
+
+        answer = "".join(qa_system.stream_query("What is the vacation policy?"))
+
+        assert answer == "Answer [Source 1]."
+        assert qa_system.last_result["fallback_used"] is True
+        assert qa_system.last_result["model"] == qa_system.fallback_models[0]
+
+    @patch("documind.rag.production_qa._get_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_stream_query_mid_stream_failure_raises(
+        self, mock_search, mock_client, qa_system, sample_documents
+    ):
+        """Test a failure after output has started is not retried."""
+        def failing_stream():
+            yield from _stream_chunks("Partial")
+            raise Exception("Connection dropped")
+
+        mock_search.return_value = sample_documents
+        mock_client.return_value.chat.completions.create.return_value = failing_stream()
+
+        with pytest.raises(Exception, match="Connection dropped"):
+            list(qa_system.stream_query("What is the vacation policy?"))
+        assert mock_client.return_value.chat.completions.create.call_count == 1
+        assert qa_system.last_result is None
+
+    @patch("documind.rag.production_qa._get_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_stream_query_on_complete_callback(
+        self, mock_search, mock_client, qa_system, sample_documents
+    ):
+        """Test on_complete receives the full result."""
+        mock_search.return_value = sample_documents
+        mock_client.return_value.chat.completions.create.return_value = _stream_chunks(
+            "Answer [Source 1]."
+        )
+        completed = {}
+
+        list(qa_system.stream_query("What is the vacation policy?", on_complete=completed.update))
+
+        assert completed["answer"] == "Answer [Source 1]."
+        assert completed["query"] == "What is the vacation policy?"
+
+    def test_stream_query_empty_question_raises_error(self, qa_system):
+        """Test empty questions are rejected."""
+        with pytest.raises(ValueError):
+            list(qa_system.stream_query(""))
+
+    @patch("documind.rag.production_qa._get_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_cli_prints_deltas_as_they_arrive(
+        self, mock_search, mock_client, qa_system, sample_documents, capsys
+    ):
+        """Test the CLI streams the indented answer and returns the result."""
+        mock_search.return_value = sample_documents
+        mock_client.return_value.chat.completions.create.return_value = _stream_chunks(
+            "Line one\n", "line two [Source 1]."
+        )
+
+        result = _stream_answer(qa_system, "What is the vacation policy?")
+
+        out = capsys.readouterr().out
+        assert "    Line one\n    line two [Source 1]." in out
+        assert result["answer"] == "Line one\nline two [Source 1]."
+
 
 # =============================================================================
 # TEST: MODEL COMPARISON
@@ -418,6 +641,192 @@ class TestModelComparison:
         assert "answer" in result["results"]["model2"]
 
 
+    @patch("documind.rag.production_qa._get_async_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_acompare_models_runs_concurrently(
+        self, mock_search, mock_client, qa_system, sample_documents, mock_llm_response
+    ):
+        """Test acompare_models awaits all models together."""
+        mock_search.return_value = sample_documents
+
+        async def slow_create(**kwargs):
+            if kwargs["model"] == "model1":
+                raise Exception("Model unavailable")
+            await asyncio.sleep(0.2)
+            return mock_llm_response
+
+        mock_client.return_value.chat.completions.create = slow_create
+
+        start = time.perf_counter()
+        result = asyncio.run(qa_system.acompare_models(
+            "What is the vacation policy?",
+            models=["model1", "model2", "model3"],
+        ))
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.4
+        assert result["models_compared"] == ["model1", "model2", "model3"]
+        assert "error" in result["results"]["model1"]
+        assert "answer" in result["results"]["model2"]
+        assert "answer" in result["results"]["model3"]
+        assert "fastest_model" in result["analysis"]
+
+    @patch("documind.rag.qa_pipeline.LLM_MAX_CONCURRENCY", 2)
+    @patch("documind.rag.production_qa._get_async_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_acompare_models_bounds_concurrency(
+        self, mock_search, mock_client, qa_system, sample_documents, mock_llm_response
+    ):
+        """Test no more than LLM_MAX_CONCURRENCY completions are in flight."""
+        mock_search.return_value = sample_documents
+        in_flight = peak = 0
+
+        async def tracked_create(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return mock_llm_response
+
+        mock_client.return_value.chat.completions.create = tracked_create
+
+        result = asyncio.run(qa_system.acompare_models(
+            "What is the vacation policy?",
+            models=["model1", "model2", "model3", "model4", "model5"],
+        ))
+
+        assert peak == 2
+        assert all("answer" in r for r in result["results"].values())
+
+
+# =============================================================================
+# TEST: SEMANTIC CACHE
+# =============================================================================
+
+
+class TestSemanticCache:
+    """Tests for answering near-duplicate questions from the semantic cache."""
+
+    EMBEDDINGS = {
+        "What is the vacation policy?": [1.0, 0.0, 0.0],
+        "what's the vacation policy": [0.99, 0.05, 0.0],
+        "How do I submit expenses?": [0.0, 1.0, 0.0],
+    }
+
+    @pytest.fixture
+    def cached_qa(self):
+        with patch(
+            "documind.rag.production_qa.get_query_embedding",
+            side_effect=lambda q: self.EMBEDDINGS[q],
+        ):
+            yield ProductionQA(enable_logging=False, enable_semantic_cache=True)
+
+    @patch("documind.rag.production_qa._get_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_similar_question_hits_cache(
+        self, mock_search, mock_client, cached_qa, sample_documents, mock_llm_response
+    ):
+        """Test a rephrased question skips retrieval and generation."""
+        mock_search.return_value = sample_documents
+        create = mock_client.return_value.chat.completions.create
+        create.return_value = mock_llm_response
+
+        first = cached_qa.query("What is the vacation policy?")
+        second = cached_qa.query("what's the vacation policy")
+
+        assert create.call_count == 1
+        assert mock_search.call_count == 1
+        assert "cache_hit" not in first
+        assert second["cache_hit"] is True
+        assert second["answer"] == first["answer"]
+        assert second["sources"] == first["sources"]
+        assert second["query"] == "what's the vacation policy"
+        assert second["timestamp"] >= first["timestamp"]
+        assert second["timestamp"] != first["timestamp"]
+
+    @patch("documind.rag.production_qa._get_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_different_question_or_model_misses(
+        self, mock_search, mock_client, cached_qa, sample_documents, mock_llm_response
+    ):
+        """Test unrelated questions and other models are not served from cache."""
+        mock_search.return_value = sample_documents
+        create = mock_client.return_value.chat.completions.create
+        create.return_value = mock_llm_response
+
+        cached_qa.query("What is the vacation policy?")
+        cached_qa.query("How do I submit expenses?")
+        result = cached_qa.query("What is the vacation policy?", model="openai/gpt-4o")
+
+        assert create.call_count == 3
+        assert "cache_hit" not in result
+
+    @patch("documind.rag.production_qa._get_async_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_aquery_shares_cache(
+        self, mock_search, mock_client, cached_qa, sample_documents, mock_llm_response
+    ):
+        """Test aquery stores and reuses cached answers too."""
+        mock_search.return_value = sample_documents
+        mock_client.return_value.chat.completions.create = AsyncMock(
+            return_value=mock_llm_response
+        )
+
+        asyncio.run(cached_qa.aquery("What is the vacation policy?"))
+        result = asyncio.run(cached_qa.aquery("what's the vacation policy"))
+
+        assert mock_client.return_value.chat.completions.create.await_count == 1
+        assert result["cache_hit"] is True
+
+    @patch("documind.rag.production_qa._get_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_each_option_set_gets_its_own_entry(
+        self, mock_search, mock_client, cached_qa, sample_documents, mock_llm_response
+    ):
+        """Test a question cached with one top_k still hits for another."""
+        mock_search.return_value = sample_documents
+        create = mock_client.return_value.chat.completions.create
+        create.return_value = mock_llm_response
+
+        cached_qa.query("What is the vacation policy?", top_k=5)
+        cached_qa.query("What is the vacation policy?", top_k=3)
+        first = cached_qa.query("what's the vacation policy", top_k=5)
+        second = cached_qa.query("what's the vacation policy", top_k=3)
+
+        assert create.call_count == 2
+        assert first["cache_hit"] is True
+        assert second["cache_hit"] is True
+        assert [len(cache) for cache in cached_qa.semantic_caches.values()] == [1, 1]
+
+    @patch("documind.rag.production_qa._get_openrouter_client")
+    @patch("documind.rag.production_qa.search_documents")
+    def test_cache_hits_are_logged(
+        self, mock_search, mock_client, sample_documents, mock_llm_response
+    ):
+        """Test answers served from the cache still reach query_logs."""
+        mock_search.return_value = sample_documents
+        mock_client.return_value.chat.completions.create.return_value = mock_llm_response
+        with patch(
+            "documind.rag.production_qa.get_query_embedding",
+            side_effect=lambda q: self.EMBEDDINGS[q],
+        ):
+            qa = ProductionQA(enable_logging=True, enable_semantic_cache=True)
+            with patch.object(qa, "queue_log") as queue_log:
+                qa.query("What is the vacation policy?")
+                qa.query("what's the vacation policy")
+
+        logged = [c.args[0] for c in queue_log.call_args_list]
+        assert len(logged) == 2
+        assert logged[1]["cache_hit"] is True
+        assert qa._build_log_entry(logged[1])["cache_hit"] is True
+        assert qa._build_log_entry(logged[0])["cache_hit"] is False
+
+    def test_disabled_by_default(self, qa_system):
+        """Test the cache is opt-in."""
+        assert qa_system.semantic_caches is None
+
+
 # =============================================================================
 # TEST: QUERY LOGGING
 # =============================================================================
@@ -475,6 +884,24 @@ class TestQueryLogging:
         result = qa_system_with_logging.log_query(query_data)
         assert result is None
 
+    @patch("documind.rag.production_qa._get_supabase_client")
+    def test_queue_log_batches_inserts(self, mock_supabase):
+        """Test queued logs are written together in one multi-row insert."""
+        writer = QueryLogWriter(max_batch=10, max_wait=0.5)
+        qa = ProductionQA(enable_logging=True)
+
+        with patch("documind.rag.production_qa._get_query_log_writer", return_value=writer):
+            for i in range(3):
+                qa.queue_log({"query": f"Question {i}", "answer": "A", "timing": {}})
+            qa.flush_logs()
+
+        insert = mock_supabase.return_value.table.return_value.insert
+        insert.assert_called_once()
+        rows = insert.call_args.args[0]
+        assert [row["question"] for row in rows] == [
+            "Question 0", "Question 1", "Question 2"
+        ]
+
     def test_pii_redaction(self, qa_system):
         """Test PII redaction in queries."""
         qa = ProductionQA(enable_pii_redaction=True, enable_logging=False)
@@ -599,6 +1026,48 @@ class TestAnalytics:
         assert analytics["total_queries"] == 0
         assert "No queries found" in analytics["insights"][0]
 
+    @patch("documind.rag.production_qa._get_supabase_client")
+    def test_get_analytics_uses_aggregate_rpc(self, mock_supabase, qa_system):
+        """Test server-side aggregates are used without fetching rows."""
+        mock_supabase.return_value.rpc.return_value.execute.return_value = Mock(data={
+            "total": 3,
+            "response_times": {"avg": 2.0, "p50": 2.0, "p95": 3.0, "min": 1.0, "max": 3.0},
+            "models": [
+                {"model": "model-a", "count": 2, "avg_latency": 1.5, "fallback_count": 0},
+                {"model": "model-b", "count": 1, "avg_latency": 3.0, "fallback_count": 1},
+            ],
+            "popular_terms": [{"term": "vacation", "count": 2}],
+        })
+
+        analytics = qa_system.get_analytics(limit=50)
+
+        name, params = mock_supabase.return_value.rpc.call_args.args
+        assert name == "get_query_analytics"
+        assert params["max_rows"] == 50
+        mock_supabase.return_value.table.assert_not_called()
+        assert analytics["total_queries"] == 3
+        assert analytics["performance"]["p95_response_time"] == 3.0
+        assert analytics["models"]["model-a"]["usage_percentage"] == 66.7
+        assert analytics["models"]["model-b"]["fallback_rate"] == 100.0
+        assert analytics["popular_queries"] == [{"term": "vacation", "count": 2}]
+
+    def test_aggregate_query_logs_matches_rpc_shape(self, qa_system):
+        """Test the client-side fallback computes the RPC's fields."""
+        stats = qa_system._aggregate_query_logs([
+            {"model": "model-a", "response_time": 1.0, "question": "vacation days"},
+            {"model": "model-a", "response_time": 0, "question": "vacation policy"},
+            {"model": "model-b", "response_time": 3.0, "fallback_used": True, "question": "sick"},
+        ])
+
+        assert stats["total"] == 3
+        assert stats["response_times"] == {
+            "avg": 2.0, "p50": 3.0, "p95": 3.0, "min": 1.0, "max": 3.0
+        }
+        assert stats["models"][0] == {
+            "model": "model-a", "count": 2, "avg_latency": 1.0, "fallback_count": 0
+        }
+        assert stats["popular_terms"][0] == {"term": "vacation", "count": 2}
+
 
 # =============================================================================
 # TEST: HELPER METHODS
@@ -644,6 +1113,18 @@ class TestHelperMethods:
         assert "**vacation**" in highlighted
         assert "**days**" in highlighted
 
+    def test_highlight_reuses_precompiled_patterns(self, qa_system):
+        """Test that precompiled patterns highlight exactly like the query."""
+        content = "Vacation days accrue; unused vacation days carry over."
+        query = "Vacation days to carry"
+
+        patterns = qa_system._highlight_patterns(query)
+
+        assert [p.pattern for p, _ in patterns] == ["vacation", "days", "carry"]
+        assert qa_system._highlight_query_terms(
+            content, query, patterns
+        ) == qa_system._highlight_query_terms(content, query)
+
     def test_generate_document_link(self, qa_system):
         """Test document link generation."""
         doc = {
@@ -706,6 +1187,7 @@ class TestIntegration:
 
         qa = ProductionQA(enable_logging=True)
         result = qa.query("What is vacation?")
+        qa.flush_logs()
 
         assert result["answer"]
         mock_supabase.return_value.table.assert_called_with("query_logs")
@@ -0,0 +1,195 @@
+"""
+Test Suite for DocuMind Q&A Pipeline Module
+
+Tests cover:
+- Token-budgeted context assembly
+- Concurrent model comparison
+- Streaming answers
+
+Run with: pytest tests/rag/test_qa_pipeline.py -v
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+# Import the module under test
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from documind.rag.qa_pipeline import (
+    assemble_context,
+    compare_models,
+    count_tokens,
+    generate_answer,
+    stream_answer,
+)
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+
+@pytest.fixture
+def documents():
+    """Retrieved chunks large enough to overflow a small budget."""
+    return [
+        {
+            "document_name": f"doc_{i}.txt",
+            "chunk_index": i,
+            "content": f"Policy section {i}. " + "Employees accrue leave monthly. " * 40,
+            "similarity": 0.9 - i * 0.1,
+        }
+        for i in range(4)
+    ]
+
+
+# =============================================================================
+# TEST: CONTEXT ASSEMBLY
+# =============================================================================
+
+
+class TestAssembleContext:
+    """Tests for assemble_context token budgeting."""
+
+    def test_small_documents_fit_whole(self, documents):
+        """Test that a generous budget includes every document untruncated."""
+        context = assemble_context(documents, max_tokens=100_000)
+
+        assert context.count("[Source ") == len(documents)
+        assert "[truncated]" not in context
+
+    def test_context_stays_within_token_budget(self, documents):
+        """Test that the last document is truncated to fit max_tokens."""
+        budget = count_tokens(documents[0]["content"]) + 100
+
+        context = assemble_context(documents, max_tokens=budget)
+
+        assert count_tokens(context) <= budget
+        assert "[Source 1:" in context
+        assert "[Source 2:" in context
+        assert context.endswith("... [truncated]")
+
+
+# =============================================================================
+# TEST: MODEL COMPARISON
+# =============================================================================
+
+
+class TestCompareModels:
+    """Tests for the concurrent compare_models fan-out."""
+
+    @patch("documind.rag.qa_pipeline._get_async_openrouter_client")
+    @patch("documind.rag.qa_pipeline.search_documents")
+    def test_models_are_queried_concurrently(self, mock_search, mock_client, documents):
+        """Test that every model is in flight at once and errors stay per model."""
+        mock_search.return_value = documents
+        in_flight = 0
+        peak = 0
+
+        async def create(model, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if model == "broken/model":
+                raise RuntimeError("provider down")
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=f"answer from {model}"))],
+                usage=None,
+            )
+
+        mock_client.return_value.chat.completions.create = AsyncMock(side_effect=create)
+
+        result = compare_models(
+            "What is the leave policy?",
+            models=["openai/gpt-4o-mini", "deepseek/deepseek-chat", "broken/model"],
+        )
+
+        assert peak == 3
+        assert mock_search.call_count == 1
+        assert result["results"]["openai/gpt-4o-mini"]["answer"] == "answer from openai/gpt-4o-mini"
+        assert result["results"]["broken/model"]["error"] == "provider down"
+        assert "latency_ms" in result["results"]["broken/model"]
+        assert len(result["sources"]) == len(documents)
+
+    @patch("documind.rag.qa_pipeline.OPENROUTER_API_KEY", "test-key")
+    @patch("documind.rag.qa_pipeline.AsyncOpenAI")
+    @patch("documind.rag.qa_pipeline.search_documents")
+    def test_repeated_calls_get_a_client_per_event_loop(self, mock_search, mock_async_openai, documents):
+        """Test a second compare_models call does not reuse the first loop's client."""
+        mock_search.return_value = documents
+
+        def make_client(**kwargs):
+            # Like httpx pools, the client only works on the loop that created it
+            owner = asyncio.get_running_loop()
+
+            async def create(model, **kwargs):
+                if asyncio.get_running_loop() is not owner:
+                    raise RuntimeError("Event loop is closed")
+                return SimpleNamespace(
+                    choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+                    usage=None,
+                )
+
+            client = MagicMock()
+            client.chat.completions.create = AsyncMock(side_effect=create)
+            return client
+
+        mock_async_openai.side_effect = make_client
+
+        for _ in range(2):
+            result = compare_models("What is the leave policy?", models=["openai/gpt-4o-mini"])
+            assert result["results"]["openai/gpt-4o-mini"]["answer"] == "ok"
+
+        assert mock_async_openai.call_count == 2
+
+
+# =============================================================================
+# TEST: STREAMING
+# =============================================================================
+
+
+def _chunk(content=None, usage=None):
+    choices = [] if content is None else [SimpleNamespace(delta=SimpleNamespace(content=content))]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class TestStreamAnswer:
+    """Tests for stream_answer."""
+
+    @patch("documind.rag.qa_pipeline._get_openrouter_client")
+    @patch("documind.rag.qa_pipeline.search_documents")
+    def test_yields_deltas_then_reports_full_result(self, mock_search, mock_client, documents):
+        """Test deltas stream in order and on_complete gets generate_answer's shape."""
+        mock_search.return_value = documents
+        usage = SimpleNamespace(prompt_tokens=900, completion_tokens=4, total_tokens=904)
+        mock_client.return_value.chat.completions.create.return_value = iter([
+            _chunk("Employees "), _chunk(""), _chunk("accrue leave [Source 1]."),
+            _chunk(usage=usage),
+        ])
+        completed = []
+
+        deltas = list(stream_answer("How is leave accrued?", on_complete=completed.append))
+
+        assert deltas == ["Employees ", "accrue leave [Source 1]."]
+        assert mock_client.return_value.chat.completions.create.call_args.kwargs["stream"] is True
+        (result,) = completed
+        assert result["answer"] == "".join(deltas)
+        assert result["usage"]["total_tokens"] == 904
+        assert result["model"] == "google/gemini-2.5-flash-lite"
+
+        mock_client.return_value.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=result["answer"]))],
+            usage=usage,
+        )
+        expected = generate_answer("How is leave accrued?")
+        assert set(result) == set(expected)
+        assert result["sources"] == expected["sources"]
@@ -0,0 +1,402 @@
+"""
+Test Suite for DocuMind Semantic Search Module
+
+Tests cover:
+- Query embedding cache
+- RPC selection for quantized search
+- Metadata pre-filters
+- Reciprocal Rank Fusion hybrid search
+- Batched retrieval
+- Embedding backfill
+
+Run with: pytest tests/rag/test_search.py -v
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import Mock, patch
+
+# Import the module under test
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from documind.rag import search
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+
+@pytest.fixture
+def mock_openai():
+    """Mock OpenAI client returning a fixed embedding."""
+    search._embed_query_cached.cache_clear()
+    client = Mock()
+    client.embeddings.create.return_value = Mock(
+        data=[Mock(embedding=[0.1, 0.2, 0.3])]
+    )
+    with patch("documind.rag.search._get_openai_client", return_value=client):
+        yield client
+    search._embed_query_cached.cache_clear()
+
+
+# =============================================================================
+# QUERY EMBEDDING TESTS
+# =============================================================================
+
+
+class TestQueryEmbedding:
+    """Tests for get_query_embedding caching."""
+
+    def test_returns_list(self, mock_openai):
+        """Test embedding is returned as a mutable list."""
+        embedding = search.get_query_embedding("vacation policy")
+
+        assert embedding == [0.1, 0.2, 0.3]
+        assert isinstance(embedding, list)
+
+    def test_repeated_query_uses_cache(self, mock_openai):
+        """Test identical queries only hit the API once."""
+        search.get_query_embedding("vacation policy")
+        search.get_query_embedding("vacation policy")
+
+        assert mock_openai.embeddings.create.call_count == 1
+
+    def test_normalized_queries_share_cache(self, mock_openai):
+        """Test case and whitespace differences map to the same entry."""
+        search.get_query_embedding("PTO   Policy ")
+        search.get_query_embedding("pto policy")
+
+        assert mock_openai.embeddings.create.call_count == 1
+        # The cache key is normalized, the embedded text is not
+        mock_openai.embeddings.create.assert_called_with(
+            model="text-embedding-3-small", input="PTO   Policy "
+        )
+
+    def test_caller_mutation_does_not_leak(self, mock_openai):
+        """Test mutating a returned embedding doesn't corrupt the cache."""
+        first = search.get_query_embedding("vacation policy")
+        first[0] = 99.0
+
+        assert search.get_query_embedding("vacation policy")[0] == 0.1
+
+    def test_batch_is_one_request_and_seeds_cache(self, mock_openai):
+        """Test get_query_embeddings embeds all queries in one call."""
+        mock_openai.embeddings.create.return_value = Mock(
+            data=[Mock(embedding=[1.0]), Mock(embedding=[2.0])]
+        )
+
+        embeddings = search.get_query_embeddings(
+            ["Vacation policy", "remote work", "vacation  policy"]
+        )
+
+        assert embeddings == [[1.0], [2.0], [1.0]]
+        mock_openai.embeddings.create.assert_called_once_with(
+            model="text-embedding-3-small", input=["Vacation policy", "remote work"]
+        )
+        assert search.get_query_embedding("remote work") == [2.0]
+        assert mock_openai.embeddings.create.call_count == 1
+
+
+    def test_disk_cache_survives_process_memo(self, mock_openai, tmp_path):
+        """Test embeddings stored on disk are reused once the LRU is cold."""
+        from documind.cache.embeddings import EmbeddingCache
+
+        disk = EmbeddingCache(tmp_path / "emb.sqlite")
+        with patch.object(search, "_get_embedding_cache", return_value=disk):
+            search.get_query_embedding("Vacation policy")
+            search._embed_query_cached.cache_clear()
+            again = search.get_query_embedding("vacation policy")
+            batch = search.get_query_embeddings(["vacation policy"])
+
+        assert mock_openai.embeddings.create.call_count == 1
+        assert again == pytest.approx([0.1, 0.2, 0.3])
+        assert batch[0] == pytest.approx([0.1, 0.2, 0.3])
+
+
+# =============================================================================
+# SEARCH RPC TESTS
+# =============================================================================
+
+
+@pytest.fixture
+def mock_supabase():
+    """Mock Supabase client whose RPC returns one chunk."""
+    client = Mock()
+    client.rpc.return_value.execute.return_value = Mock(data=[{
+        "id": "chunk-1",
+        "content": "Employees get 15 vacation days.",
+        "metadata": {"document_name": "hr.md", "chunk_index": 0},
+        "similarity": 0.82,
+    }])
+    with patch("documind.rag.search._get_supabase_client", return_value=client):
+        yield client
+
+
+class TestSearchDocumentsRpc:
+    """Tests for choosing between full-precision and quantized search."""
+
+    def test_default_uses_match_documents(self, mock_openai, mock_supabase):
+        """Test the unquantized RPC is used when the flag is off."""
+        with patch.object(search, "QUANTIZED_SEARCH", False):
+            results = search.search_documents("vacation", top_k=3)
+
+        name, params = mock_supabase.rpc.call_args.args
+        assert name == "match_documents"
+        assert "candidate_count" not in params
+        assert results[0]["document_name"] == "hr.md"
+
+    def test_env_flag_uses_quantized_rpc(self, mock_openai, mock_supabase):
+        """Test DOCUMIND_QUANTIZED_SEARCH routes to the quantized RPC."""
+        with patch.object(search, "QUANTIZED_SEARCH", True):
+            search.search_documents("vacation", top_k=20)
+
+        name, params = mock_supabase.rpc.call_args.args
+        assert name == "match_documents_quantized"
+        assert params["match_count"] == 20
+        assert params["candidate_count"] == 100
+
+    def test_argument_overrides_flag(self, mock_openai, mock_supabase):
+        """Test an explicit quantized argument wins over the env flag."""
+        with patch.object(search, "QUANTIZED_SEARCH", True):
+            search.search_documents("vacation", quantized=False)
+
+        assert mock_supabase.rpc.call_args.args[0] == "match_documents"
+
+    def test_precomputed_embedding_skips_embedding_call(self, mock_openai, mock_supabase):
+        """Test a passed query_embedding is used as-is."""
+        search.search_documents("vacation", query_embedding=[0.5, 0.5])
+
+        assert mock_supabase.rpc.call_args.args[1]["query_embedding"] == [0.5, 0.5]
+        mock_openai.embeddings.create.assert_not_called()
+
+    def test_async_embedding_uses_cache(self, mock_openai):
+        """Test get_query_embedding_async shares the sync embedding cache."""
+        import asyncio
+
+        first = asyncio.run(search.get_query_embedding_async("Vacation"))
+        second = search.get_query_embedding("vacation")
+
+        assert first == second == [0.1, 0.2, 0.3]
+        assert mock_openai.embeddings.create.call_count == 1
+
+    def test_filters_omitted_by_default(self, mock_openai, mock_supabase):
+        """Test unfiltered searches don't send filter arguments."""
+        search.search_documents("vacation")
+
+        params = mock_supabase.rpc.call_args.args[1]
+        assert "filter_file_types" not in params
+        assert "filter_after" not in params
+
+    def test_filters_passed_to_rpc(self, mock_openai, mock_supabase):
+        """Test file type and date filters are sent as RPC arguments."""
+        from datetime import date
+
+        search.search_documents(
+            "vacation", file_types=["pdf", "docx"], after=date(2025, 1, 31)
+        )
+
+        params = mock_supabase.rpc.call_args.args[1]
+        assert params["filter_file_types"] == ["pdf", "docx"]
+        assert params["filter_after"] == "2025-01-31"
+
+    def test_search_cache_serves_near_duplicate_embeddings(self, mock_supabase):
+        """Test a near-identical embedding with the same options skips the RPC."""
+        from documind.cache.semantic import SemanticCache
+
+        cache = SemanticCache(threshold=0.97)
+        with patch.object(search, "_get_search_cache", return_value=cache):
+            first = search.search_documents("vacation", query_embedding=[1.0, 0.0, 0.1])
+            first[0]["final_score"] = 1.0
+            second = search.search_documents("PTO", query_embedding=[1.0, 0.01, 0.1])
+            search.search_documents("PTO", top_k=10, query_embedding=[1.0, 0.01, 0.1])
+            search.search_documents("payroll", query_embedding=[0.0, 1.0, 0.0])
+
+        assert mock_supabase.rpc.call_count == 3
+        assert second[0]["id"] == "chunk-1"
+        assert "final_score" not in second[0]
+
+    def test_search_cache_keeps_each_option_set(self, mock_supabase):
+        """Test a query cached with one threshold still hits for another."""
+        from documind.cache.semantic import SemanticCache
+
+        cache = SemanticCache(threshold=0.97)
+        embedding = [1.0, 0.0, 0.1]
+        with patch.object(search, "_get_search_cache", return_value=cache):
+            search.search_documents("vacation", query_embedding=embedding)
+            search.search_documents("vacation", similarity_threshold=0.3, query_embedding=embedding)
+            search.search_documents("vacation", query_embedding=embedding)
+            search.search_documents("vacation", similarity_threshold=0.3, query_embedding=embedding)
+
+        assert mock_supabase.rpc.call_count == 2
+        assert len(cache) == 1
+
+
+# =============================================================================
+# RRF HYBRID SEARCH TESTS
+# =============================================================================
+
+
+def _chunk(chunk_id, similarity=None):
+    return {
+        "id": chunk_id,
+        "content": f"content {chunk_id}",
+        "metadata": {},
+        "similarity": similarity,
+        "document_name": "doc.md",
+        "chunk_index": 0,
+    }
+
+
+class TestRrfHybridSearch:
+    """Tests for rrf_hybrid_search fusion."""
+
+    def test_fuses_ranks(self):
+        """Test chunks found by both rankings outrank single-list chunks."""
+        semantic = [_chunk("a", 0.9), _chunk("b", 0.8), _chunk("c", 0.7)]
+        keyword = [_chunk("c"), _chunk("d")]
+
+        with patch.object(search, "search_documents", return_value=semantic), \
+                patch.object(search, "keyword_search", return_value=keyword):
+            results = search.rrf_hybrid_search("query", top_k=4, semantic_weight=0.5, k=60)
+
+        assert [r["id"] for r in results] == ["c", "a", "b", "d"]
+        assert results[0]["search_type"] == "both"
+        assert results[0]["rrf_score"] == pytest.approx(0.5 / 63 + 0.5 / 61)
+        assert results[-1]["search_type"] == "keyword"
+
+    def test_truncates_to_top_k(self):
+        """Test only top_k fused results are returned."""
+        semantic = [_chunk(str(i), 0.9) for i in range(10)]
+
+        with patch.object(search, "search_documents", return_value=semantic), \
+                patch.object(search, "keyword_search", return_value=[]):
+            results = search.rrf_hybrid_search("query", top_k=3)
+
+        assert [r["id"] for r in results] == ["0", "1", "2"]
+
+    def test_keyword_failure_falls_back_to_semantic(self):
+        """Test a missing full-text RPC degrades to vector ranking."""
+        semantic = [_chunk("a", 0.9)]
+
+        with patch.object(search, "search_documents", return_value=semantic), \
+                patch.object(search, "keyword_search", side_effect=Exception("no rpc")):
+            results = search.rrf_hybrid_search("query")
+
+        assert [r["id"] for r in results] == ["a"]
+
+    def test_keyword_search_formats_rows(self, mock_supabase):
+        """Test keyword_search calls the FTS RPC and keeps its rank."""
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data=[{
+            "id": "chunk-9",
+            "content": "---\ntitle: x\n---\nBody text",
+            "metadata": {"file_name": "notes.txt"},
+            "rank": 0.4,
+        }])
+
+        results = search.keyword_search("body", top_k=5, file_types=["txt"])
+
+        name, params = mock_supabase.rpc.call_args.args
+        assert name == "match_documents_fts"
+        assert params == {"query_text": "body", "match_count": 5, "filter_file_types": ["txt"]}
+        assert results[0]["content"] == "Body text"
+        assert results[0]["document_name"] == "notes.txt"
+        assert results[0]["rank"] == 0.4
+
+
+# =============================================================================
+# TEST: BATCHED SEARCH
+# =============================================================================
+
+
+class TestBatchedSearch:
+    """Tests for search_documents_batch and BatchingRetriever."""
+
+    def test_batch_rpc_groups_rows_by_query(self, mock_supabase):
+        """Test one RPC serves every query and rows are split by query_index."""
+        mock_supabase.rpc.return_value.execute.return_value = Mock(data=[
+            dict(_chunk("a", 0.9), query_index=0),
+            dict(_chunk("b", 0.8), query_index=2),
+            dict(_chunk("c", 0.7), query_index=0),
+        ])
+
+        results = search.search_documents_batch(
+            ["q0", "q1", "q2"], top_k=4, query_embeddings=[[0.1], [0.2], [0.3]]
+        )
+
+        name, params = mock_supabase.rpc.call_args.args
+        assert name == "match_documents_batch"
+        assert params["query_embeddings"] == [[0.1], [0.2], [0.3]]
+        assert params["match_count"] == 4
+        assert [[r["id"] for r in group] for group in results] == [["a", "c"], [], ["b"]]
+
+    def test_retriever_coalesces_concurrent_searches(self):
+        """Test concurrent searches share one batch and get their own top_k."""
+        def fake_batch(queries, top_k, similarity_threshold):
+            return [[_chunk(f"{q}-{i}") for i in range(top_k)] for q in queries]
+
+        retriever = search.BatchingRetriever(max_wait=0.05)
+
+        async def run():
+            return await asyncio.gather(
+                retriever.search("x", top_k=2),
+                retriever.search("y", top_k=3),
+            )
+
+        with patch.object(search, "search_documents_batch", side_effect=fake_batch) as batch:
+            x, y = asyncio.run(run())
+
+        batch.assert_called_once()
+        assert batch.call_args.args[0] == ["x", "y"]
+        assert [r["id"] for r in x] == ["x-0", "x-1"]
+        assert [r["id"] for r in y] == ["y-0", "y-1", "y-2"]
+
+    def test_retriever_propagates_errors(self):
+        """Test a failed batch raises in every waiting caller."""
+        retriever = search.BatchingRetriever(max_wait=0.01)
+
+        with patch.object(search, "search_documents_batch", side_effect=Exception("rpc down")):
+            with pytest.raises(Exception, match="rpc down"):
+                asyncio.run(retriever.search("x"))
+
+
+class TestPopulateEmbeddings:
+    """Tests for the batched embedding backfill."""
+
+    def test_backfill_batches_requests_and_writes(self):
+        """Test chunks are embedded and written one request per batch."""
+        rows = [{"id": f"c{i}", "content": f"chunk {i}"} for i in range(5)]
+        rows.insert(2, {"id": "c-empty", "content": "  "})
+
+        supabase = Mock()
+        select = supabase.table.return_value.select.return_value
+        page = select.is_.return_value.order.return_value.limit.return_value
+        page.execute.return_value = Mock(data=rows)
+        supabase.rpc.side_effect = lambda name, params: Mock(
+            execute=Mock(return_value=Mock(data=len(params["chunk_embeddings"])))
+        )
+
+        openai = Mock()
+        openai.embeddings.create.side_effect = lambda model, input: Mock(
+            data=[Mock(embedding=[float(len(text))]) for text in input]
+        )
+
+        with patch.object(search, "_get_supabase_client", return_value=supabase), \
+                patch.object(search, "_get_openai_client", return_value=openai):
+            updated = search.populate_embeddings(batch_size=2, max_workers=4)
+
+        assert updated == 5
+        select.is_.assert_called_once_with("embedding", "null")
+        assert openai.embeddings.create.call_count == 3
+        assert supabase.rpc.call_count == 3
+        written = [
+            row["id"]
+            for call in supabase.rpc.call_args_list
+            for row in call.args[1]["chunk_embeddings"]
+        ]
+        assert sorted(written) == ["c0", "c1", "c2", "c3", "c4"]